@@ -4,28 +4,87 @@ The module is designed to wrap a library that is automatically generated from th
 to access the OptHub public REST API.
 
 The automatically generated raw Python package is available at https://github.com/opthub-org/opthub-api-client-python.
+
+One `OptHub` can be shared by all the threads of a process, e.g. the workers of a `ThreadPoolExecutor`: all the requests
+go through one thread-safe urllib3 connection pool, and the state shared between threads (matches, schedulers,
+subscriptions, caches, latency estimates and metrics) is guarded by locks. A `Trial` holds the state of one trial and
+should be used by one thread at a time; different trials can be waited for concurrently.
+
+`OptHub`, `Match` and `Trial` can be pickled to the workers of a `ProcessPoolExecutor`: they are pickled as the API
+settings, the match UUID and the trial number, and each process rebuilds one API per settings with its own connection
+pool. The connection pools inherited by a forked child process are reset, so that it never shares a connection with
+its parent.
 """
 
 from __future__ import annotations
 
+import json
+import os
+import pickle
+import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from http import HTTPStatus
 from random import random
 from time import sleep
-from typing import TYPE_CHECKING, NamedTuple, TypeVar
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Self, TypeVar
 from uuid import UUID
+from weakref import WeakSet, WeakValueDictionary
 
 import numpy as np
 import opthub_api_client as raw
-from opthub_api_client import MatchTrialEvaluation, MatchTrialScore, MatchTrialStatus, Solution
+import urllib3
+from opthub_api_client.api.match_trials_api import MatchTrialsApi
+from opthub_api_client.api_client import ApiClient
+from opthub_api_client.configuration import Configuration
+from opthub_api_client.exceptions import ApiException
+from opthub_api_client.models.match_trial_evaluation import MatchTrialEvaluation
+from opthub_api_client.models.match_trial_score import MatchTrialScore
+from opthub_api_client.models.match_trial_status import MatchTrialStatus
+from opthub_api_client.models.solution import Solution
+from urllib3.connection import HTTPConnection
+from urllib3.util import Retry
+
+from opthub_client.context.trial_result_cache import CachedTrialResult, TrialResultCache
+from opthub_client.graphql.subscription import TrialSubscription
+from opthub_client.latency import LatencyEstimator, Phase
+from opthub_client.metrics import MetricsRegistry
+from opthub_client.outbox import OutboxLockedError, OutboxSubmissionError, SubmissionOutbox
+from opthub_client.scheduler import SubmissionRefusedError, SubmissionScheduler
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator
+    from contextlib import AbstractContextManager
 
+    from gql.transport.async_transport import AsyncTransport
     from numpy.typing import ArrayLike
+    from opthub_api_client.models.match_trial_response import MatchTrialResponse
+    from opthub_api_client.models.scalar_or_vector import ScalarOrVector
+
+    from opthub_client.graphql.subscription import Mark
+    from opthub_client.models.trial import Trial as TrialData
+
+    FetchTrial = Callable[[str, int], TrialData | None]
+    ResultPart = Literal["status", "evaluation", "score", "solution"]
 
 T = TypeVar("T")
 TOptHub = TypeVar("TOptHub", bound="OptHub")
 
+# Default number of connections kept in the pool, enough for the default concurrency of `Match.submit_many`
+DEFAULT_POOL_MAXSIZE = 32
+
+# Response types of `POST /matches/{match_uuid}/trials`, as in the generated `MatchTrialsApi.create_match_trial`
+CREATE_TRIAL_RESPONSE_TYPES = {
+    "200": "MatchTrialResponse",
+    "400": "CreateMatchTrial400Response",
+    "401": "AuthErrorResponse",
+    "403": "CreateMatchTrial403Response",
+    "404": "CreateMatchTrial404Response",
+    "500": "ServerErrorResponse",
+}
+
 __all__ = [
     "raw",
     "OptHub",
@@ -38,6 +97,19 @@ __all__ = [
     "Solution",
     "EvaluationError",
     "ScoringError",
+    "BatchSubmissionError",
+    "BatchEvaluation",
+    "TrialResult",
+    "TrialResultCache",
+    "RetryPolicy",
+    "SubmissionScheduler",
+    "SubmissionOutbox",
+    "OutboxSubmissionError",
+    "OutboxLockedError",
+    "SubmissionRefusedError",
+    "TrialSubscription",
+    "LatencyEstimator",
+    "MetricsRegistry",
 ]
 
 
@@ -47,6 +119,15 @@ class TrialStatus(NamedTuple):
     type: MatchTrialStatus
 
 
+# Trials share the `TrialStatus` of each status instead of holding their own copies.
+_TRIAL_STATUSES = {status: TrialStatus(status) for status in MatchTrialStatus}
+
+
+def trial_status(status: MatchTrialStatus | str) -> TrialStatus:
+    """Get the shared `TrialStatus` of a trial status."""
+    return _TRIAL_STATUSES[MatchTrialStatus(status)]
+
+
 class EvaluationError(Exception):
     """Exception during evaluation calculation failure."""
 
@@ -55,69 +136,398 @@ class ScoringError(Exception):
     """Exception during score calculation failure."""
 
 
-class Trial:
-    """A class representing the match trial."""
+def is_trial_not_found(error: raw.exceptions.NotFoundException) -> bool:
+    """Whether a `NotFoundException` means that the requested trial does not exist (yet)."""
+    code = getattr(error.data, "code", None)
+    if code is None and error.body:
+        try:
+            code = json.loads(error.body).get("code")
+        except ValueError:
+            code = None
+    return code == "TrialNotFound"
+
+
+class PollingSettings:
+    """Settings of the exponential backoff polling shared by the synchronous and asynchronous APIs."""
+
+    poll_interval_initial_sec = 0.5
+    poll_interval_max_sec = 5 * 60
+    poll_max_random_delay_sec = 0.5
+    poll_exponential_backoff_ratio = 1.2
+    poll_subscribed_interval_sec = 60.0
+    poll_adaptive_min_interval_sec = 0.1
+
+    def poll_intervals(self, initial_sec: float | None = None) -> Iterator[float]:
+        """Generate the waiting times between polls, with random jitter.
+
+        Args:
+            initial_sec (float | None): The first waiting time; `poll_interval_initial_sec` by default. The jitter
+                is at most the waiting time, so that short waits stay short.
+        """
+        wait_sec = self.poll_interval_initial_sec if initial_sec is None else initial_sec
+        while True:
+            yield wait_sec + random() * min(self.poll_max_random_delay_sec, wait_sec)  # noqa: S311
+            wait_sec = min(wait_sec * self.poll_exponential_backoff_ratio, self.poll_interval_max_sec)
+
+
+class RetryPolicy(Retry):
+    """A urllib3 retry policy for transient errors of the OptHub REST API.
+
+    Idempotent reads are retried on connection errors, read errors and 429/5xx responses. Submissions are retried
+    only on connection errors and 429 responses, where the server has not accepted the solution, so that a solution
+    is never submitted twice. Retries wait for an exponential backoff with random jitter.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    metrics: MetricsRegistry | None = None
+    """The registry counting the retries, if any."""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:  # noqa: FBT002
+        """Whether to retry a request with the response status code."""
+        if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def new(self, **kw: Any) -> Self:  # noqa: ANN401
+        """Create the policy of the next attempt, keeping the metrics registry."""
+        retry = super().new(**kw)
+        retry.metrics = self.metrics
+        return retry
+
+    def increment(self, *args: Any, **kwargs: Any) -> Self:  # noqa: ANN401
+        """Count an attempt, and count it as a retry in the metrics unless the retries are exhausted."""
+        retry = super().increment(*args, **kwargs)
+        if self.metrics is not None:
+            response = kwargs.get("response", args[2] if len(args) > 2 else None)  # noqa: PLR2004
+            self.metrics.retries.inc(cause="error" if response is None else str(response.status))
+        return retry
+
+
+class BatchSubmissionError(Exception):
+    """Exception raised when some solutions of a batch submission fail.
+
+    The remaining solutions are submitted regardless; the successful trials are kept in `trials`.
+    """
+
+    trials: list[Trial | None]
+    errors: dict[int, Exception]
+
+    def __init__(self, trials: list[Trial | None], errors: dict[int, Exception]) -> None:
+        """Initialize the BatchSubmissionError class.
+
+        Args:
+            trials (list[Trial | None]): The submitted trials in input order, `None` for failed submissions.
+            errors (dict[int, Exception]): The exceptions keyed by the input index of the failed solutions.
+        """
+        self.trials = trials
+        self.errors = errors
+        super().__init__(f"{len(errors)} of {len(trials)} submissions failed.")
+
+
+class BatchEvaluation(NamedTuple):
+    """The evaluations of a batch of solutions by `Match.evaluate`, one row per solution.
+
+    Rows whose submission or evaluation failed are NaN in `objectives` and `constraints`, False in `feasible` and
+    True in `errors`.
+    """
+
+    objectives: np.ndarray
+    """The objective values, of shape (n, n_obj)."""
+    constraints: np.ndarray
+    """The constraint values, of shape (n, n_con). n_con is 0 for unconstrained problems."""
+    feasible: np.ndarray
+    """The boolean mask of the feasible solutions, of shape (n,)."""
+    errors: np.ndarray
+    """The boolean mask of the failed solutions, of shape (n,)."""
+    trials: list[Trial | None]
+    """The submitted trials, `None` for failed submissions."""
+
+
+class TrialResult(NamedTuple):
+    """The status and the results of a trial. Results which have not been retrieved are `None`."""
 
-    trial_no: int
     status: TrialStatus
     evaluation: MatchTrialEvaluation | None
     score: MatchTrialScore | None
+    solution: Solution | None
+
+
+class Trial:
+    """A class representing the match trial.
+
+    Trials are compact, so that a long run can keep hundreds of thousands of them: they have no instance `__dict__`,
+    share their `Match` and status objects, and keep the evaluation and score as JSON bytes decoded on access.
+    """
+
+    __slots__ = ("trial_no", "status", "_evaluation", "_score", "match", "submitted_at")
+
+    trial_no: int
+    status: TrialStatus
     match: Match
+    submitted_at: float | None
+    """The `time.monotonic()` time of the submission, if submitted by this process."""
+
+    @property
+    def evaluation(self) -> MatchTrialEvaluation | None:
+        """The evaluation, once retrieved. A new object is decoded on each access."""
+        return None if self._evaluation is None else MatchTrialEvaluation.model_validate_json(self._evaluation)
+
+    @evaluation.setter
+    def evaluation(self, evaluation: MatchTrialEvaluation | None) -> None:
+        self._evaluation = None if evaluation is None else _compact(evaluation)
+
+    @property
+    def score(self) -> MatchTrialScore | None:
+        """The score, once retrieved. A new object is decoded on each access."""
+        return None if self._score is None else MatchTrialScore.model_validate_json(self._score)
+
+    @score.setter
+    def score(self, score: MatchTrialScore | None) -> None:
+        self._score = None if score is None else _compact(score)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the trial as its match, trial number and the results retrieved so far."""
+        return _restore_trial, (self.match, self.trial_no, self.status.type, self._evaluation, self._score)
 
     def wait_evaluation(self, timeout: float | None = None) -> MatchTrialEvaluation:
-        """Wait until the evaluation is complete, then return the results."""
-        self._poll(
-            lambda: self.update_status(),
-            lambda _: self.status.type != MatchTrialStatus.EVALUATING,
-            timeout,
-            first_wait=False,
-        )
+        """Wait until the evaluation is complete, then return the results.
 
-        self.evaluation = raw.MatchTrialsApi(self.match.api.client).get_match_evaluation(
-            str(self.match.uuid),
-            self.trial_no,
-        )
+        If the trial has already been scored, the score is retrieved in the same round trip, so that a following
+        `wait_scoring` needs no request.
+        """
+        evaluation = self._wait_result("evaluation", timeout).evaluation
+        if evaluation is None:
+            msg = "The finished trial has no evaluation."
+            raise EvaluationError(msg)
 
-        if self.evaluation.error is not None:
-            raise EvaluationError(self.evaluation.error)
+        if evaluation.error is not None:
+            raise EvaluationError(evaluation.error)
 
-        return self.evaluation
+        return evaluation
 
     def wait_scoring(self, timeout: float | None = None) -> MatchTrialScore:
-        """Wait until the scoring is complete, then return the results."""
-        self._poll(
-            lambda: self.update_status(),
-            lambda _: self.status.type not in {MatchTrialStatus.EVALUATING, MatchTrialStatus.SCORING},
-            timeout,
-            first_wait=False,
-        )
+        """Wait until the scoring is complete, then return the results.
 
-        self.score = raw.MatchTrialsApi(self.match.api.client).get_match_score(
-            str(self.match.uuid),
-            self.trial_no,
-        )
+        The evaluation is retrieved in the same round trip if it has not been retrieved yet. A trial whose evaluation
+        failed is finished without a score, and raises `ScoringError` once its evaluation is retrieved.
+        """
+        score = self._wait_result("scoring", timeout).score
+        if score is None:
+            if self.status.type == MatchTrialStatus.EVALUATOR_FAILED:
+                msg = "The evaluation failed, so the trial has no score."
+            else:
+                msg = "The finished trial has no score."
+            raise ScoringError(msg)
+
+        if score.error is not None:
+            raise ScoringError(score.error)
+
+        return score
 
-        if self.score.error is not None:
-            raise ScoringError(self.score.error)
+    def fetch_result(self) -> TrialResult:
+        """Retrieve the current status, evaluation, score and solution of the trial in one round trip.
 
-        return self.score
+        With the `fetch_trial` query of the API, this is a single request. Otherwise, the REST API is queried with
+        concurrent requests. Results which are not available yet are `None`.
+        """
+        fetch_trial = self.match.api.fetch_trial
+        if fetch_trial is None:
+            return self._fetch_rest(("status",), ("evaluation", "score", "solution"))
+
+        with _track_request(self.match.api.metrics, "combined"):
+            data = fetch_trial(str(self.match.uuid), self.trial_no)
+        if data is None:
+            return TrialResult(status=self.status, evaluation=None, score=None, solution=None)
+        return trial_result_from_graphql(data)
 
     def get_solution(self) -> Solution:
         """Retrieves a past submitted solution."""
-        return raw.MatchTrialsApi(self.match.api.client).get_solution(str(self.match.uuid), self.trial_no)
+        cached = self._get_cached_result()
+        if cached is not None and cached.solution is not None:
+            return cached.solution
 
-    def update_status(self) -> None:
+        solution = self._get_solution()
+        self._cache_result(solution=solution)
+        return solution
+
+    def update_status(self, timeout: float | None = None) -> None:
         """Retrieves the status of the trial.
 
         Wait until the submitted results are reflected on the server side and the trial information becomes available.
+
+        Args:
+            timeout (float | None): The maximum time in seconds to wait for the trial information
+
+        Raises:
+            TimeoutError: If the trial information is not available within `timeout`
         """
         trial = self._poll(
             lambda: self.match.try_get_trial(self.trial_no),
             lambda trial: trial is not None,
-            None,
+            timeout,
             first_wait=False,
         )
-        self.status = trial.status
+        if trial is not None:  # always found once the polling ends
+            self._set_status(trial.status)
+
+    def _set_status(self, status: TrialStatus) -> None:
+        """Update the status, counting a success towards the budget of the scheduler and giving back failures."""
+        self.status = status
+        scheduler = self.match.scheduler
+        if scheduler is None:
+            return
+        if status.type == MatchTrialStatus.SUCCESS:
+            scheduler.record_success(self.trial_no)
+        elif status.type in {MatchTrialStatus.EVALUATOR_FAILED, MatchTrialStatus.SCORER_FAILED}:
+            scheduler.record_failure(self.trial_no)
+
+    def _wait_result(self, phase: Phase, timeout: float | None) -> TrialResult:
+        """Wait until the phase ends, then retrieve the results in as few round trips as possible.
+
+        With the `fetch_trial` query of the API, each poll retrieves all the results, so the last poll returns them.
+        Otherwise, the status is polled, then the evaluation and the score are retrieved with concurrent requests.
+        """
+        unfinished = {MatchTrialStatus.EVALUATING}
+        if phase == "scoring":
+            unfinished.add(MatchTrialStatus.SCORING)
+        scored = {MatchTrialStatus.SUCCESS, MatchTrialStatus.SCORER_FAILED}
+
+        cached = self._get_cached_result()
+        if cached is not None:
+            self.status = trial_status(cached.status)
+            self.evaluation = cached.evaluation or self.evaluation
+            self.score = cached.score or self.score
+        evaluated_only = phase == "evaluation" or self.status.type == MatchTrialStatus.EVALUATOR_FAILED
+        known = self._evaluation if evaluated_only else self._score
+        if known is not None and self.status.type not in unfinished:
+            return TrialResult(status=self.status, evaluation=self.evaluation, score=self.score, solution=None)
+
+        checks: list[float] = []
+        if self.match.api.fetch_trial is not None:
+            result = self._poll(
+                self.fetch_result,
+                lambda result: result.status.type not in unfinished,
+                timeout,
+                first_wait=False,
+                phase=phase,
+                checks=checks,
+                wait_expected=self.status.type in unfinished,
+            )
+        else:
+            if self.status.type in unfinished:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                self._poll(
+                    lambda: self.update_status(None if deadline is None else max(0.0, deadline - time.monotonic())),
+                    lambda _: self.status.type not in unfinished,
+                    timeout,
+                    first_wait=False,
+                    phase=phase,
+                    checks=checks,
+                )
+            if phase == "scoring" and self.status.type == MatchTrialStatus.EVALUATOR_FAILED:
+                # A failed evaluation is never scored, so the trial is finished with its evaluation only
+                result = self._fetch_rest(("evaluation",))
+            else:
+                other: ResultPart = "score" if phase == "evaluation" else "evaluation"
+                needed = self.status.type in scored if other == "score" else self._evaluation is None
+                result = self._fetch_rest(
+                    ("evaluation" if phase == "evaluation" else "score",),
+                    (other,) if needed else (),
+                )
+
+        self._set_status(result.status)
+        evaluation = result.evaluation or self.evaluation
+        score = result.score or self.score
+        self.evaluation = evaluation
+        self.score = score
+        self._cache_result(result.evaluation, result.score, result.solution)
+        finished = evaluation if phase == "evaluation" else score
+        # The latency is known only for the trials submitted by this process
+        if finished is not None and self.submitted_at is not None:
+            started_at = evaluation.started_at if evaluation is not None else finished.started_at
+            self.match.api.latency.observe(self.match.uuid, phase, checks, started_at, finished.finished_at)
+        return TrialResult(status=self.status, evaluation=evaluation, score=score, solution=result.solution)
+
+    def _fetch_rest(self, required: tuple[ResultPart, ...], optional: tuple[ResultPart, ...] = ()) -> TrialResult:
+        """Retrieve parts of the results from the REST API, with concurrent requests if there are several.
+
+        Args:
+            required (tuple[ResultPart, ...]): The parts to retrieve; a missing part raises `NotFoundException`
+            optional (tuple[ResultPart, ...]): The parts to retrieve if available, `None` otherwise
+
+        Returns:
+            TrialResult: The retrieved parts; the other results are `None`, and the status is the current one.
+        """
+        getters: dict[ResultPart, Callable[[], Any]] = {
+            "status": lambda: self.match.get_trial(self.trial_no).status,
+            "evaluation": self._get_evaluation,
+            "score": self._get_score,
+            "solution": self._get_solution,
+        }
+
+        def get(part: ResultPart) -> Any:  # noqa: ANN401
+            try:
+                return getters[part]()
+            except raw.exceptions.NotFoundException:
+                if part in optional:
+                    return None
+                raise
+
+        parts = [*required, *optional]
+        if len(parts) > 1:
+            with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+                futures = {part: executor.submit(get, part) for part in parts}
+            values = {part: future.result() for part, future in futures.items()}
+        else:
+            values = {part: get(part) for part in parts}
+
+        return TrialResult(
+            status=values.get("status") or self.status,
+            evaluation=values.get("evaluation"),
+            score=values.get("score"),
+            solution=values.get("solution"),
+        )
+
+    def _get_evaluation(self) -> MatchTrialEvaluation:
+        with _track_request(self.match.api.metrics, "evaluation"):
+            return self.match.api.trials_api.get_match_evaluation(
+                str(self.match.uuid),
+                self.trial_no,
+                _request_timeout=self.match.api.request_timeout,
+            )
+
+    def _get_score(self) -> MatchTrialScore:
+        with _track_request(self.match.api.metrics, "score"):
+            return self.match.api.trials_api.get_match_score(
+                str(self.match.uuid),
+                self.trial_no,
+                _request_timeout=self.match.api.request_timeout,
+            )
+
+    def _get_solution(self) -> Solution:
+        with _track_request(self.match.api.metrics, "solution"):
+            return self.match.api.trials_api.get_solution(
+                str(self.match.uuid),
+                self.trial_no,
+                _request_timeout=self.match.api.request_timeout,
+            )
+
+    def _get_cached_result(self) -> CachedTrialResult | None:
+        """Get the results of the trial from the cache of the API, if any."""
+        cache = self.match.api.cache
+        return None if cache is None else cache.get(self.match.uuid, self.trial_no)
+
+    def _cache_result(
+        self,
+        evaluation: MatchTrialEvaluation | None = None,
+        score: MatchTrialScore | None = None,
+        solution: Solution | None = None,
+    ) -> None:
+        """Store the results of the trial in the cache of the API once the trial has finished."""
+        cache = self.match.api.cache
+        if cache is not None:
+            cache.put(self.match.uuid, self.trial_no, self.status.type, evaluation, score, solution)
 
     def _poll(
         self,
@@ -125,65 +535,365 @@ class Trial:
         finish_condition: Callable[[T], bool],
         timeout: float | None,
         first_wait: bool,
+        phase: Phase | None = None,
+        checks: list[float] | None = None,
+        *,
+        wait_expected: bool = True,
     ) -> T:
-        """Perform polling based on exponential backoff."""
-        start = time.time()
-        api = self.match.api
-        wait_sec = api.poll_interval_initial_sec
+        """Perform polling based on exponential backoff.
+
+        In the adaptive poll mode, waiting for a phase with a latency estimate first sleeps until the expected end of
+        the phase since the submission, then polls with a backoff starting from the deviation of the estimate. The
+        sleep is skipped for trials not submitted by this process, whose submission time is unknown.
 
-        def wait() -> None:
-            nonlocal wait_sec
-            sleep(wait_sec + random() * api.poll_max_random_delay_sec)  # noqa: S311
-            wait_sec = min(wait_sec * api.poll_exponential_backoff_ratio, api.poll_interval_max_sec)
+        While the match has a connected subscription, the polling waits for a change of the trial status pushed by
+        the subscription instead, and checks the status every `poll_subscribed_interval_sec` only as a safeguard.
+
+        Args:
+            callback (Callable[[], T]): The status check
+            finish_condition (Callable[[T], bool]): Whether the result of the status check ends the polling
+            timeout (float | None): The maximum time in seconds to poll
+            first_wait (bool): Whether to wait before the first status check
+            phase (Phase | None): The phase of the trial waited for, used for the adaptive poll mode
+            checks (list[float] | None): Receives the times since submission of the status checks
+            wait_expected (bool): Whether to sleep until the expected end of the phase, e.g. not if it has ended
+        """
+        api = self.match.api
+        start = time.time()
+        origin = time.monotonic() if self.submitted_at is None else self.submitted_at
+        intervals = self._wait_expected_latency(phase, timeout, sleep=wait_expected)
+        subscription = self.match.subscription
 
         if first_wait:
-            wait()
+            self._sleep(next(intervals))
 
-        while True:
-            result = callback()
-            if finish_condition(result):
-                return result
+        polls = 0
+        watching = nullcontext() if subscription is None else subscription.watching(self.trial_no)
+        with watching:
+            while True:
+                mark = None if subscription is None else subscription.mark(self.trial_no)
+                if checks is not None:
+                    checks.append(time.monotonic() - origin)
+                result = callback()
+                polls += 1
+                if finish_condition(result):
+                    if phase is not None and api.metrics is not None:
+                        self._record_wait(api.metrics, phase, polls)
+                    return result
 
-            if timeout is not None and (time.time() - start) > timeout:
-                raise TimeoutError
+                if timeout is not None and (time.time() - start) > timeout:
+                    raise TimeoutError
 
-            wait()
+                if subscription is not None and mark is not None and subscription.connected:
+                    wait_sec = api.poll_subscribed_interval_sec
+                    if timeout is not None:
+                        wait_sec = max(0.0, min(wait_sec, start + timeout - time.time()))
+                    self._sleep(wait_sec, mark)
+                else:
+                    self._sleep(next(intervals))
 
-    def __del__(self) -> None:
-        """Release the parent reference for GC."""
-        self.match = None
+    def _sleep(self, seconds: float, mark: Mark | None = None) -> None:
+        """Sleep between status checks, or wait for a change of the status pushed by the subscription since `mark`."""
+        start = time.monotonic()
+        subscription = self.match.subscription
+        if mark is not None and subscription is not None:
+            subscription.wait(self.trial_no, mark, seconds)
+        else:
+            sleep(seconds)
+        metrics = self.match.api.metrics
+        if metrics is not None:
+            metrics.poll_sleep_seconds.inc(time.monotonic() - start)
+
+    def _record_wait(self, metrics: MetricsRegistry, phase: Phase, polls: int) -> None:
+        """Record the metrics of a finished wait for a phase."""
+        metrics.polls.inc(polls, phase=phase)
+        metrics.polls_per_wait.observe(polls, phase=phase)
+        if self.submitted_at is not None:
+            metrics.result_seconds.observe(time.monotonic() - self.submitted_at, phase=phase)
+
+    def _wait_expected_latency(self, phase: Phase | None, timeout: float | None, *, sleep: bool) -> Iterator[float]:
+        """Sleep until the expected end of the phase in the adaptive poll mode, and get the following poll intervals.
+
+        The sleep is skipped if not `sleep`, or if the submission time of the trial is unknown.
+        """
+        api = self.match.api
+        estimate = api.latency.estimate(self.match.uuid, phase) if phase and api.poll_mode == "adaptive" else None
+        if estimate is None:
+            return api.poll_intervals()
+
+        if sleep and self.submitted_at is not None:
+            wait_sec = self.submitted_at + estimate.mean - time.monotonic()
+            if timeout is not None:
+                wait_sec = min(wait_sec, timeout)
+            if wait_sec > 0:
+                self._sleep(wait_sec)
+        return api.poll_intervals(max(api.poll_adaptive_min_interval_sec, estimate.deviation, estimate.mean / 10))
 
 
 class Match:
-    """A class representing a match in a competition."""
+    """A class representing a match in a competition.
+
+    `OptHub.match` returns the same `Match` for the same UUID while it is in use, so all its trials share it.
+    """
+
+    __slots__ = ("uuid", "api", "scheduler", "subscription", "_lock", "__weakref__")
 
     uuid: UUID
     api: OptHub
+    scheduler: SubmissionScheduler | None
+    subscription: TrialSubscription | None
+    _lock: threading.Lock
+
+    def subscribe(self, transport_factory: Callable[[], AsyncTransport] | None = None) -> TrialSubscription:
+        """Start a subscription to the status changes of the trials, so that waiting trials are woken immediately.
+
+        Waiting trials fall back to polling with exponential backoff while the subscription is disconnected.
+
+        Args:
+            transport_factory (Callable[[], AsyncTransport] | None): Creates the websocket transport of each
+                connection. Defaults to the OptHub GraphQL API with the credentials of `opt login`.
+
+        Returns:
+            TrialSubscription: The started subscription
+        """
+        subscription = TrialSubscription(self.uuid, transport_factory)
+        with self._lock:
+            previous, self.subscription = self.subscription, subscription
+        if previous is not None:
+            previous.close()
+        subscription.start()
+        return subscription
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the match as its API and UUID. The scheduler and the subscription stay in this process."""
+        return _restore_match, (self.api, self.uuid)
+
+    def unsubscribe(self) -> None:
+        """Close the subscription started by `subscribe`, if any."""
+        with self._lock:
+            subscription, self.subscription = self.subscription, None
+        if subscription is not None:
+            subscription.close()
+
+    def submit(self, solution: ArrayLike, timeout: float | None = None) -> Trial:
+        """Submit a solution.
+
+        If the match has a scheduler, the submission waits for its rate limit and for the trials in flight which
+        could use up the success trials budget.
+
+        Args:
+            solution (ArrayLike): The solution to submit.
+            timeout (float | None): The maximum time in seconds to wait for the scheduler.
+
+        Raises:
+            SubmissionRefusedError: If the submission would exceed the budget or the window of the match
+            TimeoutError: If the scheduler does not let the submission through within `timeout`
+        """
+        array = np.asarray(solution, dtype=np.double)
+        variable: dict[str, float | list[float]] = (
+            {"scalar": float(array)} if array.ndim == 0 else {"vector": array.tolist()}
+        )
+        return self._submit_body(_encode_variable(variable), timeout)
+
+    def submit_nowait(self, solution: ArrayLike) -> int:
+        """Append a solution to the outbox of the API, to be submitted by its background senders.
+
+        The solution is written to the log of the outbox before returning, so it is submitted even if the process
+        crashes, when the outbox is opened again. Get the trial number with `SubmissionOutbox.wait`.
+
+        Returns:
+            int: The ID of the outbox entry
+
+        Raises:
+            ValueError: If the API has no outbox, or the solution contains NaN or infinity
+        """
+        outbox = self.api.outbox
+        if outbox is None:
+            msg = "Pass a SubmissionOutbox to OptHub to submit without waiting."
+            raise ValueError(msg)
+        array = np.asarray(solution, dtype=np.double)
+        variable: dict[str, float | list[float]] = (
+            {"scalar": float(array)} if array.ndim == 0 else {"vector": array.tolist()}
+        )
+        return outbox.put(self.uuid, _encode_variable(variable))
+
+    def submit_many(self, solutions: Iterable[ArrayLike], max_in_flight: int = 32) -> list[Trial]:
+        """Submit solutions concurrently over the shared connection pool.
+
+        At most `max_in_flight` submissions are sent at the same time. A failed submission does not cancel the others.
+
+        Args:
+            solutions (Iterable[ArrayLike]): The solutions to submit.
+            max_in_flight (int): The maximum number of concurrent submissions.
+
+        Returns:
+            list[Trial]: The submitted trials in the same order as `solutions`.
+
+        Raises:
+            BatchSubmissionError: If any of the submissions fails, after all the others have finished.
+        """
+        solutions = list(solutions)
+        return self._submit_concurrently(self.submit, solutions, max_in_flight)
+
+    def submit_array(self, solutions: ArrayLike, max_in_flight: int = 32) -> list[Trial]:
+        """Submit the rows of a 2-D array as solutions, concurrently over the shared connection pool.
 
-    def submit(self, solution: ArrayLike) -> Trial:
-        """Submit a solution."""
-        array = np.array(solution, dtype=np.double)
-        variable = {"scalar": array[0]} if array.ndim == 0 else {"vector": array}
+        The request bodies of all the rows are encoded in bulk before sending, which is much faster than `submit_many`
+        for high-dimensional solutions.
 
-        response = raw.MatchTrialsApi(self.api.client).create_match_trial(str(self.uuid), {"variable": variable})
+        Args:
+            solutions (ArrayLike): The solutions to submit, one per row.
+            max_in_flight (int): The maximum number of concurrent submissions.
+
+        Returns:
+            list[Trial]: The submitted trials in row order.
+
+        Raises:
+            ValueError: If `solutions` is not 2-D or contains NaN or infinity.
+            BatchSubmissionError: If any of the submissions fails, after all the others have finished.
+        """
+        return self._submit_concurrently(self._submit_body, _encode_rows(solutions), max_in_flight)
+
+    def evaluate(
+        self,
+        solutions: ArrayLike,
+        max_in_flight: int = 32,
+        timeout: float | None = None,
+    ) -> BatchEvaluation:
+        """Submit the rows of a 2-D array as solutions and wait for all their evaluations.
+
+        The rows are submitted and waited for concurrently, so that one call evaluates a whole population, and the
+        trials in flight are waited for before a submission which the scheduler of the match holds back. Solutions
+        whose submission or evaluation fails, or which are not evaluated within `timeout`, are flagged in
+        `BatchEvaluation.errors` instead of raising, so that the evaluated rows are kept.
+
+        Args:
+            solutions (ArrayLike): The solutions to evaluate, one per row.
+            max_in_flight (int): The maximum number of concurrent submissions and waits.
+            timeout (float | None): The maximum time in seconds to wait for the whole batch.
+
+        Returns:
+            BatchEvaluation: The objectives, constraints, feasibility and errors of the solutions in row order.
+
+        Raises:
+            ValueError: If `solutions` is not 2-D or contains NaN or infinity.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        bodies = _encode_rows(solutions)
+        trials: list[Trial | None] = [None] * len(bodies)
+        evaluations: list[MatchTrialEvaluation | None] = [None] * len(bodies)
+
+        def remaining() -> float | None:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        def evaluate_row(index: int) -> None:
+            try:
+                trial = trials[index] = self._submit_body(bodies[index], remaining())
+            except Exception:  # the row is flagged as failed, like a failed submission of `submit_array`
+                return
+            try:
+                evaluations[index] = trial.wait_evaluation(remaining())
+            except EvaluationError:
+                evaluations[index] = trial.evaluation
+            except Exception:  # the row is flagged as failed
+                evaluations[index] = None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(bodies)))) as executor:
+            list(executor.map(evaluate_row, range(len(bodies))))
+
+        return _batch_evaluation(trials, evaluations)
+
+    def _submit_body(self, body: bytes, timeout: float | None = None) -> Trial:
+        """Submit a solution encoded by `_encode_variable`, waiting at most `timeout` for the scheduler.
+
+        The body is sent as is on the connection pool of the generated client, bypassing its element-wise
+        validation and serialization of the solution.
+        """
+        client = self.api.client
+        method, url, headers, _, _ = client.param_serialize(
+            method="POST",
+            resource_path="/matches/{match_uuid}/trials",
+            path_params={"match_uuid": str(self.uuid)},
+            header_params={"Accept": "application/json", "Content-Type": "application/json"},
+            auth_settings=["ApiKeyAuth"],
+        )
+
+        if self.scheduler is not None:
+            self.scheduler.acquire(timeout)
+        submitted_at = time.monotonic()
+        try:
+            with _track_request(self.api.metrics, "submit"):
+                response = raw.rest.RESTResponse(
+                    client.rest_client.pool_manager.request(
+                        method,
+                        url,
+                        body=body,
+                        headers=headers,
+                        timeout=_urllib3_timeout(self.api.request_timeout),
+                        preload_content=False,
+                    ),
+                )
+                response.read()  # type: ignore[no-untyped-call]
+                result: MatchTrialResponse = client.response_deserialize(  # type: ignore[assignment] # typed as str
+                    response,
+                    CREATE_TRIAL_RESPONSE_TYPES,
+                ).data
+        except Exception as e:
+            if self.scheduler is not None:
+                # Submissions rejected by the server do not use the budget.
+                status = e.status if isinstance(e, ApiException) else None
+                if status is not None and status < HTTPStatus.INTERNAL_SERVER_ERROR:
+                    self.scheduler.release()
+                else:
+                    self.scheduler.record_submission(None)
+            raise
+        if self.scheduler is not None:
+            self.scheduler.record_submission(result.trial_no)
+        if self.api.metrics is not None:
+            self.api.metrics.submissions.inc()
 
         trial = Trial()
-        trial.trial_no = response.trial_no
-        trial.status = TrialStatus(response.status)
+        trial.trial_no = result.trial_no
+        trial.status = trial_status(result.status)
         trial.evaluation = None
         trial.score = None
         trial.match = self
+        trial.submitted_at = submitted_at
         return trial
 
+    def _submit_concurrently(self, submit: Callable[[T], Trial], items: list[T], max_in_flight: int) -> list[Trial]:
+        """Apply `submit` to the items on a thread pool, collecting the failures into a `BatchSubmissionError`."""
+        trials: list[Trial | None] = [None] * len(items)
+        errors: dict[int, Exception] = {}
+
+        def submit_at(index: int) -> None:
+            try:
+                trials[index] = submit(items[index])
+            except Exception as e:
+                errors[index] = e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(items)))) as executor:
+            list(executor.map(submit_at, range(len(items))))
+
+        if errors:
+            raise BatchSubmissionError(trials, errors)
+
+        return [trial for trial in trials if trial is not None]
+
     def try_get_trial(self, trial_no: int) -> Trial | None:
         """Retrieves the status of the trial with the specified trial number.
 
         If the corresponding trial number does not exist, it returns `None`.
         """
         try:
-            response = raw.MatchTrialsApi(self.api.client).get_match_trial(str(self.uuid), trial_no)
+            with _track_request(self.api.metrics, "trial"):
+                response = self.api.trials_api.get_match_trial(
+                    str(self.uuid),
+                    trial_no,
+                    _request_timeout=self.api.request_timeout,
+                )
 
-            status = TrialStatus(response.status)
+            status = trial_status(response.status)
 
             trial = Trial()
             trial.trial_no = trial_no
@@ -191,9 +901,10 @@ class Match:
             trial.evaluation = None
             trial.score = None
             trial.match = self
+            trial.submitted_at = None
 
         except raw.exceptions.NotFoundException as e:
-            if e.body["code"] == "TrialNotFound":
+            if is_trial_not_found(e):
                 return None
             raise
 
@@ -212,40 +923,376 @@ class Match:
 
         return trial
 
-    def __del__(self) -> None:
-        """Release the parent reference for GC."""
-        self.api = None
 
+class OptHub(PollingSettings):
+    """A class for accessing the OptHub public REST API.
 
-class OptHub:
-    """A class for accessing the OptHub public REST API."""
+    All the requests share one pool of persistent connections. An instance is thread-safe: share it between threads
+    instead of creating one per thread, and set `pool_maxsize` to at least the number of threads.
+    """
 
-    client: raw.ApiClient
-    poll_interval_initial_sec = 0.5
-    poll_interval_max_sec = 5 * 60
-    poll_max_random_delay_sec = 0.5
-    poll_exponential_backoff_ratio = 1.2
+    client: ApiClient
+    trials_api: MatchTrialsApi
+    cache: TrialResultCache | None
+    request_timeout: float | tuple[float, float] | None
+    poll_mode: Literal["adaptive", "fixed"]
+    latency: LatencyEstimator
+    metrics: MetricsRegistry | None
+    fetch_trial: FetchTrial | None
+    outbox: SubmissionOutbox | None
+
+    def __init__(
+        self,
+        api_key: str,
+        host: str | None = None,
+        cache: TrialResultCache | None = None,
+        *,
+        pool_maxsize: int | None = None,
+        keep_alive: bool = True,
+        timeout: float | tuple[float, float] | None = None,
+        retries: int | Retry = 3,
+        poll_mode: Literal["adaptive", "fixed"] = "adaptive",
+        metrics: MetricsRegistry | None = None,
+        fetch_trial: FetchTrial | None = None,
+        outbox: SubmissionOutbox | None = None,
+    ) -> None:
+        """Creates an instance for API access from an API key.
 
-    def __init__(self, api_key: str, host: str | None = None) -> None:
-        """Creates an instance for API access from an API key."""
-        conf = raw.Configuration(host=host)
+        Args:
+            api_key (str): The API key
+            host (str | None): The API endpoint. Defaults to the OptHub public REST API.
+            cache (TrialResultCache | None): The cache of finished trial results. Defaults to no caching.
+            pool_maxsize (int | None): The number of connections kept in the pool. Set it to at least the number of
+                concurrent requests. Defaults to the larger of `DEFAULT_POOL_MAXSIZE` and 5 per CPU.
+            keep_alive (bool): Whether to send TCP keep-alive probes on idle pooled connections.
+            timeout (float | tuple[float, float] | None): The timeout of each request in seconds, either in total or
+                as a pair of connection and read timeouts. Defaults to no timeout.
+            retries (int | Retry): The maximum number of retries of the `RetryPolicy`, or a custom urllib3 policy.
+                The backoff uses `poll_interval_initial_sec` as factor and `poll_max_random_delay_sec` as jitter.
+            poll_mode (Literal["adaptive", "fixed"]): Whether to schedule the polls of trials from the latency
+                observed in each match, or always with the fixed exponential backoff from `poll_interval_initial_sec`.
+            metrics (MetricsRegistry | None): The registry of the metrics of requests, submissions, polls and retries.
+                Defaults to no metrics.
+            fetch_trial (FetchTrial | None): A query returning the status, evaluation, score and solution of a trial
+                in one request, e.g. `opthub_client.models.trial.fetch_trial` with the credentials of `opt login`.
+                Defaults to the REST API, which needs a request per result.
+            outbox (SubmissionOutbox | None): The outbox of `Match.submit_nowait`. Its senders are started at once
+                and stopped when the API is closed. Defaults to no outbox.
+        """
+        self._settings = {
+            "api_key": api_key,
+            "host": host,
+            "pool_maxsize": pool_maxsize,
+            "keep_alive": keep_alive,
+            "timeout": timeout,
+            "retries": retries,
+            "poll_mode": poll_mode,
+            "fetch_trial": fetch_trial,
+        }
+        self.cache = cache
+        self.poll_mode = poll_mode
+        self.latency = LatencyEstimator()
+        self.metrics = metrics
+        self.fetch_trial = fetch_trial
+        self.request_timeout = _request_timeout(timeout)
+        conf = Configuration(host=host)
         conf.api_key["ApiKeyAuth"] = api_key
+        conf.connection_pool_maxsize = pool_maxsize or max(conf.connection_pool_maxsize, DEFAULT_POOL_MAXSIZE)
+        if keep_alive:
+            conf.socket_options = [  # type: ignore[assignment] # declared as None by the generated client
+                *HTTPConnection.default_socket_options,
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        if isinstance(retries, int):
+            retries = RetryPolicy(
+                total=retries,
+                status_forcelist=RetryPolicy.RETRY_STATUSES,
+                backoff_factor=self.poll_interval_initial_sec,
+                backoff_jitter=self.poll_max_random_delay_sec,
+                raise_on_status=False,
+            )
+        if isinstance(retries, RetryPolicy):
+            retries.metrics = metrics
+        conf.retries = retries
+
+        self.client = ApiClient(conf)
+        self.trials_api = MatchTrialsApi(self.client)
+        self._matches: WeakValueDictionary[UUID, Match] = WeakValueDictionary()
+        self._matches_lock = threading.Lock()
+        self.outbox = outbox
+        if outbox is not None:
+            outbox.start(self)
+        _INSTANCES.add(self)
+
+    def match(self, uuid: str | UUID, scheduler: SubmissionScheduler | None = None) -> Match:
+        """Retrieve a match by its UUID.
 
-        self.client = raw.ApiClient(conf)
+        The same `Match` is returned for the same UUID as long as it is referenced, e.g. by its trials.
 
-    def match(self, uuid: str | UUID) -> Match:
-        """Retrieve a match by its UUID."""
-        match = Match()
-        match.uuid = uuid if isinstance(uuid, UUID) else UUID(uuid)
-        match.api = self
+        Args:
+            uuid (str | UUID): The match UUID
+            scheduler (SubmissionScheduler | None): The scheduler of the submissions to the match. If given, it
+                replaces the scheduler of the match.
+        """
+        uuid = uuid if isinstance(uuid, UUID) else UUID(uuid)
+        with self._matches_lock:
+            match = self._matches.get(uuid)
+            if match is None:
+                match = Match()
+                match.uuid = uuid
+                match.api = self
+                match.scheduler = None
+                match.subscription = None
+                match._lock = threading.Lock()  # noqa: SLF001
+                self._matches[uuid] = match
+            if scheduler is not None:
+                match.scheduler = scheduler
 
         return match
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the API as its settings, so that another process rebuilds it with its own connection pool.
+
+        The cache, the metrics, the outbox and the subscriptions stay in this process. Unpickling in a process which
+        already has an API with the same settings returns that API.
+        """
+        settings = dict(self._settings)
+        retries = settings["retries"]
+        if isinstance(retries, RetryPolicy):
+            settings["retries"] = retries = retries.new()
+            retries.metrics = None
+        polling = {name: value for name, value in vars(self).items() if name.startswith("poll_")}
+        key = pickle.dumps((settings, polling))
+        with _RESTORED_LOCK:
+            _PICKLED.setdefault(key, self)
+        return _restore_api, (key,)
+
+    def _reset_after_fork(self) -> None:
+        """Drop the state inherited from the parent process which cannot be shared with it.
+
+        The pooled connections and the open cache file are shared with the parent, and the threads of the subscriptions
+        and the outbox senders do not exist in the child, so a forked process opens its own connections, keeps its cache
+        in memory and has no subscription or outbox.
+        """
+        self.client.rest_client.pool_manager.clear()
+        if self.cache is not None:
+            self.cache._reset_after_fork()  # noqa: SLF001
+        self.outbox = None
+        self._matches_lock = threading.Lock()
+        for match in list(self._matches.values()):
+            match.subscription = None
+            match._lock = threading.Lock()  # noqa: SLF001
+
     def __enter__(self) -> TOptHub:
         """A method to enable the use of the `with` statement."""
-        self.client.__enter__()
+        self.client.__enter__()  # type: ignore[no-untyped-call]
         return self
 
     def __exit__(self, *args: object) -> None:
         """A method to enable the use of the `with` statement."""
-        self.client.__exit__(*args)
+        if self.outbox is not None:
+            self.outbox.close()
+        if self.cache is not None:
+            self.cache.close()
+        self.client.__exit__(*args)  # type: ignore[no-untyped-call]
+
+
+def _request_timeout(timeout: float | tuple[float, float] | None) -> float | tuple[float, float] | None:
+    """Convert a timeout to the float values accepted by the generated client."""
+    if isinstance(timeout, tuple):
+        return float(timeout[0]), float(timeout[1])
+    return None if timeout is None else float(timeout)
+
+
+def _track_request(metrics: MetricsRegistry | None, endpoint: str) -> AbstractContextManager[None]:
+    """Count and time a request in the metrics, if any."""
+    return nullcontext() if metrics is None else metrics.track_request(endpoint)
+
+
+def _urllib3_timeout(timeout: float | tuple[float, float] | None) -> urllib3.Timeout | None:
+    """Convert a timeout of the generated client into a urllib3 timeout."""
+    if isinstance(timeout, tuple):
+        return urllib3.Timeout(connect=timeout[0], read=timeout[1])
+    return None if timeout is None else urllib3.Timeout(total=timeout)
+
+
+def _encode_variable(variable: dict[str, float | list[float]]) -> bytes:
+    """Encode the request body of a submission in one call of the C JSON encoder.
+
+    Raises:
+        ValueError: If the solution contains NaN or infinity, which are not valid JSON.
+    """
+    return json.dumps({"variable": variable}, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _encode_rows(solutions: ArrayLike) -> list[bytes]:
+    """Encode the request bodies of the rows of a 2-D array of solutions in bulk.
+
+    Raises:
+        ValueError: If `solutions` is not 2-D or contains NaN or infinity.
+    """
+    array = np.asarray(solutions, dtype=np.double)
+    if array.ndim != 2:  # noqa: PLR2004
+        msg = f"Expected a 2-D array of solutions, got {array.ndim}-D."
+        raise ValueError(msg)
+    return [_encode_variable({"vector": row}) for row in array.tolist()]
+
+
+def _batch_evaluation(trials: list[Trial | None], evaluations: list[MatchTrialEvaluation | None]) -> BatchEvaluation:
+    """Stack the evaluations of a batch into arrays."""
+    succeeded = [
+        evaluation if evaluation is not None and evaluation.error is None and evaluation.objective is not None else None
+        for evaluation in evaluations
+    ]
+    objectives = [_scalar_or_vector(evaluation.objective) if evaluation else [] for evaluation in succeeded]
+    constraints = [_scalar_or_vector(evaluation.constraint) if evaluation else [] for evaluation in succeeded]
+    errors = np.array([evaluation is None for evaluation in succeeded], dtype=bool)
+    feasible = np.array(
+        [evaluation is not None and evaluation.feasible is not False for evaluation in succeeded],
+        dtype=bool,
+    )
+    return BatchEvaluation(
+        objectives=_stack_rows(objectives, errors),
+        constraints=_stack_rows(constraints, errors),
+        feasible=feasible,
+        errors=errors,
+        trials=trials,
+    )
+
+
+def _scalar_or_vector(value: ScalarOrVector | None) -> list[float]:
+    """Convert an objective or constraint value into a list of floats."""
+    if value is None:
+        return []
+    return [value.scalar] if value.scalar is not None else list(value.vector or [])
+
+
+def _stack_rows(rows: list[list[float]], errors: np.ndarray) -> np.ndarray:
+    """Stack rows of values into a 2-D array, padding short rows and failed rows with NaN."""
+    array = np.full((len(rows), max(map(len, rows), default=0)), np.nan)
+    for i, row in enumerate(rows):
+        if not errors[i]:
+            array[i, : len(row)] = row
+    return array
+
+
+def _compact(model: MatchTrialEvaluation | MatchTrialScore) -> bytes:
+    """Encode an evaluation or a score into compact JSON bytes."""
+    return model.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+def trial_result_from_graphql(data: TrialData) -> TrialResult:
+    """Convert a trial of the OptHub GraphQL API into the models of the REST API.
+
+    The evaluation and the score are `None` until they have finished.
+    """
+    evaluation = data["evaluation"]
+    score = data["score"]
+    solution = data["solution"]
+    return TrialResult(
+        status=trial_status(data["status"]),
+        evaluation=MatchTrialEvaluation.from_dict(
+            {
+                "status": evaluation["status"],
+                "error": evaluation["error"],
+                "objective": _graphql_scalar_or_vector(evaluation["objective"]),
+                "constraint": _graphql_scalar_or_vector(evaluation["constraint"]),
+                "info": _graphql_json_object(evaluation["info"]),
+                "feasible": evaluation["feasible"],
+                "startedAt": evaluation["started_at"],
+                "finishedAt": evaluation["finished_at"],
+            },
+        )
+        if evaluation is not None and evaluation["finished_at"] is not None
+        else None,
+        score=MatchTrialScore.from_dict(
+            {
+                "status": score["status"],
+                "error": score["error"],
+                "value": score["value"],
+                "startedAt": score["started_at"],
+                "finishedAt": score["finished_at"],
+            },
+        )
+        if score is not None and score["finished_at"] is not None
+        else None,
+        solution=Solution.from_dict(
+            {"variable": _graphql_scalar_or_vector(solution["variable"]), "createdAt": solution["created_at"]},
+        )
+        if solution is not None and solution["variable"] is not None
+        else None,
+    )
+
+
+def _graphql_scalar_or_vector(value: Any) -> dict[str, Any] | None:  # noqa: ANN401
+    """Convert a GraphQL objective, constraint or variable value into the REST representation."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return {"vector": value}
+    return {"scalar": value}
+
+
+def _graphql_json_object(value: Any) -> dict[str, Any] | None:  # noqa: ANN401
+    """Convert a GraphQL AWSJSON value into a JSON object."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value if isinstance(value, dict) else None
+
+
+# The APIs of this process, whose connection pools are reset in forked children
+_INSTANCES: WeakSet[OptHub] = WeakSet()
+# The pickled APIs of this process by pickled settings, so that unpickling in the same process returns them
+_PICKLED: WeakValueDictionary[bytes, OptHub] = WeakValueDictionary()
+# The APIs unpickled in this process, kept for the next unpickling so that their connection pools are reused
+_RESTORED: dict[bytes, OptHub] = {}
+_RESTORED_LOCK = threading.Lock()
+
+
+def _restore_api(key: bytes) -> OptHub:
+    """Get the API of this process with the pickled settings, creating it if necessary."""
+    with _RESTORED_LOCK:
+        api = _PICKLED.get(key) or _RESTORED.get(key)
+        if api is None:
+            settings, polling = pickle.loads(key)  # noqa: S301 pickled by OptHub.__reduce__
+            api = OptHub(**settings)
+            for name, value in polling.items():
+                setattr(api, name, value)
+            _RESTORED[key] = api
+        return api
+
+
+def _restore_match(api: OptHub, uuid: UUID) -> Match:
+    """Get the match of an unpickled API."""
+    return api.match(uuid)
+
+
+def _restore_trial(
+    match: Match,
+    trial_no: int,
+    status: MatchTrialStatus,
+    evaluation: bytes | None,
+    score: bytes | None,
+) -> Trial:
+    """Rebuild a pickled trial."""
+    trial = Trial()
+    trial.trial_no = trial_no
+    trial.status = trial_status(status)
+    trial._evaluation = evaluation  # noqa: SLF001
+    trial._score = score  # noqa: SLF001
+    trial.match = match
+    trial.submitted_at = None
+    return trial
+
+
+def _reset_after_fork() -> None:
+    """Reset the state of the APIs inherited by a forked child process."""
+    global _RESTORED_LOCK  # noqa: PLW0603
+    _RESTORED_LOCK = threading.Lock()
+    for api in list(_INSTANCES):
+        api._reset_after_fork()  # noqa: SLF001
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
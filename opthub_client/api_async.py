@@ -0,0 +1,297 @@
+"""Asynchronous access to the OptHub public REST API.
+
+The module provides asyncio counterparts of `OptHub`, `Match` and `Trial` in `opthub_client.api`.
+All requests of an `AsyncOptHub` share one non-blocking aiohttp session, so many trials can be waited for on a
+single event loop without a thread per trial.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+from uuid import UUID
+
+import aiohttp
+import numpy as np
+from opthub_api_client import exceptions
+from opthub_api_client.configuration import Configuration
+from opthub_api_client.exceptions import ApiException
+from opthub_api_client.models.match_trial_evaluation import MatchTrialEvaluation
+from opthub_api_client.models.match_trial_response import MatchTrialResponse
+from opthub_api_client.models.match_trial_score import MatchTrialScore
+from opthub_api_client.models.match_trial_status import MatchTrialStatus
+from opthub_api_client.models.solution import Solution
+
+from opthub_client.api import (
+    DEFAULT_POOL_MAXSIZE,
+    EvaluationError,
+    PollingSettings,
+    ScoringError,
+    TrialStatus,
+    _encode_variable,
+    is_trial_not_found,
+    trial_status,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from numpy.typing import ArrayLike
+
+T = TypeVar("T")
+
+__all__ = [
+    "AsyncOptHub",
+    "AsyncMatch",
+    "AsyncTrial",
+]
+
+
+class AsyncTrial:
+    """A class representing the match trial, with awaitable methods."""
+
+    trial_no: int
+    status: TrialStatus
+    evaluation: MatchTrialEvaluation | None
+    score: MatchTrialScore | None
+    match: AsyncMatch
+
+    async def wait_evaluation(self, timeout: float | None = None) -> MatchTrialEvaluation:
+        """Wait until the evaluation is complete, then return the results."""
+        await self._poll(
+            self.update_status,
+            lambda _: self.status.type != MatchTrialStatus.EVALUATING,
+            timeout,
+            first_wait=False,
+        )
+
+        data = await self.match.api.request("GET", self._path("evaluation"))
+        self.evaluation = evaluation = MatchTrialEvaluation.model_validate(data)
+
+        if evaluation.error is not None:
+            raise EvaluationError(evaluation.error)
+
+        return evaluation
+
+    async def wait_scoring(self, timeout: float | None = None) -> MatchTrialScore:
+        """Wait until the scoring is complete, then return the results."""
+        await self._poll(
+            self.update_status,
+            lambda _: self.status.type not in {MatchTrialStatus.EVALUATING, MatchTrialStatus.SCORING},
+            timeout,
+            first_wait=False,
+        )
+
+        data = await self.match.api.request("GET", self._path("score"))
+        self.score = score = MatchTrialScore.model_validate(data)
+
+        if score.error is not None:
+            raise ScoringError(score.error)
+
+        return score
+
+    async def get_solution(self) -> Solution:
+        """Retrieves a past submitted solution."""
+        return Solution.model_validate(await self.match.api.request("GET", self._path("solution")))
+
+    async def update_status(self) -> None:
+        """Retrieves the status of the trial.
+
+        Wait until the submitted results are reflected on the server side and the trial information becomes available.
+        """
+        trial = await self._poll(
+            lambda: self.match.try_get_trial(self.trial_no),
+            lambda trial: trial is not None,
+            None,
+            first_wait=False,
+        )
+        if trial is not None:  # always found once the polling ends
+            self.status = trial.status
+
+    def _path(self, resource: str) -> str:
+        return f"/matches/{self.match.uuid}/trials/{self.trial_no}/{resource}"
+
+    async def _poll(
+        self,
+        callback: Callable[[], Awaitable[T]],
+        finish_condition: Callable[[T], bool],
+        timeout: float | None,
+        first_wait: bool,
+    ) -> T:
+        """Perform polling based on exponential backoff without blocking the event loop."""
+        start = time.time()
+        intervals = self.match.api.poll_intervals()
+
+        if first_wait:
+            await asyncio.sleep(next(intervals))
+
+        while True:
+            result = await callback()
+            if finish_condition(result):
+                return result
+
+            if timeout is not None and (time.time() - start) > timeout:
+                raise TimeoutError
+
+            await asyncio.sleep(next(intervals))
+
+
+class AsyncMatch:
+    """A class representing a match in a competition, with awaitable methods."""
+
+    uuid: UUID
+    api: AsyncOptHub
+
+    async def submit(self, solution: ArrayLike) -> AsyncTrial:
+        """Submit a solution.
+
+        Raises:
+            ValueError: If the solution contains NaN or infinity
+        """
+        array = np.asarray(solution, dtype=np.double)
+        variable: dict[str, float | list[float]] = (
+            {"scalar": float(array)} if array.ndim == 0 else {"vector": array.tolist()}
+        )
+
+        data = await self.api.request("POST", f"/matches/{self.uuid}/trials", _encode_variable(variable))
+        response = MatchTrialResponse.model_validate(data)
+
+        return self._trial(response.trial_no, trial_status(response.status))
+
+    async def try_get_trial(self, trial_no: int) -> AsyncTrial | None:
+        """Retrieves the status of the trial with the specified trial number.
+
+        If the corresponding trial number does not exist, it returns `None`.
+        """
+        try:
+            data = await self.api.request("GET", f"/matches/{self.uuid}/trials/{trial_no}")
+        except exceptions.NotFoundException as e:
+            if is_trial_not_found(e):
+                return None
+            raise
+
+        response = MatchTrialResponse.model_validate(data)
+        return self._trial(trial_no, trial_status(response.status))
+
+    async def get_trial(self, trial_no: int) -> AsyncTrial:
+        """Retrieves the status of the trial with the specified trial number.
+
+        If the corresponding trial number does not exist, an exception is raised.
+        """
+        trial = await self.try_get_trial(trial_no)
+
+        if trial is None:
+            msg = "No such trial number."
+            raise ValueError(msg)
+
+        return trial
+
+    def _trial(self, trial_no: int, status: TrialStatus) -> AsyncTrial:
+        trial = AsyncTrial()
+        trial.trial_no = trial_no
+        trial.status = status
+        trial.evaluation = None
+        trial.score = None
+        trial.match = self
+        return trial
+
+
+class AsyncOptHub(PollingSettings):
+    """A class for accessing the OptHub public REST API from asyncio code.
+
+    Use it with `async with` so that the underlying HTTP session is closed.
+    """
+
+    host: str
+    session: aiohttp.ClientSession | None
+    pool_maxsize: int
+    timeout: aiohttp.ClientTimeout
+
+    def __init__(
+        self,
+        api_key: str,
+        host: str | None = None,
+        pool_maxsize: int | None = None,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> None:
+        """Creates an instance for API access from an API key.
+
+        Args:
+            api_key (str): The API key
+            host (str | None): The API endpoint. Defaults to the OptHub public REST API.
+            pool_maxsize (int | None): The maximum number of concurrent connections of the session. Defaults to the
+                larger of `DEFAULT_POOL_MAXSIZE` and 5 per CPU, as the connection pool of `OptHub`.
+            timeout (float | tuple[float, float] | None): The timeout of each request in seconds, either in total or
+                as a pair of connection and read timeouts. Defaults to no timeout, as `OptHub`.
+        """
+        conf = Configuration(host=host)
+        self.host = conf.host
+        self.pool_maxsize = pool_maxsize or max(conf.connection_pool_maxsize, DEFAULT_POOL_MAXSIZE)
+        self.timeout = _client_timeout(timeout)
+        self._headers = {"x-api-key": api_key, "Accept": "application/json"}
+        self.session = None
+
+    def match(self, uuid: str | UUID) -> AsyncMatch:
+        """Retrieve a match by its UUID."""
+        match = AsyncMatch()
+        match.uuid = uuid if isinstance(uuid, UUID) else UUID(uuid)
+        match.api = self
+
+        return match
+
+    async def request(self, method: str, path: str, body: bytes | None = None) -> Any:  # noqa: ANN401
+        """Send a request on the shared session and return the decoded JSON response.
+
+        The body is JSON encoded by the caller, e.g. with `_encode_variable`, which rejects NaN and infinity.
+
+        Raises:
+            opthub_api_client.ApiException: The same exception types as the synchronous API for error responses.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers=self._headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                timeout=self.timeout,
+            )
+
+        headers = None if body is None else {"Content-Type": "application/json"}
+        async with self.session.request(method, self.host + path, data=body, headers=headers) as response:
+            text = await response.text()
+            if not 200 <= response.status <= 299:  # noqa: PLR2004
+                raise _api_exception(response.status, response.reason, text)
+        return json.loads(text)
+
+    async def close(self) -> None:
+        """Close the HTTP session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> Self:
+        """A method to enable the use of the `async with` statement."""
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        """A method to enable the use of the `async with` statement."""
+        await self.close()
+
+
+def _client_timeout(timeout: float | tuple[float, float] | None) -> aiohttp.ClientTimeout:
+    """Convert a timeout of `OptHub` into an aiohttp timeout."""
+    if isinstance(timeout, tuple):
+        return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+def _api_exception(status: int, reason: str | None, body: str) -> ApiException:
+    """Map an error response to the exception type raised by the generated client."""
+    types: dict[int, type[ApiException]] = {
+        400: exceptions.BadRequestException,
+        401: exceptions.UnauthorizedException,
+        403: exceptions.ForbiddenException,
+        404: exceptions.NotFoundException,
+    }
+    exception_type = exceptions.ServiceException if 500 <= status <= 599 else types.get(status, ApiException)  # noqa: PLR2004
+    return exception_type(status=status, reason=reason, body=body)
@@ -13,6 +13,7 @@ from jwcrypto import jwk  # type: ignore[import-untyped]
 from opthub_client.context.cipher_suite import CipherSuite
 from opthub_client.context.utils import get_opthub_client_dir
 from opthub_client.errors.authentication_error import AuthenticationError, AuthenticationErrorMessage
+from opthub_client.trace import traced
 
 FILE_NAME = "credentials"
 CLIENT_ID = "7t7snlnn801j8mjsf97eaart1s"
@@ -33,6 +34,7 @@ class Credentials:
         """Initialize the credentials context with a persistent temporary file."""
         self.file_path = get_opthub_client_dir() / FILE_NAME
 
+    @traced("credentials.load")
     def load(self) -> None:
         """Load the credentials from the shelve file."""
         try:
@@ -80,6 +82,7 @@ class Credentials:
         expire_at_timestamp = int(self.expire_at)
         return current_time > expire_at_timestamp
 
+    @traced("credentials.refresh")
     def refresh_access_token(self) -> None:
         """Refresh the access token using refresh token.
 
@@ -134,6 +137,7 @@ class Credentials:
         self.uid = None
         self.username = None
 
+    @traced("credentials.jwks")
     def get_jwks_public_key(self, access_token: str) -> Any:  # noqa: ANN401
         """Get the public key from the JWKS URL.
 
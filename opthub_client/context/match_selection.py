@@ -1,12 +1,16 @@
 """This module contains the class related to match selection context."""
 
 import shelve
+from collections.abc import Sequence
+from typing import Any
 
 from opthub_client.context.utils import get_opthub_client_dir
 from opthub_client.errors.cache_io_error import CacheIOError, CacheIOErrorMessage
+from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.user_input_error import UserInputError, UserInputErrorMessage
-from opthub_client.models.competition import Competition, fetch_competitions_by_user
-from opthub_client.models.match import Match, fetch_matches_by_competition
+from opthub_client.graphql.client import GraphQLRequest, execute_graphql_batch
+from opthub_client.models.competition import GET_COMPETITIONS_BY_PARTICIPANT_USER, Competition, parse_competitions
+from opthub_client.models.match import GET_MATCHES_BY_COMPETITION, Match, parse_matches
 
 FILE_NAME = "match_selection"
 
@@ -41,6 +45,27 @@ class MatchSelectionContext:
             db["match_alias"] = match["alias"]
             db["competition_alias"] = competition["alias"]
             db.sync()
+        self.competition_id = competition["id"]
+        self.match_id = match["id"]
+        self.match_alias = match["alias"]
+        self.competition_alias = competition["alias"]
+
+    def get_aliases(self, match: str | None, competition: str | None) -> tuple[str | None, str | None]:
+        """Get the aliases of the match and the competition, defaulting to the selected ones.
+
+        Args:
+            match (str | None): The alias of the match. If None, it uses the default value from `MatchSelectionContext`.
+            competition (str | None): The alias of the competition.
+                                      If None, it uses the default value from `MatchSelectionContext`.
+
+        Returns:
+            tuple[str | None, str | None]: The aliases of the match and the competition, None if not selected.
+        """
+        if match is None:
+            match = self.match_alias
+        if competition is None:
+            competition = self.competition_alias
+        return match, competition
 
     def get_selection(self, match: str | None, competition: str | None) -> tuple[Competition, Match]:
         """Select a competition and match based on the provided aliases.
@@ -48,6 +73,7 @@ class MatchSelectionContext:
         This method allows you to select a competition and a match by their aliases.
         If no aliases are provided, it will use default values from `MatchSelectionContext`.
         If the competition or match cannot be found, it raises an appropriate error or exits the program.
+        The competitions and the matches are fetched in one request.
 
         Args:
             match (str | None): The alias of the match to select.
@@ -59,25 +85,10 @@ class MatchSelectionContext:
             tuple[Competition, Match]: A tuple containing the selected competition and match objects.
 
         """
-        match_selection_context = MatchSelectionContext()
-        if match is None:
-            match = match_selection_context.match_alias
-        if competition is None:
-            competition = match_selection_context.competition_alias
+        match, competition = self.get_aliases(match, competition)
         if competition is None or match is None:
             raise CacheIOError(CacheIOErrorMessage.MATCH_SELECTION_FILE_READ_FAILED)
-        # competitions aliases for choices
-        competitions = fetch_competitions_by_user()
-        selected_competition = next((c for c in competitions if c["alias"] == competition), None)
-        if selected_competition is None:
-            raise UserInputError(UserInputErrorMessage.COMPETITION_ERROR)
-        matches = fetch_matches_by_competition(selected_competition["id"], selected_competition["alias"])
-        selected_match = next((m for m in matches if m["alias"] == match), None)
-        if selected_competition is None:
-            raise UserInputError(UserInputErrorMessage.COMPETITION_ERROR)
-        if selected_match is None:
-            raise UserInputError(UserInputErrorMessage.MATCH_ERROR)
-        return selected_competition, selected_match
+        return select_match(execute_graphql_batch(selection_requests(competition)), match, competition)
 
     def get_match(self, match: str | None, competition: str | None) -> Match:
         """Select a match based on the provided aliases.
@@ -85,6 +96,7 @@ class MatchSelectionContext:
         This method allows you to select a match by its alias within a specified competition.
         If no aliases are provided, it will use default values from `MatchSelectionContext`.
         If the competition or match cannot be found, it raises an appropriate error or exits the program.
+        The competitions and the matches are fetched in one request.
 
         Args:
             match (str | None): The alias of the match to select.
@@ -95,21 +107,51 @@ class MatchSelectionContext:
         Returns:
             Match: The selected match object.
         """
-        match_selection_context = MatchSelectionContext()
-        if match is None:
-            match = match_selection_context.match_alias
-        if competition is None:
-            competition = match_selection_context.competition_alias
+        match, competition = self.get_aliases(match, competition)
         if competition is None or match is None:
             raise CacheIOError(CacheIOErrorMessage.MATCH_NOT_SELECTED)
-        competitions = fetch_competitions_by_user()
-        selected_competition = next((c for c in competitions if c["alias"] == competition), None)
-        if selected_competition is None:
-            raise UserInputError(UserInputErrorMessage.COMPETITION_ERROR)
-        matches = fetch_matches_by_competition(selected_competition["id"], selected_competition["alias"])
-        selected_match = next((m for m in matches if m["alias"] == match), None)
-        if selected_competition is None:
-            raise UserInputError(UserInputErrorMessage.COMPETITION_ERROR)
-        if selected_match is None:
-            raise UserInputError(UserInputErrorMessage.MATCH_ERROR)
-        return selected_match
+        return select_match(execute_graphql_batch(selection_requests(competition)), match, competition)[1]
+
+
+def selection_requests(competition: str) -> list[GraphQLRequest]:
+    """Get the queries of the competitions of the user and of the matches of a competition, to be batched.
+
+    The matches are fetched by the alias of the competition, so that both queries are sent in one request.
+
+    Args:
+        competition (str): The alias of the competition
+
+    Returns:
+        list[GraphQLRequest]: The queries, whose results are passed to `select_match`
+    """
+    return [
+        GraphQLRequest(GET_COMPETITIONS_BY_PARTICIPANT_USER),
+        GraphQLRequest(GET_MATCHES_BY_COMPETITION, {"alias": competition}),
+    ]
+
+
+def select_match(
+    results: Sequence[dict[str, Any] | GraphQLError],
+    match: str,
+    competition: str,
+) -> tuple[Competition, Match]:
+    """Select a competition and match from the results of the queries of `selection_requests`.
+
+    Args:
+        results (Sequence[dict[str, Any] | GraphQLError]): The results of the queries
+        match (str): The alias of the match to select
+        competition (str): The alias of the competition to select
+
+    Returns:
+        tuple[Competition, Match]: A tuple containing the selected competition and match objects.
+    """
+    competitions_result, matches_result = results
+    competitions = parse_competitions(competitions_result)
+    selected_competition = next((c for c in competitions if c["alias"] == competition), None)
+    if selected_competition is None:
+        raise UserInputError(UserInputErrorMessage.COMPETITION_ERROR)
+    matches = parse_matches(matches_result)
+    selected_match = next((m for m in matches if m["alias"] == match), None)
+    if selected_match is None:
+        raise UserInputError(UserInputErrorMessage.MATCH_ERROR)
+    return selected_competition, selected_match
@@ -0,0 +1,257 @@
+"""This module contains the cache of finished trial results."""
+
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from pathlib import Path
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from opthub_api_client.models.match_trial_evaluation import MatchTrialEvaluation
+from opthub_api_client.models.match_trial_score import MatchTrialScore
+from opthub_api_client.models.match_trial_status import MatchTrialStatus
+from opthub_api_client.models.solution import Solution
+
+from opthub_client.context.utils import get_opthub_client_dir
+
+FILE_NAME = "trial_results"
+
+# Statuses after which the evaluation, score and solution of a trial never change
+TERMINAL_STATUSES = frozenset(
+    {MatchTrialStatus.SUCCESS, MatchTrialStatus.EVALUATOR_FAILED, MatchTrialStatus.SCORER_FAILED},
+)
+
+
+class CachedTrialResult(NamedTuple):
+    """The cached results of a finished trial. Results which have not been retrieved yet are `None`."""
+
+    status: MatchTrialStatus
+    evaluation: MatchTrialEvaluation | None
+    score: MatchTrialScore | None
+    solution: Solution | None
+
+
+class TrialResultCache:
+    """An LRU cache of the results of finished trials, kept in memory and on disk.
+
+    Only trials in a terminal status (success, evaluator_failed or scorer_failed) are cached, so a cached result is
+    never stale. Entries are keyed by the match UUID and the trial number.
+
+    The shelve file stays open, and the stored and used entries are written to it in batches, every `sync_every`
+    changes or `sync_interval_sec` seconds, and when the cache is flushed or closed. The order of use of the entries is
+    stored with them, so that the least recently used ones are evicted first after a restart.
+    """
+
+    max_entries: int
+    file_path: Path | None
+    sync_every: int
+    sync_interval_sec: float
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        *,
+        persistent: bool = True,
+        file_path: Path | None = None,
+        sync_every: int = 100,
+        sync_interval_sec: float = 5.0,
+    ) -> None:
+        """Initialize the cache, loading the entries stored on disk.
+
+        Args:
+            max_entries (int): The maximum number of cached trials. The least recently used trials are evicted first.
+            persistent (bool): Whether to store the entries on disk. Defaults to True.
+            file_path (Path | None): The shelve file. Defaults to `trial_results` in the opthub client directory.
+            sync_every (int): The number of changed entries after which they are written to disk.
+            sync_interval_sec (float): The maximum time in seconds before changed entries are written to disk.
+        """
+        self.max_entries = max_entries
+        self.file_path = (file_path or get_opthub_client_dir() / FILE_NAME) if persistent else None
+        self.sync_every = sync_every
+        self.sync_interval_sec = sync_interval_sec
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._clock = count()
+        self._lock = threading.Lock()
+        self._store: shelve.Shelf[dict[str, Any]] | None = None
+        self._changed: set[str] = set()
+        self._deleted: set[str] = set()
+        self._synced_at = time.monotonic()
+        self.load()
+
+    def load(self) -> None:
+        """Load the entries from the shelve file, the least recently used first."""
+        if self.file_path is None:
+            return
+        with self._lock:
+            store = self._open()
+            entries = sorted(store.items(), key=lambda item: item[1]["used"])
+            kept = entries[-self.max_entries :] if self.max_entries > 0 else []
+            for key, _ in entries[: len(entries) - len(kept)]:
+                del store[key]
+            store.sync()
+            self._entries = OrderedDict(kept)
+            self._clock = count(max((entry["used"] for entry in self._entries.values()), default=-1) + 1)
+            self._changed.clear()
+            self._deleted.clear()
+
+    def get(self, match_uuid: UUID, trial_no: int) -> CachedTrialResult | None:
+        """Get the cached results of a trial.
+
+        Args:
+            match_uuid (UUID): The match UUID
+            trial_no (int): The trial number
+
+        Returns:
+            CachedTrialResult | None: The cached results, or `None` if the trial is not cached
+        """
+        key = _key(match_uuid, trial_no)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            entry["used"] = next(self._clock)
+            self._change(key)
+        return CachedTrialResult(
+            status=MatchTrialStatus(entry["status"]),
+            evaluation=MatchTrialEvaluation.from_dict(entry["evaluation"]) if entry["evaluation"] else None,
+            score=MatchTrialScore.from_dict(entry["score"]) if entry["score"] else None,
+            solution=Solution.from_dict(entry["solution"]) if entry["solution"] else None,
+        )
+
+    def put(
+        self,
+        match_uuid: UUID,
+        trial_no: int,
+        status: MatchTrialStatus,
+        evaluation: MatchTrialEvaluation | None = None,
+        score: MatchTrialScore | None = None,
+        solution: Solution | None = None,
+    ) -> None:
+        """Cache the results of a trial, merged with the results already cached.
+
+        Nothing is cached unless the status is terminal.
+
+        Args:
+            match_uuid (UUID): The match UUID
+            trial_no (int): The trial number
+            status (MatchTrialStatus): The trial status
+            evaluation (MatchTrialEvaluation | None): The evaluation
+            score (MatchTrialScore | None): The score
+            solution (Solution | None): The solution
+        """
+        if status not in TERMINAL_STATUSES or self.max_entries <= 0:
+            return
+        key = _key(match_uuid, trial_no)
+        with self._lock:
+            entry = self._entries.pop(key, None) or {"evaluation": None, "score": None, "solution": None}
+            entry["status"] = status.value
+            entry["used"] = next(self._clock)
+            for name, result in (("evaluation", evaluation), ("score", score), ("solution", solution)):
+                if result is not None:
+                    entry[name] = result.to_dict()
+            self._entries[key] = entry
+            self._change(key)
+            while len(self._entries) > self.max_entries:
+                self._delete(self._entries.popitem(last=False)[0])
+
+    def invalidate(self, match_uuid: UUID, trial_no: int | None = None) -> None:
+        """Remove the cached results of a trial, or of all the trials of a match.
+
+        Args:
+            match_uuid (UUID): The match UUID
+            trial_no (int | None): The trial number. If `None`, all the trials of the match are removed.
+        """
+        prefix = f"{match_uuid}:"
+        with self._lock:
+            keys = (
+                [_key(match_uuid, trial_no)]
+                if trial_no is not None
+                else [k for k in self._entries if k.startswith(prefix)]
+            )
+            for key in keys:
+                self._entries.pop(key, None)
+                self._delete(key)
+            self._sync()
+
+    def clear(self) -> None:
+        """Remove all the cached results, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self._changed.clear()
+            self._deleted.clear()
+            if self.file_path is not None:
+                store = self._open()
+                store.clear()
+                store.sync()
+
+    def flush(self) -> None:
+        """Write the changed entries to disk."""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """Write the changed entries to disk and close the shelve file. It is opened again when it is next written."""
+        with self._lock:
+            self._sync()
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+    def __len__(self) -> int:
+        """The number of cached trials."""
+        return len(self._entries)
+
+    def _reset_after_fork(self) -> None:
+        """Keep the cache of a forked child process in memory, leaving the shelve file to the parent."""
+        self._lock = threading.Lock()
+        self._store = None
+        self.file_path = None
+        self._changed.clear()
+        self._deleted.clear()
+
+    def _open(self) -> shelve.Shelf[dict[str, Any]]:
+        """Open the shelve file, if it is not open yet. The caller holds the lock."""
+        if self._store is None:
+            self._store = shelve.open(str(self.file_path))  # noqa: S301 opthub-client#95
+        return self._store
+
+    def _change(self, key: str) -> None:
+        """Mark an entry to be written to disk, writing the batch if it is due. The caller holds the lock."""
+        self._changed.add(key)
+        self._deleted.discard(key)
+        self._sync_if_due()
+
+    def _delete(self, key: str) -> None:
+        """Mark an entry to be removed from disk. The caller holds the lock."""
+        self._deleted.add(key)
+        self._changed.discard(key)
+
+    def _sync_if_due(self) -> None:
+        if (
+            len(self._changed) + len(self._deleted) >= self.sync_every
+            or time.monotonic() - self._synced_at >= self.sync_interval_sec
+        ):
+            self._sync()
+
+    def _sync(self) -> None:
+        """Write the changed entries and remove the deleted ones on disk. The caller holds the lock."""
+        self._synced_at = time.monotonic()
+        if self.file_path is None or not (self._changed or self._deleted):
+            self._changed.clear()
+            self._deleted.clear()
+            return
+        store = self._open()
+        for key in self._deleted:
+            store.pop(key, None)
+        for key in self._changed:
+            store[key] = self._entries[key]
+        store.sync()
+        self._changed.clear()
+        self._deleted.clear()
+
+
+def _key(match_uuid: UUID, trial_no: int) -> str:
+    return f"{match_uuid}:{trial_no}"
@@ -2,8 +2,7 @@
 
 import click
 
-from opthub_client.context.match_selection import MatchSelectionContext
-from opthub_client.controllers.utils import check_current_version_status
+from opthub_client.controllers.utils import check_version_and_get_match
 from opthub_client.errors.authentication_error import AuthenticationError
 from opthub_client.errors.cache_io_error import CacheIOError
 from opthub_client.errors.fetch_error import FetchError
@@ -28,9 +27,7 @@ def show_trial(
 ) -> None:
     """Check submitted solution."""
     try:
-        check_current_version_status()
-        match_selection_context = MatchSelectionContext()
-        selected_match = match_selection_context.get_match(match, competition)
+        selected_match = check_version_and_get_match(match, competition)
         # display batch of solutions.
         trial = fetch_trial(selected_match["id"], trial_no=trial_no)
         display_trial(trial, detail)
@@ -7,8 +7,7 @@ from prompt_toolkit import HTML, PromptSession
 from prompt_toolkit.application import run_in_terminal
 from prompt_toolkit.key_binding import KeyBindings, KeyPressEvent
 
-from opthub_client.context.match_selection import MatchSelectionContext
-from opthub_client.controllers.utils import check_current_version_status
+from opthub_client.controllers.utils import check_version_and_get_match
 from opthub_client.errors.authentication_error import AuthenticationError
 from opthub_client.errors.cache_io_error import CacheIOError
 from opthub_client.errors.fetch_error import FetchError
@@ -52,9 +51,7 @@ def show_trials(
 ) -> None:
     """Check submitted solutions."""
     try:
-        check_current_version_status()
-        match_selection_context = MatchSelectionContext()
-        selected_match = match_selection_context.get_match(match, competition)
+        selected_match = check_version_and_get_match(match, competition)
         bindings = KeyBindings()
         page = 0
         has_all_trials_displayed = False
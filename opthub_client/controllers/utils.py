@@ -4,14 +4,49 @@ import sys
 
 import click
 
+from opthub_client.context.match_selection import MatchSelectionContext, select_match, selection_requests
 from opthub_client.context.version import get_version_from_init
-from opthub_client.models.remote_message import get_version_status_messages
+from opthub_client.errors.cache_io_error import CacheIOError, CacheIOErrorMessage
+from opthub_client.graphql.client import GraphQLRequest, execute_graphql_batch
+from opthub_client.models.match import Match
+from opthub_client.models.remote_message import (
+    GET_CLI_VERSION_STATUS,
+    RemoteMessage,
+    get_version_status_messages,
+    parse_version_status_messages,
+)
 
 
 def check_current_version_status() -> None:
     """This function gets the version message."""
     version = get_version_from_init()
-    messages = get_version_status_messages(version)
+    display_version_status(get_version_status_messages(version))
+
+
+def check_version_and_get_match(match: str | None, competition: str | None) -> Match:
+    """Check the version status and select a match.
+
+    The version status, the competitions and the matches are fetched in one request.
+
+    Args:
+        match (str | None): The alias of the match to select. If None, it uses the selected match.
+        competition (str | None): The alias of the competition to select. If None, it uses the selected competition.
+
+    Returns:
+        Match: The selected match object.
+    """
+    match, competition = MatchSelectionContext().get_aliases(match, competition)
+    if competition is None or match is None:
+        check_current_version_status()
+        raise CacheIOError(CacheIOErrorMessage.MATCH_NOT_SELECTED)
+    version_request = GraphQLRequest(GET_CLI_VERSION_STATUS, {"version": get_version_from_init()})
+    version_result, *selection_results = execute_graphql_batch([version_request, *selection_requests(competition)])
+    display_version_status(parse_version_status_messages(version_result))
+    return select_match(selection_results, match, competition)[1]
+
+
+def display_version_status(messages: list[RemoteMessage]) -> None:
+    """Display the version messages, and exit if any of them is an error."""
     exit_flag = False
     for message in messages:
         if message.label == "Error":
@@ -0,0 +1,264 @@
+"""An ask-tell optimization driver keeping the evaluator of a match busy.
+
+`AskTellDriver` keeps K trials in flight: as soon as any trial is scored, its result is told to the optimizer and a new
+solution is asked for and submitted, so that the evaluator never waits for the slowest trial of a generation.
+
+K is adjusted from the observed throughput and latency with Little's law: with K trials in flight, the throughput is
+K / latency as long as the evaluator keeps up. The driver aims at `headroom` times the concurrency which the evaluator
+can serve without queueing, i.e. the throughput times the minimum latency observed. K grows while the latency stays
+near its minimum, and shrinks when trials start queueing on the server.
+
+Example:
+    >>> driver = AskTellDriver(api.match(match_uuid), optimizer, budget=1000, target_score=0.0)
+    >>> result = driver.run()
+    >>> result.best.score.value
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import suppress
+from typing import TYPE_CHECKING, Literal, NamedTuple, Protocol
+
+from opthub_client.api import EvaluationError, ScoringError, Trial
+from opthub_client.scheduler import SubmissionRefusedError
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from opthub_client.api import Match
+
+StopReason = Literal["budget", "timeout", "target", "optimizer", "error"]
+
+
+class AskTellOptimizer(Protocol):
+    """An optimizer proposing solutions one by one and learning from their results."""
+
+    def ask(self) -> ArrayLike | None:
+        """Propose the next solution to evaluate, or `None` to stop the optimization."""
+
+    def tell(self, solution: ArrayLike, trial: Trial) -> None:
+        """Learn from a finished trial.
+
+        Args:
+            solution (ArrayLike): The solution returned by `ask`
+            trial (Trial): The trial of the solution, whose `evaluation` and `score` are retrieved. They have an
+                `error` if the evaluation or the scoring failed.
+        """
+
+
+class DriverResult(NamedTuple):
+    """The outcome of `AskTellDriver.run`."""
+
+    trials: list[Trial]
+    """The finished trials in the order of completion."""
+    best: Trial | None
+    """The successful trial with the best score, `None` if no trial has succeeded."""
+    reason: StopReason
+    """Why the driver stopped submitting."""
+    failures: list[tuple[ArrayLike, Exception]]
+    """The solutions whose submission or wait failed with an error other than a failed evaluation or scoring."""
+
+
+class AskTellDriver:
+    """A driver submitting the solutions of an ask-tell optimizer with adaptive concurrency.
+
+    The optimizer is only called from the thread running `run`, so it needs not be thread-safe.
+    """
+
+    match: Match
+    optimizer: AskTellOptimizer
+    budget: int | None
+    timeout: float | None
+    target_score: float | None
+    minimize: bool
+    min_in_flight: int
+    max_in_flight: int
+    headroom: float
+    max_consecutive_failures: int
+    in_flight: int
+
+    def __init__(
+        self,
+        match: Match,
+        optimizer: AskTellOptimizer,
+        *,
+        budget: int | None = None,
+        timeout: float | None = None,
+        target_score: float | None = None,
+        minimize: bool = True,
+        initial_in_flight: int = 4,
+        min_in_flight: int = 1,
+        max_in_flight: int = 64,
+        headroom: float = 1.25,
+        max_consecutive_failures: int = 3,
+    ) -> None:
+        """Initialize the driver.
+
+        Args:
+            match (Match): The match to submit the solutions to
+            optimizer (AskTellOptimizer): The optimizer
+            budget (int | None): The maximum number of submissions, or `None` for no limit besides the scheduler of the
+                match
+            timeout (float | None): The maximum time in seconds of the run. Trials still in flight are abandoned.
+            target_score (float | None): The score at which to stop, or `None` to run until the budget or the timeout
+            minimize (bool): Whether lower scores are better
+            initial_in_flight (int): The number of trials in flight at the start
+            min_in_flight (int): The lower bound of the number of trials in flight
+            max_in_flight (int): The upper bound of the number of trials in flight
+            headroom (float): The ratio of the number of trials in flight to the concurrency served without queueing.
+                Values above 1 keep a few trials queued so that the evaluator is never idle.
+            max_consecutive_failures (int): The number of failures in a row, e.g. of requests to an unavailable API,
+                at which the driver stops submitting. A failed solution counts towards the budget and is not told to
+                the optimizer.
+        """
+        self.match = match
+        self.optimizer = optimizer
+        self.budget = budget
+        self.timeout = timeout
+        self.target_score = target_score
+        self.minimize = minimize
+        self.min_in_flight = min_in_flight
+        self.max_in_flight = max_in_flight
+        self.headroom = headroom
+        self.max_consecutive_failures = max_consecutive_failures
+        self.in_flight = max(min_in_flight, min(initial_in_flight, max_in_flight))
+        self._completions: deque[tuple[float, float]] = deque()
+        self._min_latency = math.inf
+        self._window_start = time.monotonic()
+        self._trials: list[Trial] = []
+        self._best: Trial | None = None
+        self._reason: StopReason | None = None
+        self._submitted = 0
+        self._failures: list[tuple[ArrayLike, Exception]] = []
+        self._consecutive_failures = 0
+
+    def run(self) -> DriverResult:
+        """Run the optimization until the budget, the timeout, the target score or the end of the optimizer.
+
+        Trials still in flight when the budget, the target score, the end of the optimizer or too many consecutive
+        failures are reached are waited for and told to the optimizer.
+
+        Returns:
+            DriverResult: The finished trials, the best trial and the reason for stopping
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        self._trials = []
+        self._best = None
+        self._reason = None
+        self._submitted = 0
+        self._failures = []
+        self._consecutive_failures = 0
+        self._window_start = time.monotonic()
+        futures: dict[Future[Trial], ArrayLike] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="opthub-driver")
+        try:
+            while True:
+                self._refill(executor, futures, deadline)
+                if not futures:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done or not self._collect(done, futures):
+                    return DriverResult(self._trials, self._best, "timeout", self._failures)
+                self._adapt()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return DriverResult(self._trials, self._best, self._reason or "optimizer", self._failures)
+
+    def _refill(
+        self,
+        executor: ThreadPoolExecutor,
+        futures: dict[Future[Trial], ArrayLike],
+        deadline: float | None,
+    ) -> None:
+        """Ask for solutions and submit them until `in_flight` trials are in flight or the driver stops."""
+        while self._reason is None and len(futures) < self.in_flight:
+            if self.budget is not None and self._submitted >= self.budget:
+                self._reason = "budget"
+                return
+            solution = self.optimizer.ask()
+            if solution is None:
+                self._reason = "optimizer"
+                return
+            futures[executor.submit(self._evaluate, solution, deadline)] = solution
+            self._submitted += 1
+
+    def _collect(self, done: set[Future[Trial]], futures: dict[Future[Trial], ArrayLike]) -> bool:
+        """Tell the finished trials to the optimizer.
+
+        Returns:
+            bool: False if a trial has timed out
+        """
+        for future in done:
+            solution = futures.pop(future)
+            try:
+                trial = future.result()
+            except SubmissionRefusedError:
+                self._reason = self._reason or "budget"
+                continue
+            except TimeoutError:
+                return False
+            except Exception as error:
+                self._record_failure(solution, error)
+                continue
+            self._consecutive_failures = 0
+            self._trials.append(trial)
+            self.optimizer.tell(solution, trial)
+            if self._better(trial, self._best):
+                self._best = trial
+                if self._reached_target(trial):
+                    self._reason = self._reason or "target"
+        return True
+
+    def _record_failure(self, solution: ArrayLike, error: Exception) -> None:
+        """Record a failed solution, and stop submitting after `max_consecutive_failures` failures in a row."""
+        self._failures.append((solution, error))
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.max_consecutive_failures:
+            self._reason = self._reason or "error"
+
+    def _evaluate(self, solution: ArrayLike, deadline: float | None) -> Trial:
+        """Submit a solution and wait for its score in a worker thread."""
+        start = time.monotonic()
+        trial = self.match.submit(solution, None if deadline is None else max(0.0, deadline - start))
+        with suppress(EvaluationError, ScoringError):
+            trial.wait_scoring(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        latency = time.monotonic() - start
+        self._completions.append((time.monotonic(), latency))
+        return trial
+
+    def _better(self, trial: Trial, best: Trial | None) -> bool:
+        """Whether a trial has a better score than the best trial so far."""
+        score = trial.score
+        if score is None or score.error is not None or score.value is None:
+            return False
+        if best is None or best.score is None or best.score.value is None:
+            return True
+        return score.value < best.score.value if self.minimize else score.value > best.score.value
+
+    def _reached_target(self, trial: Trial) -> bool:
+        """Whether the score of a successful trial reaches the target score."""
+        if self.target_score is None or trial.score is None or trial.score.value is None:
+            return False
+        value = trial.score.value
+        return value <= self.target_score if self.minimize else value >= self.target_score
+
+    def _adapt(self) -> None:
+        """Adjust the number of trials in flight once every `in_flight` completions, with Little's law."""
+        if len(self._completions) < max(2, self.in_flight):
+            return
+        completions = [self._completions.popleft() for _ in range(len(self._completions))]
+        self._min_latency = min(self._min_latency, *(latency for _, latency in completions))
+        # The throughput over the window, from the end of the previous window to the last completion
+        elapsed = completions[-1][0] - self._window_start
+        self._window_start = completions[-1][0]
+        if elapsed <= 0:
+            return
+        throughput = len(completions) / elapsed
+        target = math.ceil(self.headroom * throughput * self._min_latency)
+        # Grow by at most one trial per window, so that queueing is detected before the evaluator is overloaded.
+        self.in_flight = max(self.min_in_flight, min(target, self.in_flight + 1, self.max_in_flight))
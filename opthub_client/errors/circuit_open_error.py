@@ -0,0 +1,18 @@
+"""This module contains the CircuitOpenError class."""
+
+from opthub_client.errors.graphql_error import GraphQLError
+
+
+class CircuitOpenError(GraphQLError):
+    """Exception raised without sending a request while the GraphQL API is considered unavailable."""
+
+    def __init__(self, retry_after_sec: float) -> None:
+        """Initialize the CircuitOpenError class.
+
+        Args:
+            retry_after_sec (float): The time in seconds until a request is tried again
+        """
+        self.retry_after_sec = retry_after_sec
+        super().__init__(
+            message=f"The OptHub API is unavailable. Please try again in {max(1, round(retry_after_sec))} seconds.",
+        )
@@ -1,71 +1,865 @@
-"""This module contains the GraphQL client getter."""
+"""This module contains the GraphQL client getter and the process-wide GraphQL sessions.
 
-from typing import Any
+`execute_graphql` and `execute_graphql_async` share one connected session kept by `GraphQLSessionManager`, so that
+consecutive queries reuse the same TCP and TLS connections. The schema validating the queries is cached on disk by
+`SchemaCache`, so that it is fetched once a day instead of before the first query of each process. The session runs on a
+background event loop shared by the synchronous and asynchronous callers. It is rebuilt when the access token changes,
+and closed at exit.
+
+The documents registered in `opthub_client.graphql.documents` are sent with their precomputed query text. With
+automatic persisted queries, enabled by `OPTHUB_PERSISTED_QUERIES=1`, only the hash of the query is sent, and the query
+text only when the server does not know the hash yet.
+
+Large results can be read as they arrive with `execute_graphql_stream`, e.g. by `JSONArrayStream`. Responses are
+compressed with gzip or deflate, or Brotli if the `brotli` package is installed, as negotiated by aiohttp.
+
+Transient errors are retried by `GraphQLRetryPolicy`, and requests fail fast during an outage by `CircuitBreaker`.
+Queries are retried on throttling, 5xx responses and connection errors, and mutations only when they cannot have been
+processed, unless they are marked as idempotent.
+
+Independent queries are sent in one request by `execute_graphql_batch`, which merges them into one operation: the
+variables and root fields of each query are renamed with a prefix, and the result is split back by prefix.
+
+The models are implemented with coroutines. Their synchronous wrappers run them with `run_sync` on the background event
+loop of the session, so that the whole process uses one event loop, instead of one per call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import os
+import threading
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
 from gql import Client
 from gql.transport.aiohttp import AIOHTTPTransport
-from gql.transport.exceptions import TransportQueryError
-from graphql import DocumentNode
+from gql.transport.exceptions import (
+    TransportClosed,
+    TransportError,
+    TransportProtocolError,
+    TransportQueryError,
+    TransportServerError,
+)
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    FieldNode,
+    NameNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    VariableNode,
+    Visitor,
+    get_operation_ast,
+    print_ast,
+    visit,
+)
+from graphql import GraphQLError as ValidationError
 
 from opthub_client.context.credentials import Credentials
 from opthub_client.errors.graphql_error import GraphQLError
+from opthub_client.graphql.documents import register_document, registered
+from opthub_client.graphql.retry import CircuitBreaker, GraphQLRetryPolicy, is_transient
+from opthub_client.graphql.schema_cache import SchemaCache
+from opthub_client.trace import span, traced
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine, Iterator, Sequence
+    from concurrent.futures import Future
+
+    from aiohttp import ClientResponse
+    from gql.client import AsyncClientSession
+    from graphql import IntrospectionQuery, VariableDefinitionNode
+
+    # Creates a client from the access token, the GraphQL endpoint and the cached introspection result, if any
+    ClientFactory = Callable[[str | None, str, IntrospectionQuery | None], Client]
+
+T = TypeVar("T")
 
 URL = "https://tf5tepcpn5bori46x5cyxh3ehe.appsync-api.ap-northeast-1.amazonaws.com/graphql"
 
+# The maximum time in seconds to wait for the sessions to close at exit
+CLOSE_TIMEOUT_SEC = 5.0
+
+# The environment variable enabling automatic persisted queries, which the API may not support
+PERSISTED_QUERIES_ENV = "OPTHUB_PERSISTED_QUERIES"
+# The error messages of servers which do not know the hash of a persisted query, or do not support persisted queries
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+# The HTTP status of a request which the server rejects, e.g. for missing the query text
+BAD_REQUEST = 400
+
+
+def load_access_token() -> str | None:
+    """Load the access token of `opt login`, refreshing it if it has expired.
+
+    Raises:
+        AuthenticationError: If authentication fails
+    """
+    credentials = Credentials()
+    credentials.load()
+    return credentials.access_token
 
-def get_gql_client() -> Client:
+
+class RegistryTransport(AIOHTTPTransport):
+    """An aiohttp transport sending the precomputed query text of the registered documents.
+
+    With `persisted_queries`, a registered document is sent as its hash only. The query text is sent again with the
+    hash when the server does not know it yet, and with all later requests when the server does not support persisted
+    queries. Other documents are sent as by `AIOHTTPTransport`.
+    """
+
+    persisted_queries: bool
+
+    def __init__(self, *args: Any, persisted_queries: bool = False, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initialize the transport with the arguments of `AIOHTTPTransport`.
+
+        Args:
+            *args (Any): The positional arguments of `AIOHTTPTransport`
+            persisted_queries (bool): Whether to send automatic persisted queries
+            **kwargs (Any): The keyword arguments of `AIOHTTPTransport`
+        """
+        super().__init__(*args, **kwargs)
+        self.persisted_queries = persisted_queries
+
+    async def execute(
+        self,
+        document: DocumentNode,
+        variable_values: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+        extra_args: dict[str, Any] | None = None,
+        upload_files: bool = False,  # noqa: FBT002
+    ) -> ExecutionResult:
+        """Execute a document, sending the precomputed query text or hash if it is registered."""
+        body = registered(document)
+        if body is None or extra_args or upload_files or self.auth is not None:
+            return await super().execute(document, variable_values, operation_name, extra_args, upload_files)
+        payload: dict[str, Any] = {}
+        if operation_name:
+            payload["operationName"] = operation_name
+        if variable_values:
+            payload["variables"] = variable_values
+        if self.persisted_queries:
+            extensions = {"persistedQuery": {"version": 1, "sha256Hash": body.sha256}}
+            try:
+                result = await self._post({**payload, "extensions": extensions}, raise_for_status=True)
+            except TransportServerError as error:
+                if error.code != BAD_REQUEST:
+                    raise
+                messages = {PERSISTED_QUERY_NOT_SUPPORTED}
+            else:
+                # The errors of a transport are the JSON objects of the response, not `GraphQLError`s
+                errors: list[Any] = result.errors or []
+                messages = {error.get("message") for error in errors}
+                if PERSISTED_QUERY_NOT_FOUND in messages:
+                    return await self._post({**payload, "query": body.query, "extensions": extensions})
+                if PERSISTED_QUERY_NOT_SUPPORTED not in messages:
+                    return result
+            self.persisted_queries = False
+        return await self._post({**payload, "query": body.query})
+
+    async def _post(self, payload: dict[str, Any], *, raise_for_status: bool = False) -> ExecutionResult:
+        """Post a JSON payload and parse the result, raising the errors of `AIOHTTPTransport.execute`.
+
+        Args:
+            payload (dict[str, Any]): The request body
+            raise_for_status (bool): Whether to raise `TransportServerError` for an HTTP error status even if the
+                response is a GraphQL result
+        """
+        if self.session is None:
+            msg = "Transport is not connected"
+            raise TransportClosed(msg)
+        async with self.session.post(self.url, ssl=self.ssl, json=payload) as response:
+            self.response_headers = response.headers
+            if raise_for_status and response.status >= BAD_REQUEST:
+                raise TransportServerError(response.reason or "Server error", response.status)
+            try:
+                result = await response.json(content_type=None)
+            except Exception:
+                result = None
+            if not isinstance(result, dict) or ("errors" not in result and "data" not in result):
+                if response.status >= BAD_REQUEST:
+                    raise TransportServerError(response.reason or "Server error", response.status)
+                msg = f"Server did not return a GraphQL result: {await response.text()}"
+                raise TransportProtocolError(msg)
+            return ExecutionResult(
+                errors=result.get("errors"),
+                data=result.get("data"),
+                extensions=result.get("extensions"),
+            )
+
+    async def open_stream(
+        self,
+        document: DocumentNode,
+        variable_values: dict[str, Any] | None = None,
+    ) -> ClientResponse:
+        """Post a document, returning the response to be read as it arrives and then released.
+
+        Raises:
+            TransportClosed: If the transport is not connected
+            TransportQueryError: If the server refuses the request with GraphQL errors
+            TransportServerError: If the server refuses the request otherwise
+        """
+        if self.session is None:
+            msg = "Transport is not connected"
+            raise TransportClosed(msg)
+        body = registered(document)
+        payload: dict[str, Any] = {"query": print_ast(document) if body is None else body.query}
+        if variable_values:
+            payload["variables"] = variable_values
+        response = await self.session.post(self.url, ssl=self.ssl, json=payload)
+        self.response_headers = response.headers
+        if response.status < BAD_REQUEST:
+            return response
+        try:
+            result = await response.json(content_type=None)
+        except Exception:
+            result = None
+        finally:
+            response.release()
+        if isinstance(result, dict) and result.get("errors"):
+            raise TransportQueryError(str(result["errors"][0]), errors=result["errors"], data=result.get("data"))
+        raise TransportServerError(response.reason or "Server error", response.status)
+
+
+@traced("graphql.client")
+def get_gql_client(
+    access_token: str | None = None,
+    url: str = URL,
+    introspection: IntrospectionQuery | None = None,
+    persisted_queries: bool | None = None,
+) -> Client:
     """Get the GraphQL client.
 
+    Args:
+        access_token (str | None): The access token. Defaults to the access token of `opt login`.
+        url (str): The GraphQL endpoint
+        introspection (IntrospectionQuery | None): The introspection result of the API, e.g. cached by `SchemaCache`.
+            Defaults to fetching it before the first query of the session.
+        persisted_queries (bool | None): Whether to send automatic persisted queries. Defaults to whether the
+            `OPTHUB_PERSISTED_QUERIES` environment variable is `1`.
+
     Returns:
         Client: The GraphQL client
 
     Raises:
         AuthenticationError: If authentication fails
     """
-    credentials = Credentials()
-    credentials.load()
-    headers = {"Authorization": f"Bearer {credentials.access_token}"}
-    transport = AIOHTTPTransport(url=URL, headers=headers)
+    if access_token is None:
+        access_token = load_access_token()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    if persisted_queries is None:
+        persisted_queries = os.environ.get(PERSISTED_QUERIES_ENV) == "1"
+    transport = RegistryTransport(url=url, headers=headers, persisted_queries=persisted_queries)
+    if introspection is not None:
+        return Client(transport=transport, introspection=introspection)
     return Client(transport=transport, fetch_schema_from_transport=True)
 
 
-def execute_graphql(request: DocumentNode, variables: dict[str, Any] | None = None) -> dict[str, Any]:
-    """Execute a graphql request.
+class GraphQLSessionManager:
+    """A thread-safe manager of the connected GraphQL session of the process.
+
+    The session lives on a background event loop, so that it outlives the short-lived event loops of `asyncio.run`.
+    Synchronous callers wait for the result, and asynchronous callers await it from their own event loop.
+    """
+
+    def __init__(
+        self,
+        client_factory: ClientFactory = get_gql_client,
+        access_token: Callable[[], str | None] = load_access_token,
+        schema_cache: SchemaCache | None = None,
+        retry_policy: GraphQLRetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        url: str = URL,
+    ) -> None:
+        """Initialize the manager. The session is connected on first use.
+
+        Args:
+            client_factory (ClientFactory): Creates the client of a session from the access token, `url` and the cached
+                introspection result, if any
+            access_token (Callable[[], str | None]): Loads the current access token before each request
+            schema_cache (SchemaCache | None): The cache of the schema used to validate the queries. Defaults to
+                fetching the schema for each session.
+            retry_policy (GraphQLRetryPolicy | None): The policy retrying transient errors. Defaults to no retries.
+            circuit_breaker (CircuitBreaker | None): The circuit breaker failing requests fast during an outage.
+                Defaults to none.
+            url (str): The GraphQL endpoint
+        """
+        self.url = url
+        self._client_factory = client_factory
+        self._access_token = access_token
+        self._schema_cache = schema_cache
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: Client | None = None
+        self._session: AsyncClientSession | None = None
+        self._session_token: str | None = None
+        self._connect_lock: asyncio.Lock | None = None
+
+    def execute_sync(
+        self,
+        request: DocumentNode,
+        variables: dict[str, Any] | None = None,
+        *,
+        idempotent: bool | None = None,
+    ) -> dict[str, Any]:
+        """Execute a request on the session, waiting for the result.
+
+        Args:
+            request (DocumentNode): The request
+            variables (dict[str, Any] | None): The variables of the request
+            idempotent (bool | None): Whether the request may be retried after it may have been processed. Defaults
+                to True for queries and False for mutations.
+
+        Raises:
+            TransportQueryError: If the server returns errors
+            TransportError: If the request fails. The session is closed, and reconnected by the next request.
+            CircuitOpenError: If the API is unavailable and the request has not been sent
+        """
+        return self._submit(request, variables, idempotent, self._access_token()).result()
+
+    async def execute(
+        self,
+        request: DocumentNode,
+        variables: dict[str, Any] | None = None,
+        *,
+        idempotent: bool | None = None,
+    ) -> dict[str, Any]:
+        """Execute a request on the session from any event loop.
+
+        Args:
+            request (DocumentNode): The request
+            variables (dict[str, Any] | None): The variables of the request
+            idempotent (bool | None): Whether the request may be retried after it may have been processed. Defaults
+                to True for queries and False for mutations.
+
+        Raises:
+            TransportQueryError: If the server returns errors
+            TransportError: If the request fails. The session is closed, and reconnected by the next request.
+            CircuitOpenError: If the API is unavailable and the request has not been sent
+        """
+        access_token = await asyncio.to_thread(self._access_token)
+        return await asyncio.wrap_future(self._submit(request, variables, idempotent, access_token))
+
+    def stream_sync(self, request: DocumentNode, variables: dict[str, Any] | None = None) -> Iterator[bytes]:
+        """Execute a request on the session, yielding the chunks of the response body as they arrive.
+
+        Raises:
+            TransportQueryError: If the server refuses the request with GraphQL errors
+            TransportError: If the request fails. The session is closed, and reconnected by the next request.
+        """
+        access_token = self._access_token()
+        loop = self._start()
+        opening = self._with_policy(lambda: self._open(request, variables, access_token), idempotent=True)
+        response = asyncio.run_coroutine_threadsafe(opening, loop).result()
+        try:
+            while chunk := asyncio.run_coroutine_threadsafe(response.content.readany(), loop).result():
+                yield chunk
+        finally:
+            loop.call_soon_threadsafe(response.release)
+
+    async def stream(self, request: DocumentNode, variables: dict[str, Any] | None = None) -> AsyncIterator[bytes]:
+        """Execute a request on the session from any event loop, yielding the chunks of the response as they arrive.
+
+        Raises:
+            TransportQueryError: If the server refuses the request with GraphQL errors
+            TransportError: If the request fails. The session is closed, and reconnected by the next request.
+        """
+        access_token = await asyncio.to_thread(self._access_token)
+        loop = self._start()
+        opening = self._with_policy(lambda: self._open(request, variables, access_token), idempotent=True)
+        response = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(opening, loop))
+        try:
+            while chunk := await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(response.content.readany(), loop),
+            ):
+                yield chunk
+        finally:
+            loop.call_soon_threadsafe(response.release)
+
+    def run_sync(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the background event loop, waiting for its result.
+
+        The coroutine runs in a copy of the context of the caller, e.g. inside its trace spans.
+
+        Raises:
+            RuntimeError: If called from the background event loop, which would wait for itself
+        """
+        loop = self._start()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            msg = "run_sync cannot be called from the background event loop; await the coroutine instead."
+            raise RuntimeError(msg)
+        task = _run_in_context(coroutine, contextvars.copy_context())
+        return asyncio.run_coroutine_threadsafe(task, loop).result()
+
+    def close(self, timeout: float | None = CLOSE_TIMEOUT_SEC) -> None:
+        """Close the session and stop the background event loop. The next request starts them again."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout)
+
+    def _submit(
+        self,
+        request: DocumentNode,
+        variables: dict[str, Any] | None,
+        idempotent: bool | None,
+        access_token: str | None,
+    ) -> Future[dict[str, Any]]:
+        """Schedule a request on the background event loop, with retries.
+
+        The access token is loaded by the caller outside of the background event loop, because it may block to read
+        or refresh the credentials.
+        """
+        if idempotent is None:
+            operation = get_operation_ast(request)
+            idempotent = operation is None or operation.operation != OperationType.MUTATION
+        execution = self._with_policy(lambda: self._execute(request, variables, access_token), idempotent=idempotent)
+        return asyncio.run_coroutine_threadsafe(execution, self._start())
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        """Get the background event loop, starting it if needed."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="opthub-graphql", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _with_policy(self, attempt: Callable[[], Awaitable[T]], *, idempotent: bool) -> T:
+        """Run the attempts of a request on the background event loop, with the retry policy and the circuit breaker.
+
+        Errors other than the transient ones are answers of the API, which close the circuit.
+        """
+        policy = self.retry_policy
+        delays = iter(()) if policy is None else policy.delays()
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request()
+            try:
+                result = await attempt()
+            except Exception as error:
+                if self.circuit_breaker is not None:
+                    if is_transient(error):
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                retryable = policy is not None and policy.is_retryable(error, idempotent=idempotent)
+                delay = next(delays, None) if retryable else None
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success()
+                return result
+
+    async def _execute(
+        self,
+        request: DocumentNode,
+        variables: dict[str, Any] | None,
+        access_token: str | None,
+    ) -> dict[str, Any]:
+        """Execute a request on the background event loop.
+
+        A query rejected by the validation against a cached schema is validated again against a fetched schema, in
+        case the API has changed since the schema was cached.
+        """
+        session = await self._connect(access_token)
+        try:
+            return await session.execute(request, variable_values=variables)
+        except TransportQueryError:
+            raise
+        except TransportError:
+            await self._close()
+            raise
+        except ValidationError:
+            if self._schema_cache is None or self._client is None or self._client.fetch_schema_from_transport:
+                raise
+            self._schema_cache.invalidate()
+            await self._close()
+        session = await self._connect(access_token)
+        return await session.execute(request, variable_values=variables)
+
+    async def _open(
+        self,
+        request: DocumentNode,
+        variables: dict[str, Any] | None,
+        access_token: str | None,
+    ) -> ClientResponse:
+        """Post a request on the background event loop, returning the response to be read as it arrives.
+
+        The request is not validated against the schema, which is left to the server.
+        """
+        await self._connect(access_token)
+        transport = None if self._client is None else self._client.transport
+        if not isinstance(transport, RegistryTransport):
+            msg = "Streaming requires a RegistryTransport."
+            raise TypeError(msg)
+        try:
+            return await transport.open_stream(request, variables)
+        except TransportQueryError:
+            raise
+        except TransportError:
+            await self._close()
+            raise
+
+    async def _connect(self, access_token: str | None) -> AsyncClientSession:
+        """Get the connected session, connecting it or rebuilding it for a new access token."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._session is None or self._session_token != access_token:
+                await self._close()
+                introspection = None if self._schema_cache is None else self._schema_cache.load()
+                with span("graphql.connect", schema_cached=introspection is not None):
+                    client = self._create_client(access_token, introspection)
+                    self._session = await client.connect_async()  # type: ignore[no-untyped-call]
+                self._client = client
+                self._session_token = access_token
+                if self._schema_cache is not None and client.fetch_schema_from_transport and client.introspection:
+                    self._schema_cache.save(client.introspection)
+            return self._session
+
+    def _create_client(self, access_token: str | None, introspection: IntrospectionQuery | None) -> Client:
+        """Create the client of a session to `url`."""
+        return self._client_factory(access_token, self.url, introspection)
+
+    async def _close(self) -> None:
+        """Close the session on the background event loop, if connected."""
+        client, self._client, self._session = self._client, None, None
+        if client is not None:
+            await _close_client(client)
+
+    def _reset_after_fork(self) -> None:
+        """Forget the session inherited by a forked child process, whose connections and thread belong to the parent."""
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._session = None
+        self._connect_lock = None
+
+
+async def _run_in_context(coroutine: Coroutine[Any, Any, T], context: contextvars.Context) -> T:
+    """Run a coroutine in a task with the given context."""
+    return await context.run(asyncio.ensure_future, coroutine)
+
+
+async def _close_client(client: Client) -> None:
+    """Close a connected client, ignoring the errors of a broken connection."""
+    with suppress(Exception):
+        await client.close_async()  # type: ignore[no-untyped-call]
+
+
+sessions = GraphQLSessionManager(
+    schema_cache=SchemaCache(URL),
+    retry_policy=GraphQLRetryPolicy(),
+    circuit_breaker=CircuitBreaker(),
+)
+atexit.register(sessions.close)
+os.register_at_fork(after_in_child=sessions._reset_after_fork)  # noqa: SLF001
+
+
+def run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine, e.g. of a model, on the event loop of the GraphQL sessions, waiting for its result.
+
+    Args:
+        coroutine (Coroutine[Any, Any, T]): The coroutine
+
+    Returns:
+        T: The result of the coroutine
+
+    Raises:
+        RuntimeError: If called from a coroutine running on the event loop of the sessions
+    """
+    return sessions.run_sync(coroutine)
+
+
+def execute_graphql(
+    request: DocumentNode,
+    variables: dict[str, Any] | None = None,
+    *,
+    idempotent: bool | None = None,
+) -> dict[str, Any]:
+    """Execute a graphql request, retrying transient errors.
 
     Args:
         request (DocumentNode): graphql client request
         variables (_type_, optional): query variables. Defaults to None.
+        idempotent (bool | None): Whether the request may be retried after it may have been processed. Defaults to
+            True for queries and False for mutations.
 
     Raises:
-        GraphQLError: graphql error
+        GraphQLError: graphql error, or `CircuitOpenError` if the API is unavailable
 
     Returns:
         dict[str, Any]: result
     """
-    client = get_gql_client()
     try:
-        return client.execute(request, variable_values=variables)
+        with span(f"graphql {_operation_name(request)}"):
+            return sessions.execute_sync(request, variables, idempotent=idempotent)
     except TransportQueryError as auth_error:
         error_message = auth_error.errors[0]["message"] if auth_error.errors else "Unexpected error"
         raise GraphQLError(message=error_message) from auth_error
 
 
-async def execute_graphql_async(request: DocumentNode, variables: dict[str, Any] | None = None) -> dict[str, Any]:
-    """Execute a graphql request.
+async def execute_graphql_async(
+    request: DocumentNode,
+    variables: dict[str, Any] | None = None,
+    *,
+    idempotent: bool | None = None,
+) -> dict[str, Any]:
+    """Execute a graphql request, retrying transient errors.
 
     Args:
         request (DocumentNode): graphql client request
         variables (_type_, optional): query variables. Defaults to None.
+        idempotent (bool | None): Whether the request may be retried after it may have been processed. Defaults to
+            True for queries and False for mutations.
 
     Raises:
-        GraphQLError: graphql error
+        GraphQLError: graphql error, or `CircuitOpenError` if the API is unavailable
 
     Returns:
         dict[str, Any]: result
     """
-    client = get_gql_client()
     try:
-        return await client.execute_async(request, variable_values=variables)
+        with span(f"graphql {_operation_name(request)}"):
+            return await sessions.execute(request, variables, idempotent=idempotent)
     except TransportQueryError as auth_error:
         error_message = auth_error.errors[0]["message"] if auth_error.errors else "Unexpected error"
         raise GraphQLError(message=error_message) from auth_error
+
+
+def execute_graphql_stream(request: DocumentNode, variables: dict[str, Any] | None = None) -> Iterator[bytes]:
+    """Execute a graphql request, yielding the chunks of the JSON response as they arrive.
+
+    Args:
+        request (DocumentNode): graphql client request
+        variables (dict[str, Any] | None): query variables. Defaults to None.
+
+    Raises:
+        GraphQLError: If the server refuses the request. Errors of an accepted request are in the response.
+
+    Yields:
+        bytes: The chunks of the response
+    """
+    try:
+        with span(f"graphql {_operation_name(request)}", streamed=True):
+            yield from sessions.stream_sync(request, variables)
+    except TransportQueryError as auth_error:
+        error_message = auth_error.errors[0]["message"] if auth_error.errors else "Unexpected error"
+        raise GraphQLError(message=error_message) from auth_error
+
+
+async def execute_graphql_stream_async(
+    request: DocumentNode,
+    variables: dict[str, Any] | None = None,
+) -> AsyncIterator[bytes]:
+    """Execute a graphql request, yielding the chunks of the JSON response as they arrive.
+
+    Args:
+        request (DocumentNode): graphql client request
+        variables (dict[str, Any] | None): query variables. Defaults to None.
+
+    Raises:
+        GraphQLError: If the server refuses the request. Errors of an accepted request are in the response.
+
+    Yields:
+        bytes: The chunks of the response
+    """
+    try:
+        with span(f"graphql {_operation_name(request)}", streamed=True):
+            async for chunk in sessions.stream(request, variables):
+                yield chunk
+    except TransportQueryError as auth_error:
+        error_message = auth_error.errors[0]["message"] if auth_error.errors else "Unexpected error"
+        raise GraphQLError(message=error_message) from auth_error
+
+
+class GraphQLRequest(NamedTuple):
+    """A GraphQL query with its variables, to be executed in a batch."""
+
+    document: DocumentNode
+    variables: dict[str, Any] | None = None
+
+
+def execute_graphql_batch(requests: Sequence[GraphQLRequest]) -> list[dict[str, Any] | GraphQLError]:
+    """Execute independent graphql queries in one request.
+
+    Args:
+        requests (Sequence[GraphQLRequest]): The queries, each a document with a single operation and no fragments
+
+    Returns:
+        list[dict[str, Any] | GraphQLError]: The result of each query, or its error
+    """
+    if len(requests) == 1:
+        try:
+            return [execute_graphql(*requests[0])]
+        except GraphQLError as error:
+            return [error]
+    document = merge_documents(tuple(request.document for request in requests))
+    data: dict[str, Any] | None
+    errors: list[dict[str, Any]]
+    try:
+        with span("graphql batch", operations=[_operation_name(request.document) for request in requests]):
+            data, errors = sessions.execute_sync(document, _batch_variables(requests)), []
+    except TransportQueryError as error:
+        data, errors = error.data, error.errors or []
+    return _split_batch(len(requests), data, errors)
+
+
+async def execute_graphql_batch_async(requests: Sequence[GraphQLRequest]) -> list[dict[str, Any] | GraphQLError]:
+    """Execute independent graphql queries in one request.
+
+    Args:
+        requests (Sequence[GraphQLRequest]): The queries, each a document with a single operation and no fragments
+
+    Returns:
+        list[dict[str, Any] | GraphQLError]: The result of each query, or its error
+    """
+    if len(requests) == 1:
+        try:
+            return [await execute_graphql_async(*requests[0])]
+        except GraphQLError as error:
+            return [error]
+    document = merge_documents(tuple(request.document for request in requests))
+    data: dict[str, Any] | None
+    errors: list[dict[str, Any]]
+    try:
+        with span("graphql batch", operations=[_operation_name(request.document) for request in requests]):
+            data, errors = await sessions.execute(document, _batch_variables(requests)), []
+    except TransportQueryError as error:
+        data, errors = error.data, error.errors or []
+    return _split_batch(len(requests), data, errors)
+
+
+class _PrefixVariables(Visitor):
+    """A visitor prefixing the names of the variables of an operation."""
+
+    def __init__(self, prefix: str) -> None:
+        super().__init__()
+        self.prefix = prefix
+
+    def enter_variable(self, node: VariableNode, *_: object) -> VariableNode:
+        return VariableNode(name=NameNode(value=self.prefix + node.name.value))
+
+
+@functools.lru_cache(maxsize=64)
+def merge_documents(documents: tuple[DocumentNode, ...]) -> DocumentNode:
+    """Merge documents into one operation, prefixing the variables and root fields of the i-th with `b{i}_`.
+
+    The merged document is registered, so that it is printed once however many times the batch is executed.
+
+    Args:
+        documents (tuple[DocumentNode, ...]): The documents, each with a single operation of the same type and no
+            fragments
+
+    Returns:
+        DocumentNode: The merged document
+
+    Raises:
+        ValueError: If the documents cannot be merged
+    """
+    operations = [
+        definition
+        for document in documents
+        if len(document.definitions) == 1 and isinstance(definition := document.definitions[0], OperationDefinitionNode)
+    ]
+    if len(operations) != len(documents):
+        msg = "Only documents with a single operation and no fragments can be batched."
+        raise ValueError(msg)
+    if len({operation.operation for operation in operations}) != 1:
+        msg = "Only operations of the same type can be batched."
+        raise ValueError(msg)
+    variable_definitions: list[VariableDefinitionNode] = []
+    selections: list[FieldNode] = []
+    for index, operation in enumerate(operations):
+        prefix = _batch_prefix(index)
+        renamed = visit(operation, _PrefixVariables(prefix))
+        variable_definitions.extend(renamed.variable_definitions or ())
+        for selection in renamed.selection_set.selections:
+            if not isinstance(selection, FieldNode):
+                msg = "Only root fields can be batched."
+                raise ValueError(msg)  # noqa: TRY004
+            key = (selection.alias or selection.name).value
+            selections.append(
+                FieldNode(
+                    alias=NameNode(value=prefix + key),
+                    name=selection.name,
+                    arguments=selection.arguments,
+                    directives=selection.directives,
+                    selection_set=selection.selection_set,
+                ),
+            )
+    operation = OperationDefinitionNode(
+        operation=operations[0].operation,
+        name=NameNode(value="batch"),
+        variable_definitions=tuple(variable_definitions),
+        directives=(),
+        selection_set=SelectionSetNode(selections=tuple(selections)),
+    )
+    return register_document(DocumentNode(definitions=(operation,)))
+
+
+def _operation_name(document: DocumentNode) -> str:
+    """Get the name of the operation of a document, for the spans of the trace."""
+    operation = get_operation_ast(document)
+    if operation is None or operation.name is None:
+        return "anonymous"
+    return operation.name.value
+
+
+def _batch_prefix(index: int) -> str:
+    """The prefix of the variables and root fields of the `index`-th query of a batch."""
+    return f"b{index}_"
+
+
+def _batch_variables(requests: Sequence[GraphQLRequest]) -> dict[str, Any]:
+    """The prefixed variables of the queries of a batch."""
+    return {
+        _batch_prefix(index) + name: value
+        for index, request in enumerate(requests)
+        for name, value in (request.variables or {}).items()
+    }
+
+
+def _split_batch(
+    count: int,
+    data: dict[str, Any] | None,
+    errors: list[dict[str, Any]],
+) -> list[dict[str, Any] | GraphQLError]:
+    """Split the result of a batch into the results of its queries, by the prefixes of the root fields.
+
+    An error without a path, e.g. a validation error, is the error of every query.
+    """
+    results: list[dict[str, Any] | GraphQLError] = []
+    for index in range(count):
+        prefix = _batch_prefix(index)
+        error = next(
+            (error for error in errors if not error.get("path") or str(error["path"][0]).startswith(prefix)),
+            None,
+        )
+        if error is not None:
+            results.append(GraphQLError(message=error.get("message", "Unexpected error")))
+        else:
+            results.append(
+                {key.removeprefix(prefix): value for key, value in (data or {}).items() if key.startswith(prefix)},
+            )
+    return results
@@ -0,0 +1,63 @@
+"""This module contains the registry of the GraphQL documents of the client.
+
+The queries of the models are parsed once at import with `register`, instead of on each call. The registry also keeps
+the printed query of each document and its SHA-256 hash, so that the transport neither prints the document again for
+each request nor, with automatic persisted queries, sends the query text at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, NamedTuple
+
+from gql import gql
+from graphql import print_ast
+
+if TYPE_CHECKING:
+    from graphql import DocumentNode
+
+
+class RegisteredDocument(NamedTuple):
+    """The precomputed request body of a registered document."""
+
+    query: str
+    """The printed query, as sent to the server."""
+    sha256: str
+    """The hex SHA-256 hash of `query`, which identifies the query as a persisted query."""
+
+
+_registry: dict[DocumentNode, RegisteredDocument] = {}
+
+
+def register(source: str) -> DocumentNode:
+    """Parse a GraphQL document and register it.
+
+    Args:
+        source (str): The GraphQL source
+
+    Returns:
+        DocumentNode: The parsed document, to be reused for each request
+
+    Raises:
+        GraphQLError: If the source is invalid
+    """
+    return register_document(gql(source))
+
+
+def register_document(document: DocumentNode) -> DocumentNode:
+    """Register a parsed GraphQL document, e.g. one built from other documents.
+
+    Args:
+        document (DocumentNode): The document
+
+    Returns:
+        DocumentNode: The document
+    """
+    query = print_ast(document)
+    _registry[document] = RegisteredDocument(query, hashlib.sha256(query.encode()).hexdigest())
+    return document
+
+
+def registered(document: DocumentNode) -> RegisteredDocument | None:
+    """Get the precomputed request body of a document, or `None` if it is not registered."""
+    return _registry.get(document)
@@ -0,0 +1,176 @@
+"""This module contains the retry policy and the circuit breaker of the GraphQL client.
+
+Transient errors are throttling, 5xx responses and connection errors. Queries are retried on all of them with an
+exponential backoff with random jitter. Mutations, e.g. `createSolution`, are retried only when the server cannot have
+processed them, i.e. on throttling and when the connection could not be established, so that a solution is never
+submitted twice; as for the `RetryPolicy` of the REST API.
+
+`CircuitBreaker` opens after consecutive transient errors, and requests then fail fast with `CircuitOpenError` instead
+of waiting for their own retries. After a cool-down, one request is let through to probe the API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from http import HTTPStatus
+from random import uniform
+from typing import TYPE_CHECKING, Literal
+
+from aiohttp import ClientConnectorError, ClientError
+from gql.transport.exceptions import (
+    TransportClosed,
+    TransportProtocolError,
+    TransportQueryError,
+    TransportServerError,
+)
+
+from opthub_client.errors.circuit_open_error import CircuitOpenError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+# The `errorType` of the GraphQL errors of throttled requests, which the server has not processed
+THROTTLING_ERROR_TYPES = frozenset({"Throttled", "ThrottlingException", "TooManyRequestsException"})
+# The `errorType` of the GraphQL errors of transient failures of the server
+UNAVAILABLE_ERROR_TYPES = frozenset({"InternalFailure", "ServiceUnavailable", "ServiceUnavailableException"})
+
+
+class GraphQLRetryPolicy:
+    """A policy retrying the transient errors of GraphQL requests with an exponential backoff with random jitter."""
+
+    max_retries: int
+    backoff_initial_sec: float
+    backoff_max_sec: float
+    backoff_ratio: float
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_initial_sec: float = 0.5,
+        backoff_max_sec: float = 10.0,
+        backoff_ratio: float = 2.0,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_retries (int): The maximum number of retries of a request
+            backoff_initial_sec (float): The upper bound of the first waiting time
+            backoff_max_sec (float): The upper bound of all waiting times
+            backoff_ratio (float): The growth ratio of the upper bound after each retry
+        """
+        self.max_retries = max_retries
+        self.backoff_initial_sec = backoff_initial_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.backoff_ratio = backoff_ratio
+
+    def delays(self) -> Iterator[float]:
+        """Generate the waiting times before the retries of a request, uniformly random up to the backoff."""
+        for retry in range(self.max_retries):
+            yield uniform(0, min(self.backoff_initial_sec * self.backoff_ratio**retry, self.backoff_max_sec))  # noqa: S311
+
+    def is_retryable(self, error: Exception, *, idempotent: bool) -> bool:
+        """Whether a failed request may be retried.
+
+        Args:
+            error (Exception): The error of the request
+            idempotent (bool): Whether the request may be processed twice, e.g. a query
+        """
+        if idempotent:
+            return is_transient(error)
+        return is_throttled(error) or isinstance(error, ClientConnectorError)
+
+
+def is_throttled(error: Exception) -> bool:
+    """Whether a request has been refused by throttling."""
+    if isinstance(error, TransportServerError):
+        return error.code == HTTPStatus.TOO_MANY_REQUESTS
+    return _error_type(error) in THROTTLING_ERROR_TYPES
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a request has failed because of throttling or of a temporary unavailability of the API."""
+    if isinstance(error, TransportServerError):
+        return error.code is not None and (
+            error.code == HTTPStatus.TOO_MANY_REQUESTS or error.code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+    if isinstance(error, TransportQueryError):
+        return _error_type(error) in THROTTLING_ERROR_TYPES | UNAVAILABLE_ERROR_TYPES
+    return isinstance(error, ClientError | TransportClosed | TransportProtocolError | asyncio.TimeoutError)
+
+
+def _error_type(error: Exception) -> str | None:
+    """The `errorType` of the first GraphQL error of a request, as returned by AppSync."""
+    if not isinstance(error, TransportQueryError) or not error.errors:
+        return None
+    error_type = error.errors[0].get("errorType")
+    return error_type if isinstance(error_type, str) else None
+
+
+class CircuitBreaker:
+    """A thread-safe circuit breaker failing requests fast while the API is unavailable.
+
+    The circuit opens after `failure_threshold` consecutive transient errors. Requests then raise `CircuitOpenError`
+    for `reset_timeout_sec`, after which the circuit is half-open: one request is let through, which closes the circuit
+    if it succeeds and opens it again if it fails.
+    """
+
+    failure_threshold: int
+    reset_timeout_sec: float
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_sec: float = 30.0) -> None:
+        """Initialize the circuit breaker, closed.
+
+        Args:
+            failure_threshold (int): The number of consecutive transient errors opening the circuit
+            reset_timeout_sec (float): The time in seconds for which the circuit stays open
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        """The state of the circuit."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if self._remaining_sec() > 0 or self._probing else "half_open"
+
+    def before_request(self) -> None:
+        """Check that a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a request already probing the API
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining_sec = self._remaining_sec()
+            if remaining_sec > 0 or self._probing:
+                raise CircuitOpenError(remaining_sec)
+            self._probing = True
+
+    def record_success(self) -> None:
+        """Record a request answered by the API, which closes the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a transient error, which opens the circuit after `failure_threshold` of them or when probing."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def _remaining_sec(self) -> float:
+        return 0.0 if self._opened_at is None else self._opened_at + self.reset_timeout_sec - time.monotonic()
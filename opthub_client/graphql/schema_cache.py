@@ -0,0 +1,79 @@
+"""This module contains the cache of the GraphQL schema.
+
+gql validates queries against the schema of the API, which it otherwise fetches with an introspection query before
+the first query of each session. The introspection result is cached on disk for `SCHEMA_TTL_SEC`, per client version
+and endpoint, so that most sessions send only their real operations.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from opthub_client import __version__
+from opthub_client.context.utils import get_opthub_client_dir
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from graphql import IntrospectionQuery
+
+FILE_NAME = "graphql_schema.json"
+# The lifetime in seconds of the cached schema
+SCHEMA_TTL_SEC = 24 * 60 * 60
+
+
+class SchemaCache:
+    """The introspection result of a GraphQL API, cached in a JSON file."""
+
+    url: str
+    ttl_sec: float
+
+    def __init__(self, url: str, file_path: Path | None = None, ttl_sec: float = SCHEMA_TTL_SEC) -> None:
+        """Initialize the cache.
+
+        Args:
+            url (str): The GraphQL endpoint. A schema cached for another endpoint is ignored.
+            file_path (Path | None): The JSON file. Defaults to `graphql_schema.json` in the opthub client directory.
+            ttl_sec (float): The lifetime in seconds of the cached schema
+        """
+        self.url = url
+        self.ttl_sec = ttl_sec
+        self._file_path = file_path
+
+    @property
+    def file_path(self) -> Path:
+        """The JSON file of the cache."""
+        return self._file_path or get_opthub_client_dir() / FILE_NAME
+
+    def load(self) -> IntrospectionQuery | None:
+        """Load the cached introspection result, or `None` if it is missing, expired or of another version."""
+        try:
+            with self.file_path.open(encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(cached, dict)
+            or cached.get("version") != __version__
+            or cached.get("url") != self.url
+            or time.time() - cached.get("fetched_at", 0) > self.ttl_sec
+        ):
+            return None
+        return cached.get("introspection")
+
+    def save(self, introspection: IntrospectionQuery) -> None:
+        """Cache an introspection result. Failures to write are ignored, as the schema can be fetched again."""
+        cached = {"version": __version__, "url": self.url, "fetched_at": time.time(), "introspection": introspection}
+        temporary = self.file_path.with_suffix(f".{os.getpid()}.tmp")
+        with suppress(OSError):
+            temporary.write_text(json.dumps(cached), encoding="utf-8")
+            temporary.replace(self.file_path)
+
+    def invalidate(self) -> None:
+        """Delete the cached schema, e.g. when it rejects a query which the API accepts."""
+        with suppress(OSError):
+            self.file_path.unlink()
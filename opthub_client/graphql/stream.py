@@ -0,0 +1,184 @@
+"""This module contains an incremental parser of GraphQL responses.
+
+Pages of trials can weigh megabytes for high-dimensional problems. `JSONArrayStream` parses a response chunk by chunk
+and returns the items of one array as soon as each is complete, so that they can be processed while the rest of the
+response is downloaded, and the whole response is never held in memory.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Sequence
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Yielded by the parser when it needs more input
+_MORE = object()
+# Returned by the parser in place of the streamed array, which is left out of the result
+_STREAMED = object()
+
+
+class JSONArrayStream:
+    """A push parser of a JSON document, returning the items of the array at `path` as they arrive.
+
+    The rest of the document is parsed into `result`, without the array.
+
+    Example:
+        >>> stream = JSONArrayStream(["data", "items"])
+        >>> stream.feed(b'{"data": {"items": [1, 2')
+        [1]
+        >>> stream.feed(b"]}}")
+        [2]
+        >>> stream.close()
+        []
+        >>> stream.result
+        {'data': {}}
+    """
+
+    path: tuple[str, ...]
+    result: Any
+
+    def __init__(self, path: Sequence[str]) -> None:
+        """Initialize the parser.
+
+        Args:
+            path (Sequence[str]): The keys of the objects leading to the array
+        """
+        self.path = tuple(path)
+        self.result = None
+        self._text = ""
+        self._pos = 0
+        self._eof = False
+        self._done = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._parser = self._document()
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Parse a chunk of the document.
+
+        Returns:
+            list[Any]: The items of the array completed by the chunk
+
+        Raises:
+            ValueError: If the document is invalid
+        """
+        self._text = self._text[self._pos :] + self._utf8.decode(chunk)
+        self._pos = 0
+        return self._resume()
+
+    def close(self) -> list[Any]:
+        """Parse the end of the document.
+
+        Returns:
+            list[Any]: The items of the array not returned yet
+
+        Raises:
+            ValueError: If the document is invalid or incomplete
+        """
+        self._text = self._text[self._pos :] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        items = self._resume()
+        if not self._done:
+            msg = "Incomplete JSON document"
+            raise ValueError(msg)
+        return items
+
+    def _resume(self) -> list[Any]:
+        """Run the parser until it needs more input, collecting the items of the array."""
+        items = []
+        while not self._done:
+            try:
+                item = next(self._parser)
+            except StopIteration:
+                self._done = True
+                break
+            if item is _MORE:
+                break
+            items.append(item)
+        return items
+
+    def _document(self) -> Generator[Any, None, None]:
+        self.result = yield from self._value(())
+        char = yield from self._peek()
+        if char:
+            msg = f"Unexpected {char!r} after the JSON document at {self._pos}"
+            raise ValueError(msg)
+
+    def _value(self, path: tuple[str, ...]) -> Generator[Any, None, Any]:
+        """Parse a value, descending into the objects on the path to the array and streaming the array."""
+        char = yield from self._peek()
+        if path == self.path and char == "[":
+            yield from self._array()
+            return _STREAMED
+        if char == "{" and len(path) < len(self.path) and path == self.path[: len(path)]:
+            return (yield from self._object(path))
+        return (yield from self._complete_value())
+
+    def _object(self, path: tuple[str, ...]) -> Generator[Any, None, dict[str, Any]]:
+        self._pos += 1
+        members: dict[str, Any] = {}
+        if (yield from self._peek()) == "}":
+            self._pos += 1
+            return members
+        while True:
+            key = yield from self._complete_value()
+            yield from self._expect(":")
+            value = yield from self._value((*path, str(key)))
+            if value is not _STREAMED:
+                members[key] = value
+            if (yield from self._expect(",}")) == "}":
+                return members
+
+    def _array(self) -> Generator[Any, None, None]:
+        self._pos += 1
+        if (yield from self._peek()) == "]":
+            self._pos += 1
+            return
+        while True:
+            yield (yield from self._complete_value())
+            if (yield from self._expect(",]")) == "]":
+                return
+
+    def _complete_value(self) -> Generator[Any, None, Any]:
+        """Decode a value once it has fully arrived.
+
+        A failed attempt is retried only when the input has doubled, so that a large value is decoded in linear time.
+        """
+        yield from self._peek()
+        wanted = 0
+        while True:
+            if self._eof or len(self._text) - self._pos >= wanted:
+                try:
+                    value, end = self._json.raw_decode(self._text, self._pos)
+                except json.JSONDecodeError:
+                    if self._eof:
+                        raise
+                else:
+                    # A number at the end of the input may continue in the next chunk
+                    if end < len(self._text) or self._eof:
+                        self._pos = end
+                        return value
+                wanted = 2 * (len(self._text) - self._pos)
+            yield _MORE
+
+    def _expect(self, chars: str) -> Generator[Any, None, str]:
+        char = yield from self._peek()
+        if not char or char not in chars:
+            msg = f"Expected one of {chars!r} at {self._pos}, got {char!r}"
+            raise ValueError(msg)
+        self._pos += 1
+        return char
+
+    def _peek(self) -> Generator[Any, None, str]:
+        """Skip whitespace and get the next character, or an empty string at the end of the document."""
+        while True:
+            self._pos = _WHITESPACE.match(self._text, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._text) or self._eof:
+                return self._text[self._pos : self._pos + 1]
+            yield _MORE
@@ -0,0 +1,255 @@
+"""Push notifications of trial status changes through GraphQL subscriptions.
+
+A `TrialSubscription` keeps a websocket subscription to the status changes of the trials of a match open in a
+background thread. Trials waiting for their evaluation or scoring are woken as soon as a change is pushed, instead of
+sleeping for the exponential backoff of polling. While the socket is down, waiting trials fall back to polling, and
+the subscription reconnects in the background.
+
+The default transport is the AppSync realtime endpoint of the OptHub GraphQL API with the credentials of `opt login`.
+It requires the `websockets` package (`pip install gql[websockets]`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Self
+from urllib.parse import urlparse
+
+from gql import Client, gql
+
+from opthub_client.context.credentials import Credentials
+from opthub_client.errors.authentication_error import AuthenticationError, AuthenticationErrorMessage
+from opthub_client.graphql.client import URL
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from uuid import UUID
+
+    from gql.transport.async_transport import AsyncTransport
+    from graphql import DocumentNode
+
+ON_UPDATE_MATCH_TRIAL = gql(
+    """
+    subscription onUpdateMatchTrial($matchId: String!) {
+        onUpdateMatchTrial(matchId: $matchId) {
+            trialNo
+            status
+        }
+    }
+    """,
+)
+
+# A position in the stream of notifications: the number of changes of a trial and the number of connections
+Mark = tuple[int, int]
+
+
+def appsync_transport() -> AsyncTransport:
+    """Create a websocket transport to the realtime endpoint of the OptHub GraphQL API.
+
+    Returns:
+        AsyncTransport: The transport authenticated with the access token of `opt login`
+
+    Raises:
+        AuthenticationError: If authentication fails
+    """
+    from gql.transport.appsync_auth import AppSyncJWTAuthentication
+    from gql.transport.appsync_websockets import AppSyncWebsocketsTransport
+
+    credentials = Credentials()
+    credentials.load()
+    if credentials.access_token is None:
+        raise AuthenticationError(AuthenticationErrorMessage.LOAD_CREDENTIALS_FAILED)
+    auth = AppSyncJWTAuthentication(host=str(urlparse(URL).hostname), jwt=credentials.access_token)
+    return AppSyncWebsocketsTransport(url=URL, auth=auth)
+
+
+class TrialSubscription:
+    """A subscription to the status changes of the trials of a match, running in a background thread.
+
+    Example:
+        >>> match = api.match(match_uuid)
+        >>> match.subscribe()
+        >>> trial = match.submit(solution)
+        >>> trial.wait_scoring()  # woken by the subscription instead of polling with backoff
+    """
+
+    match_id: str
+    reconnect_interval_sec: float
+
+    def __init__(
+        self,
+        match_id: UUID | str,
+        transport_factory: Callable[[], AsyncTransport] | None = None,
+        document: DocumentNode = ON_UPDATE_MATCH_TRIAL,
+        reconnect_interval_sec: float = 5.0,
+    ) -> None:
+        """Create a subscription; call `start` to connect.
+
+        Args:
+            match_id (UUID | str): The match UUID
+            transport_factory (Callable[[], AsyncTransport] | None): Creates the transport of each connection;
+                `appsync_transport` by default
+            document (DocumentNode): The subscription, taking a `matchId` variable and returning `trialNo`
+            reconnect_interval_sec (float): The waiting time in seconds before reconnecting a dropped socket
+        """
+        self.match_id = str(match_id)
+        self.reconnect_interval_sec = reconnect_interval_sec
+        self._transport_factory = transport_factory or appsync_transport
+        self._document = document
+        self._changes: dict[int, int] = {}
+        self._watchers: dict[int, int] = {}
+        self._connections = 0
+        self._connected = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the subscription is currently receiving notifications."""
+        with self._condition:
+            return self._connected
+
+    def start(self) -> None:
+        """Connect in a background thread. The connection is retried until `close` is called."""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="opthub-trial-subscription", daemon=True)
+            self._thread.start()
+
+    def wait_connected(self, timeout: float | None = None) -> bool:
+        """Wait until the subscription is connected.
+
+        Args:
+            timeout (float | None): The maximum time in seconds to wait
+
+        Returns:
+            bool: Whether the subscription is connected
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._connected or self._closed, timeout) and self._connected
+
+    @contextmanager
+    def watching(self, trial_no: int) -> Iterator[None]:
+        """Record the changes of a trial while in the `with` block, so that `wait` is woken by them.
+
+        Only the changes of the watched trials are recorded, so that the memory of the subscription is bounded by the
+        trials waited for, not by all the trials of the match.
+        """
+        with self._condition:
+            self._watchers[trial_no] = self._watchers.get(trial_no, 0) + 1
+            self._changes.setdefault(trial_no, 0)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._watchers[trial_no] -= 1
+                if self._watchers[trial_no] == 0:
+                    del self._watchers[trial_no]
+                    del self._changes[trial_no]
+
+    def mark(self, trial_no: int) -> Mark:
+        """Get the current position in the notifications of a trial, to be passed to `wait` later.
+
+        Take the mark before checking the trial status, so that no notification is missed in between, while
+        `watching` the trial.
+        """
+        with self._condition:
+            return self._changes.get(trial_no, 0), self._connections
+
+    def wait(self, trial_no: int, mark: Mark, timeout: float | None) -> bool:
+        """Wait for a change of the trial status since `mark`.
+
+        Args:
+            trial_no (int): The trial number
+            mark (Mark): The mark taken by `mark` before the status was last checked
+            timeout (float | None): The maximum time in seconds to wait
+
+        Returns:
+            bool: True if the status has changed, False if the socket has dropped or the timeout has passed
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._changed(trial_no, mark) or not self._connected, timeout)
+            return self._changes.get(trial_no, 0) != mark[0]
+
+    def close(self) -> None:
+        """Close the subscription and stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            if self._loop is not None and self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self) -> Self:
+        """Start the subscription."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the subscription."""
+        self.close()
+
+    def _changed(self, trial_no: int, mark: Mark) -> bool:
+        return self._closed or self._changes.get(trial_no, 0) != mark[0] or self._connections != mark[1]
+
+    def _run(self) -> None:
+        """Run the event loop of the subscription."""
+        loop = asyncio.new_event_loop()
+        with self._condition:
+            if self._closed:
+                loop.close()
+                return
+            self._loop = loop
+            self._task = loop.create_task(self._subscribe_forever())
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    async def _subscribe_forever(self) -> None:
+        """Keep the subscription open, reconnecting after errors."""
+        while not self._closed:
+            try:
+                await self._subscribe()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: S110 waiting trials fall back to polling while disconnected
+                pass
+            finally:
+                self._set_connected(connected=False)
+            # gql may swallow the cancellation of `close` while closing the session.
+            if self._closed:
+                return
+            await asyncio.sleep(self.reconnect_interval_sec)
+
+    async def _subscribe(self) -> None:
+        """Receive notifications until the socket drops."""
+        async with Client(transport=self._transport_factory()) as session:
+            self._set_connected(connected=True)
+            async for result in session.subscribe(self._document, variable_values={"matchId": self.match_id}):
+                self._notify(result)
+
+    def _set_connected(self, *, connected: bool) -> None:
+        with self._condition:
+            if connected and not self._connected:
+                self._connections += 1
+            self._connected = connected
+            self._condition.notify_all()
+
+    def _notify(self, result: dict[str, Any]) -> None:
+        """Record the changes of the watched trials in a notification and wake the trials waiting for them."""
+        with self._condition:
+            for data in result.values():
+                for trial in data if isinstance(data, list) else [data]:
+                    if isinstance(trial, dict) and trial.get("trialNo") in self._changes:
+                        self._changes[trial["trialNo"]] += 1
+            self._condition.notify_all()
@@ -0,0 +1,89 @@
+"""Running estimates of the time from submission to evaluation and scoring results.
+
+The estimates let `Trial` schedule its first poll near the expected completion time of the trial, instead of
+polling from 0.5 seconds after submission whatever the problem.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from uuid import UUID
+
+Phase = Literal["evaluation", "scoring"]
+
+
+class LatencyEstimate(NamedTuple):
+    """The estimated time in seconds from submission to the end of a phase of a trial."""
+
+    mean: float
+    deviation: float
+
+
+class LatencyEstimator:
+    """Thread-safe exponentially weighted moving averages of the latency of the trials, per match and phase.
+
+    A sample is the time from submission to the end of the evaluation (or scoring). It is not observed directly: the
+    polls only tell that the trial finished between two status checks, and the server timestamps tell how long the
+    evaluation itself took, without the time spent queued. `observe` combines the two.
+    """
+
+    smoothing: float
+
+    def __init__(self, smoothing: float = 0.2) -> None:
+        """Initialize the estimator.
+
+        Args:
+            smoothing (float): The weight of a new sample in the moving averages, between 0 and 1
+        """
+        self.smoothing = smoothing
+        self._estimates: dict[tuple[UUID, Phase], LatencyEstimate] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, match_uuid: UUID, phase: Phase) -> LatencyEstimate | None:
+        """Get the latency estimate of a match, or `None` before the first observation."""
+        with self._lock:
+            return self._estimates.get((match_uuid, phase))
+
+    def observe(
+        self,
+        match_uuid: UUID,
+        phase: Phase,
+        checks: list[float],
+        started_at: datetime | None = None,
+        finished_at: datetime | None = None,
+    ) -> None:
+        """Update the estimate with a finished wait.
+
+        Args:
+            match_uuid (UUID): The match UUID
+            phase (Phase): The phase waited for
+            checks (list[float]): The elapsed times since submission of the status checks of the wait; the trial was
+                found finished at the last one
+            started_at (datetime | None): The start time of the phase reported by the server
+            finished_at (datetime | None): The end time of the phase reported by the server
+        """
+        if not checks:
+            return
+        lower = checks[-2] if len(checks) > 1 else 0.0
+        upper = checks[-1]
+        # The server-side duration is a lower bound of the latency, so it is the best guess within the interval.
+        duration = (finished_at - started_at).total_seconds() if started_at and finished_at else (lower + upper) / 2
+        self.add_sample(match_uuid, phase, min(max(duration, lower), upper))
+
+    def add_sample(self, match_uuid: UUID, phase: Phase, sample_sec: float) -> None:
+        """Update the estimate with a latency sample in seconds."""
+        key = (match_uuid, phase)
+        with self._lock:
+            previous = self._estimates.get(key)
+            if previous is None:
+                self._estimates[key] = LatencyEstimate(mean=sample_sec, deviation=sample_sec / 2)
+                return
+            error = sample_sec - previous.mean
+            self._estimates[key] = LatencyEstimate(
+                mean=previous.mean + self.smoothing * error,
+                deviation=(1 - self.smoothing) * previous.deviation + self.smoothing * abs(error),
+            )
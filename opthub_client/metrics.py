@@ -0,0 +1,246 @@
+"""Metrics of the use of the OptHub public REST API, for long-running optimization workers.
+
+Pass a `MetricsRegistry` to `OptHub` to count the requests, submissions, polls and retries, and to measure request
+and submit-to-result latencies. Read the metrics with `MetricsRegistry.snapshot`, or expose them to Prometheus with
+`MetricsRegistry.to_prometheus`. Without a registry, nothing is measured.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+from opthub_api_client.exceptions import ApiException
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# Upper bounds in seconds of the buckets of the latency histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Upper bounds of the buckets of the histogram of the number of polls per wait
+POLL_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Counter:
+    """A thread-safe counter with labels."""
+
+    name: str
+    help: str
+    label_names: tuple[str, ...]
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> None:  # noqa: A002
+        """Create a counter.
+
+        Args:
+            name (str): The metric name
+            help (str): The description of the metric
+            label_names (tuple[str, ...]): The names of the labels
+        """
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter of the labels by `amount`."""
+        key = tuple(labels[name] for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Get the values of the counter per labels."""
+        with self._lock:
+            return [
+                {"labels": dict(zip(self.label_names, key, strict=True)), "value": value}
+                for key, value in self._values.items()
+            ]
+
+    def to_prometheus(self) -> list[str]:
+        """Get the lines of the counter in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(sample['labels'])} {_number(sample['value'])}" for sample in self.snapshot())
+        return lines
+
+
+class Histogram:
+    """A thread-safe histogram with labels and cumulative buckets."""
+
+    name: str
+    help: str
+    label_names: tuple[str, ...]
+    buckets: tuple[float, ...]
+
+    def __init__(
+        self,
+        name: str,
+        help: str,  # noqa: A002
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Create a histogram.
+
+        Args:
+            name (str): The metric name
+            help (str): The description of the metric
+            label_names (tuple[str, ...]): The names of the labels
+            buckets (tuple[float, ...]): The upper bounds of the buckets in ascending order
+        """
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record a value for the labels."""
+        key = tuple(labels[name] for name in self.label_names)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Get the count, sum and cumulative bucket counts of the histogram per labels."""
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            cumulative = [sum(counts[: i + 1]) for i in range(len(counts))]
+            samples.append(
+                {
+                    "labels": dict(zip(self.label_names, key, strict=True)),
+                    "count": cumulative[-1],
+                    "sum": total,
+                    "buckets": dict(zip([*self.buckets, math.inf], cumulative, strict=True)),
+                },
+            )
+        return samples
+
+    def to_prometheus(self) -> list[str]:
+        """Get the lines of the histogram in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for sample in self.snapshot():
+            for bound, count in sample["buckets"].items():
+                lines.append(f"{self.name}_bucket{_labels({**sample['labels'], 'le': _number(bound)})} {count}")
+            lines.append(f"{self.name}_sum{_labels(sample['labels'])} {_number(sample['sum'])}")
+            lines.append(f"{self.name}_count{_labels(sample['labels'])} {sample['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics recorded by `OptHub`, its matches and trials."""
+
+    requests: Counter
+    request_seconds: Histogram
+    submissions: Counter
+    retries: Counter
+    polls: Counter
+    polls_per_wait: Histogram
+    poll_sleep_seconds: Counter
+    result_seconds: Histogram
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Create the metrics.
+
+        Args:
+            buckets (tuple[float, ...]): The upper bounds in seconds of the buckets of the latency histograms
+        """
+        self.requests = Counter(
+            "opthub_requests_total",
+            "Requests to the OptHub REST API by endpoint and response status.",
+            ("endpoint", "status"),
+        )
+        self.request_seconds = Histogram(
+            "opthub_request_duration_seconds",
+            "Duration of the requests to the OptHub REST API, including retries.",
+            ("endpoint",),
+            buckets,
+        )
+        self.submissions = Counter("opthub_submissions_total", "Solutions accepted by the server.")
+        self.retries = Counter("opthub_retries_total", "Retried requests by cause.", ("cause",))
+        self.polls = Counter("opthub_polls_total", "Status checks of waiting trials by phase.", ("phase",))
+        self.polls_per_wait = Histogram(
+            "opthub_polls_per_wait",
+            "Status checks needed to wait for a phase of a trial.",
+            ("phase",),
+            POLL_BUCKETS,
+        )
+        self.poll_sleep_seconds = Counter(
+            "opthub_poll_sleep_seconds_total",
+            "Time spent sleeping between status checks of waiting trials.",
+        )
+        self.result_seconds = Histogram(
+            "opthub_submit_to_result_seconds",
+            "Time from submission until the end of a phase of a trial was seen.",
+            ("phase",),
+            buckets,
+        )
+
+    @property
+    def metrics(self) -> list[Counter | Histogram]:
+        """All the metrics."""
+        return [
+            self.requests,
+            self.request_seconds,
+            self.submissions,
+            self.retries,
+            self.polls,
+            self.polls_per_wait,
+            self.poll_sleep_seconds,
+            self.result_seconds,
+        ]
+
+    @contextmanager
+    def track_request(self, endpoint: str) -> Iterator[None]:
+        """Count a request and measure its duration.
+
+        Args:
+            endpoint (str): The name of the endpoint
+        """
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except ApiException as e:
+            status = str(e.status)
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.requests.inc(endpoint=endpoint, status=status)
+            self.request_seconds.observe(time.perf_counter() - start, endpoint=endpoint)
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        """Get the current values of all the metrics as plain Python objects, keyed by metric name."""
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def to_prometheus(self) -> str:
+        """Export all the metrics in the Prometheus text exposition format."""
+        return "\n".join(line for metric in self.metrics for line in metric.to_prometheus()) + "\n"
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Format labels in the Prometheus text format."""
+    if not labels:
+        return ""
+    escaped = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value in the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Format a sample value in the Prometheus text format."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
@@ -2,23 +2,12 @@
 
 from typing import TypedDict
 
-from gql import gql
-
 from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.query_error import QueryError
-from opthub_client.graphql.client import execute_graphql
-
+from opthub_client.graphql.client import execute_graphql_async, run_sync
+from opthub_client.graphql.documents import register
 
-class ApiKey(TypedDict):
-    """This class represents the API key type."""
-
-    expires_at: str
-    value: str
-
-
-def create_api_key(force: bool) -> ApiKey:
-    """Create and get API key from the server."""
-    mutation = gql("""
+CREATE_API_KEY = register("""
         mutation createAPIKey(
         $force: Boolean
         ) {
@@ -30,8 +19,25 @@ def create_api_key(force: bool) -> ApiKey:
             }
         }
     """)
+
+
+class ApiKey(TypedDict):
+    """This class represents the API key type."""
+
+    expires_at: str
+    value: str
+
+
+def create_api_key(force: bool) -> ApiKey:
+    """Create and get API key from the server."""
+    return run_sync(create_api_key_async(force))
+
+
+async def create_api_key_async(force: bool) -> ApiKey:
+    """Create and get API key from the server."""
+    mutation = CREATE_API_KEY
     try:
-        result = execute_graphql(mutation, variables={"force": force})
+        result = await execute_graphql_async(mutation, variables={"force": force})
     except GraphQLError as e:
         raise QueryError(resource="api_key", detail=str(e.message)) from e
     data = result.get("createAPIKey")
@@ -1,33 +1,13 @@
 """This module contains the functions related to competitions."""
 
-from typing import TypedDict
-
-from gql import gql
+from typing import Any, TypedDict
 
 from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.query_error import QueryError
-from opthub_client.graphql.client import execute_graphql
-
-
-class Competition(TypedDict):
-    """This class represents the competition type."""
-
-    id: str
-    alias: str
-
+from opthub_client.graphql.client import execute_graphql_async, run_sync
+from opthub_client.graphql.documents import register
 
-def fetch_competitions_by_user() -> list[Competition]:
-    """Fetch competitions and matches that the user is participating in.
-
-    Args:
-         uid (str): user ID
-         username (str): user name
-    Returns:
-         list[Competition]: Competitions and matches that the user is participating in
-    Raises:
-        ValueError: If no competitions are found for the user or the fetch fails.
-    """
-    query = gql("""
+GET_COMPETITIONS_BY_PARTICIPANT_USER = register("""
         query getCompetitionsByParticipantUser(
         $id: String,
         $name: String
@@ -47,10 +27,53 @@ def fetch_competitions_by_user() -> list[Competition]:
             }
         }
         """)
+
+
+class Competition(TypedDict):
+    """This class represents the competition type."""
+
+    id: str
+    alias: str
+
+
+def fetch_competitions_by_user() -> list[Competition]:
+    """Fetch competitions and matches that the user is participating in.
+
+    Args:
+         uid (str): user ID
+         username (str): user name
+    Returns:
+         list[Competition]: Competitions and matches that the user is participating in
+    Raises:
+        ValueError: If no competitions are found for the user or the fetch fails.
+    """
+    return run_sync(fetch_competitions_by_user_async())
+
+
+async def fetch_competitions_by_user_async() -> list[Competition]:
+    """Fetch competitions and matches that the user is participating in.
+
+    Returns:
+         list[Competition]: Competitions and matches that the user is participating in
+    Raises:
+        QueryError: If no competitions are found for the user or the fetch fails.
+    """
+    query = GET_COMPETITIONS_BY_PARTICIPANT_USER
     try:
-        result = execute_graphql(query)
+        result = await execute_graphql_async(query)
     except GraphQLError as e:
-        raise QueryError(resource="competitions", detail=str(e)) from e
+        return parse_competitions(e)
+    return parse_competitions(result)
+
+
+def parse_competitions(result: dict[str, Any] | GraphQLError) -> list[Competition]:
+    """Parse the result of the `GET_COMPETITIONS_BY_PARTICIPANT_USER` query, e.g. executed in a batch.
+
+    Returns:
+         list[Competition]: Competitions that the user is participating in or has participated in
+    """
+    if isinstance(result, GraphQLError):
+        raise QueryError(resource="competitions", detail=str(result)) from result
     data = result.get("getCompetitionsByParticipantUser")
     if not data:
         raise QueryError(resource="competitions", detail="No data returned.")
@@ -1,32 +1,13 @@
 """This module contains the functions related to matches."""
 
-from typing import TypedDict
-
-from gql import gql
+from typing import Any, TypedDict
 
 from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.query_error import QueryError
-from opthub_client.graphql.client import execute_graphql
-
-
-class Match(TypedDict):
-    """This class represents the match type."""
-
-    id: str
-    alias: str
-
-
-def fetch_matches_by_competition(comp_id: str, comp_alias: str) -> list[Match]:
-    """Fetch matches by competition alias.
-
-    Args:
-        comp_id (str): Competition ID
-        comp_alias (str): Competition alias
+from opthub_client.graphql.client import execute_graphql_async, run_sync
+from opthub_client.graphql.documents import register
 
-    Returns:
-        list[Match]: Matches related to the competition
-    """
-    query = gql("""
+GET_MATCHES_BY_COMPETITION = register("""
         query getMatchesByCompetition(
         $id: String,
         $alias: String
@@ -72,11 +53,69 @@ def fetch_matches_by_competition(comp_id: str, comp_alias: str) -> list[Match]:
             closeAt
         }
         }""")
+
+
+class Match(TypedDict):
+    """This class represents the match type."""
+
+    id: str
+    alias: str
+    success_trials_budget: int | None
+    submissions_budget: int | None
+    open_at: str | None
+    close_at: str | None
+
+
+def fetch_matches_by_competition(comp_id: str, comp_alias: str) -> list[Match]:
+    """Fetch matches by competition alias.
+
+    Args:
+        comp_id (str): Competition ID
+        comp_alias (str): Competition alias
+
+    Returns:
+        list[Match]: Matches related to the competition
+    """
+    return run_sync(fetch_matches_by_competition_async(comp_id, comp_alias))
+
+
+async def fetch_matches_by_competition_async(comp_id: str, comp_alias: str) -> list[Match]:
+    """Fetch matches by competition alias.
+
+    Args:
+        comp_id (str): Competition ID
+        comp_alias (str): Competition alias
+
+    Returns:
+        list[Match]: Matches related to the competition
+    """
+    query = GET_MATCHES_BY_COMPETITION
     try:
-        result = execute_graphql(query, variables={"id": comp_id, "alias": comp_alias})
+        result = await execute_graphql_async(query, variables={"id": comp_id, "alias": comp_alias})
     except GraphQLError as e:
-        raise QueryError(resource="matches", detail=str(e.message)) from e
+        return parse_matches(e)
+    return parse_matches(result)
+
+
+def parse_matches(result: dict[str, Any] | GraphQLError) -> list[Match]:
+    """Parse the result of the `GET_MATCHES_BY_COMPETITION` query, e.g. executed in a batch.
+
+    Returns:
+        list[Match]: Matches related to the competition
+    """
+    if isinstance(result, GraphQLError):
+        raise QueryError(resource="matches", detail=str(result.message)) from result
     data = result.get("getMatchesByCompetition")
     if not isinstance(data, list):
         raise QueryError(resource="matches", detail="Invalid data returned.")
-    return [Match(id=match["id"], alias=match["alias"]) for match in data]
+    return [
+        Match(
+            id=match["id"],
+            alias=match["alias"],
+            success_trials_budget=match.get("successTrialsBudget"),
+            submissions_budget=match.get("submissionsBudget"),
+            open_at=match.get("openAt"),
+            close_at=match.get("closeAt"),
+        )
+        for match in data
+    ]
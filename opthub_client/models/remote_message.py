@@ -1,10 +1,22 @@
 """Fetching messages for display in OptHub Client."""
 
-from gql import gql
+from typing import Any
 
 from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.query_error import QueryError
-from opthub_client.graphql.client import execute_graphql
+from opthub_client.graphql.client import execute_graphql_async, run_sync
+from opthub_client.graphql.documents import register
+
+GET_CLI_VERSION_STATUS = register("""
+    query getCLIVersionStatus($version: String) {
+    getCLIVersionStatus(version: $version) {
+        label
+        labelColor
+        message
+        messageColor
+    }
+    }
+    """)
 
 
 class RemoteMessage:
@@ -36,20 +48,31 @@ def get_version_status_messages(version: str) -> list[RemoteMessage]:
     Returns:
         dict[str, str]: The messages.
     """
-    query = gql("""
-    query getCLIVersionStatus($version: String) {
-    getCLIVersionStatus(version: $version) {
-        label
-        labelColor
-        message
-        messageColor
-    }
-    }
-    """)
+    return run_sync(get_version_status_messages_async(version))
+
+
+async def get_version_status_messages_async(version: str) -> list[RemoteMessage]:
+    """Get messages for display in OptHub Client.
+
+    Returns:
+        list[RemoteMessage]: The messages.
+    """
+    query = GET_CLI_VERSION_STATUS
     try:
-        result = execute_graphql(query, variables={"version": version})
+        result = await execute_graphql_async(query, variables={"version": version})
     except GraphQLError as e:
-        raise QueryError(resource="version status", detail=str(e.message)) from e
+        return parse_version_status_messages(e)
+    return parse_version_status_messages(result)
+
+
+def parse_version_status_messages(result: dict[str, Any] | GraphQLError) -> list[RemoteMessage]:
+    """Parse the result of the `GET_CLI_VERSION_STATUS` query, e.g. executed in a batch.
+
+    Returns:
+        list[RemoteMessage]: The messages.
+    """
+    if isinstance(result, GraphQLError):
+        raise QueryError(resource="version status", detail=str(result.message)) from result
     data = result.get("getCLIVersionStatus")
     if data is None:
         raise QueryError(resource="version status", detail="No data returned.")
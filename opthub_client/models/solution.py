@@ -1,20 +1,11 @@
 """Solution model."""
 
-from gql import gql
-
 from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.mutation_error import Method, MutationError
-from opthub_client.graphql.client import execute_graphql
-
+from opthub_client.graphql.client import execute_graphql_async, run_sync
+from opthub_client.graphql.documents import register
 
-def create_solution(match_id: str, variable: str) -> None:
-    """Create a solution by AppSync endpoint.
-
-    Args:
-        match_id (str): The match ID.
-        variable (object): The variable of solution.
-    """
-    mutation = gql("""
+CREATE_SOLUTION = register("""
     mutation createSolution(
         $matchId: String!,
         $variable: AWSJSON!) {
@@ -29,11 +20,31 @@ def create_solution(match_id: str, variable: str) -> None:
         }
     }
     """)
+
+
+def create_solution(match_id: str, variable: str) -> None:
+    """Create a solution by AppSync endpoint.
+
+    Args:
+        match_id (str): The match ID.
+        variable (object): The variable of solution.
+    """
+    run_sync(create_solution_async(match_id, variable))
+
+
+async def create_solution_async(match_id: str, variable: str) -> None:
+    """Create a solution by AppSync endpoint.
+
+    Args:
+        match_id (str): The match ID.
+        variable (object): The variable of solution.
+    """
+    mutation = CREATE_SOLUTION
     solution_input = {
         "matchId": match_id,
         "variable": variable,
     }
     try:
-        execute_graphql(mutation, solution_input)
+        await execute_graphql_async(mutation, solution_input)
     except GraphQLError as e:
         raise MutationError(method=Method.CREATE, resource="solution", detail="Failed to submit solutions") from e
@@ -1,16 +1,104 @@
 """This module contains the types and functions related to participant trials."""
 
+from collections.abc import Iterable, Iterator
 from typing import Any, Literal, TypedDict
 
-from gql import gql
 from graphql import DocumentNode
 
 from opthub_client.errors.graphql_error import GraphQLError
 from opthub_client.errors.query_error import QueryError
-from opthub_client.graphql.client import execute_graphql, execute_graphql_async
+from opthub_client.graphql.client import (
+    execute_graphql_async,
+    execute_graphql_stream,
+    execute_graphql_stream_async,
+    run_sync,
+)
+from opthub_client.graphql.documents import register
+from opthub_client.graphql.stream import JSONArrayStream
 
 TrialStatus = Literal["evaluating", "success", "scoring", "evaluator_failed", "scorer_failed"]
 
+# The path of the trials in the response of the `GET_MATCH_TRIALS_BY_PARTICIPANT` query
+TRIALS_PATH = ("data", "getMatchTrialsByParticipant", "trials")
+
+GET_MATCH_TRIAL_BY_PARTICIPANT = register("""
+            query getMatchTrialByParticipant(
+            $match: MatchIdentifierInput!,
+            $trialNo: Int!
+            ) {
+            getMatchTrialByParticipant(
+                match: $match,
+                trialNo: $trialNo
+            ) {
+                trialNo
+                status
+                solution {
+                    variable
+                    createdAt
+                }
+                evaluation {
+                    constraint
+                    feasible
+                    objective
+                    status
+                    startedAt
+                    finishedAt
+                    info
+                    error
+                }
+                score {
+                    status
+                    startedAt
+                    finishedAt
+                    value
+                    error
+                }
+            }}""")
+
+GET_MATCH_TRIALS_BY_PARTICIPANT = register("""
+            query getMatchTrialsByParticipant(
+            $match: MatchIdentifierInput!,
+            $participant: ParticipantInput,
+            $range: MatchTrialsRangeInput,
+            $order: Order
+            ) {
+            getMatchTrialsByParticipant(
+                match: $match,
+                participant: $participant,
+                range: $range,
+                order: $order
+            ) {
+                isFirst
+                isLast
+                startTrialNo
+                endTrialNo
+                trials {
+                    trialNo
+                    status
+                    solution {
+                        variable
+                        createdAt
+                    }
+                    evaluation {
+                        constraint
+                        feasible
+                        objective
+                        status
+                        startedAt
+                        finishedAt
+                        error
+                        info
+                    }
+                    score {
+                        status
+                        startedAt
+                        finishedAt
+                        value
+                        error
+                    }
+                }
+            }}""")
+
 
 class Solution(TypedDict):
     """This class represents the solution type."""
@@ -107,41 +195,23 @@ def fetch_trial(match_id: str, trial_no: int) -> Trial | None:
         Trial:
             The the history of the user's submitted solution and their evaluation and score.
     """
-    query = gql("""
-            query getMatchTrialByParticipant(
-            $match: MatchIdentifierInput!,
-            $trialNo: Int!
-            ) {
-            getMatchTrialByParticipant(
-                match: $match,
-                trialNo: $trialNo
-            ) {
-                trialNo
-                status
-                solution {
-                    variable
-                    createdAt
-                }
-                evaluation {
-                    constraint
-                    feasible
-                    objective
-                    status
-                    startedAt
-                    finishedAt
-                    info
-                    error
-                }
-                score {
-                    status
-                    startedAt
-                    finishedAt
-                    value
-                    error
-                }
-            }}""")
+    return run_sync(fetch_trial_async(match_id, trial_no))
+
+
+async def fetch_trial_async(match_id: str, trial_no: int) -> Trial | None:
+    """Fetch the history of the user's submitted solution and their evaluation and score.
+
+    Args:
+        match_id (str): Match ID in the competition
+        trial_no (int): Trial number
+
+    Returns:
+        Trial:
+            The the history of the user's submitted solution and their evaluation and score.
+    """
+    query = GET_MATCH_TRIAL_BY_PARTICIPANT
     try:
-        result = execute_graphql(query, variables={"match": {"id": match_id}, "trialNo": trial_no})
+        result = await execute_graphql_async(query, variables={"match": {"id": match_id}, "trialNo": trial_no})
     except GraphQLError as e:
         raise QueryError(resource="trial", detail=str(e.message)) from e
     if result is None:
@@ -179,6 +249,64 @@ def parse_fetched_trials(result: dict[str, Any], display_only_success: bool) ->
     return trials, is_first, is_last
 
 
+class TrialPage:
+    """A page of trials, created one by one as the response of the `GET_MATCH_TRIALS_BY_PARTICIPANT` query arrives.
+
+    Iterating over the page parses the chunks of the response, and `is_first` and `is_last` are set once all trials
+    have been iterated. The chunks of an asynchronous response can be passed to `feed` and `close` instead.
+    """
+
+    display_only_success: bool
+    is_first: bool
+    is_last: bool
+
+    def __init__(self, display_only_success: bool, chunks: Iterable[bytes] = ()) -> None:
+        """Initialize the page.
+
+        Args:
+            display_only_success (bool): True to display only successful trials
+            chunks (Iterable[bytes]): The chunks of the response
+        """
+        self.display_only_success = display_only_success
+        self.is_first = False
+        self.is_last = False
+        self._chunks = chunks
+        self._stream = JSONArrayStream(TRIALS_PATH)
+
+    def __iter__(self) -> Iterator[Trial]:
+        """Parse the response, yielding the trials as they arrive."""
+        for chunk in self._chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    def feed(self, chunk: bytes) -> list[Trial]:
+        """Parse a chunk of the response, returning the trials it completes."""
+        try:
+            return self._create_trials(self._stream.feed(chunk))
+        except ValueError as e:
+            raise QueryError(resource="trial", detail="Invalid data returned.") from e
+
+    def close(self) -> list[Trial]:
+        """Parse the end of the response, returning the last trials and setting `is_first` and `is_last`."""
+        try:
+            trials = self._create_trials(self._stream.close())
+        except ValueError as e:
+            raise QueryError(resource="trial", detail="Invalid data returned.") from e
+        result = self._stream.result
+        if isinstance(result, dict) and result.get("errors"):
+            raise QueryError(resource="trial", detail=str(result["errors"][0].get("message", "Unexpected error")))
+        data = (result.get("data") or {}).get("getMatchTrialsByParticipant") if isinstance(result, dict) else None
+        if not isinstance(data, dict):
+            raise QueryError(resource="trial", detail="Invalid data returned.")
+        self.is_first = data.get("isFirst", False)
+        self.is_last = data.get("isLast", False)
+        return trials
+
+    def _create_trials(self, raw_trials: list[dict[str, Any]]) -> list[Trial]:
+        trials = [create_trial(raw_trial) for raw_trial in raw_trials]
+        return [trial for trial in trials if not self.display_only_success or trial.get("status") == "success"]
+
+
 def make_fetch_trials_query_document() -> DocumentNode:
     """Make the graphql document node to fetch the trials.
 
@@ -186,49 +314,7 @@ def make_fetch_trials_query_document() -> DocumentNode:
         DocumentNode:
             The graphql document node to fetch the trials.
     """
-    return gql("""
-            query getMatchTrialsByParticipant(
-            $match: MatchIdentifierInput!,
-            $participant: ParticipantInput,
-            $range: MatchTrialsRangeInput,
-            $order: Order
-            ) {
-            getMatchTrialsByParticipant(
-                match: $match,
-                participant: $participant,
-                range: $range,
-                order: $order
-            ) {
-                isFirst
-                isLast
-                startTrialNo
-                endTrialNo
-                trials {
-                    trialNo
-                    status
-                    solution {
-                        variable
-                        createdAt
-                    }
-                    evaluation {
-                        constraint
-                        feasible
-                        objective
-                        status
-                        startedAt
-                        finishedAt
-                        error
-                        info
-                    }
-                    score {
-                        status
-                        startedAt
-                        finishedAt
-                        value
-                        error
-                    }
-                }
-            }}""")
+    return GET_MATCH_TRIALS_BY_PARTICIPANT
 
 
 def make_fetch_trials_query_variables(
@@ -288,14 +374,18 @@ async def fetch_trials_async(
     """
     query = make_fetch_trials_query_document()
     variables = make_fetch_trials_query_variables(match_id, page, page_size, limit, offset, is_asc)
+    trial_page = TrialPage(display_only_success)
+    trials = []
     try:
-        result = await execute_graphql_async(query, variables)
+        async for chunk in execute_graphql_stream_async(query, variables):
+            trials.extend(trial_page.feed(chunk))
     except GraphQLError as e:
         raise QueryError(resource="trial", detail=str(e.message)) from e
-    return parse_fetched_trials(result, display_only_success)
+    trials.extend(trial_page.close())
+    return trials, trial_page.is_first, trial_page.is_last
 
 
-def fetch_trials(
+def stream_trials(
     match_id: str,
     page: int,
     page_size: int,
@@ -303,8 +393,8 @@ def fetch_trials(
     offset: int,
     is_asc: bool,
     display_only_success: bool,
-) -> tuple[list[Trial], bool, bool]:
-    """Fetch the history of the user's submitted solutions and their evaluations and scores.
+) -> TrialPage:
+    """Fetch the history of the user's submitted solutions, creating the trials as the response arrives.
 
     Args:
         match_id (str): Match ID in the competition
@@ -316,13 +406,45 @@ def fetch_trials(
         display_only_success (bool): True to display only successful trials
 
     Returns:
-        list[Trial]:
-            The the history of the user's submitted solutions and their evaluations and scores.
+        TrialPage:
+            The page, whose iteration sends the query and yields the trials.
     """
     query = make_fetch_trials_query_document()
     variables = make_fetch_trials_query_variables(match_id, page, page_size, limit, offset, is_asc)
+    return TrialPage(display_only_success, _stream_query(query, variables))
+
+
+def _stream_query(query: DocumentNode, variables: dict[str, Any]) -> Iterator[bytes]:
     try:
-        result = execute_graphql(query, variables)
+        yield from execute_graphql_stream(query, variables)
     except GraphQLError as e:
         raise QueryError(resource="trial", detail=str(e.message)) from e
-    return parse_fetched_trials(result, display_only_success)
+
+
+def fetch_trials(
+    match_id: str,
+    page: int,
+    page_size: int,
+    limit: int,
+    offset: int,
+    is_asc: bool,
+    display_only_success: bool,
+) -> tuple[list[Trial], bool, bool]:
+    """Fetch the history of the user's submitted solutions and their evaluations and scores.
+
+    Args:
+        match_id (str): Match ID in the competition
+        page (int): Page number
+        page_size(int): Size of the page
+        limit (int): Size of the page
+        offset (int): Trial number to start fetching
+        is_asc (bool): True for show trials in ascending order, False for descending order
+        display_only_success (bool): True to display only successful trials
+
+    Returns:
+        list[Trial]:
+            The the history of the user's submitted solutions and their evaluations and scores.
+    """
+    return run_sync(
+        fetch_trials_async(match_id, page, page_size, limit, offset, is_asc, display_only_success),
+    )
@@ -1,7 +1,11 @@
 """This module contains the OptHub CLI client entrypoint."""
 
+import functools
+from pathlib import Path
+
 import click
 
+from opthub_client import trace
 from opthub_client.controllers.create import create
 from opthub_client.controllers.download import download
 from opthub_client.controllers.help import help
@@ -25,9 +29,27 @@ custom_style = {
 
 @click.group(help="OptHub CLI client.")
 @click.version_option()
+@click.option(
+    "--trace",
+    "trace_enabled",
+    is_flag=True,
+    envvar=trace.TRACE_ENV,
+    help=f"Print a timing waterfall of the command to stderr. Also enabled by {trace.TRACE_ENV}=1.",
+)
+@click.option(
+    "--trace-output",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    envvar=trace.TRACE_OUTPUT_ENV,
+    help="Write a Chrome trace of the command to this JSON file instead.",
+)
 @click.pass_context
-def opt(ctx: click.Context) -> None:  # noqa: ARG001
+def opt(ctx: click.Context, trace_enabled: bool, trace_output: Path | None) -> None:
     """This function is for OptHub CLI client entrypoint."""
+    if trace_enabled or trace_output is not None:
+        trace.tracer.enable()
+        # The span of the command ends before the report, when the context closes
+        ctx.call_on_close(functools.partial(trace.tracer.report, trace_output))
+        ctx.with_resource(trace.span(f"opt {ctx.invoked_subcommand}"))
 
 
 opt.add_command(show)
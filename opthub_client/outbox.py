@@ -0,0 +1,524 @@
+"""A durable local outbox of submissions, drained by background senders.
+
+`Match.submit_nowait` appends a solution to a write-ahead log under the opthub client directory and returns at once,
+so that the optimization loop is neither blocked by a network stall nor loses the solutions of a crashed process.
+Sender threads drain the outbox concurrently and record the trial number of each submission in the log.
+
+A submission whose outcome is uncertain, i.e. whose sending was interrupted by a crash, a read error or a 5xx
+response, is first looked up among the trials following the last trial number known when it was sent, so that it is
+not submitted twice; it is sent again only if it is not found. The log is replayed when the outbox is opened again,
+and the entries whose outcome was acknowledged are compacted away.
+
+An outbox locks its log until it is closed, so a log file is used by one process at a time: opening a log which is
+in use raises `OutboxLockedError`. Give each process its own `file_path` to use outboxes in several processes.
+
+Example:
+    >>> outbox = SubmissionOutbox()
+    >>> with OptHub(api_key, outbox=outbox) as api:
+    ...     entry_id = api.match(match_uuid).submit_nowait([1.0, 2.0])
+    ...     outbox.flush()
+    ...     trial_no = outbox.trial_no(entry_id)
+    ...     outbox.acknowledge(entry_id)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import IO, TYPE_CHECKING, Any, Self
+from uuid import UUID
+
+from opthub_api_client.exceptions import ApiException
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+from opthub_client.context.utils import get_opthub_client_dir
+from opthub_client.scheduler import SubmissionRefusedError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from opthub_client.api import OptHub
+
+FILE_NAME = "outbox.jsonl"
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(file: IO[str]) -> bool:
+        """Lock a file until it is closed, unless another open file holds the lock."""
+        file.seek(0)
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+else:
+    import fcntl
+
+    def _try_lock(file: IO[str]) -> bool:
+        """Lock a file until it is closed, unless another open file holds the lock."""
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+
+class OutboxSubmissionError(Exception):
+    """Exception raised when the server refuses a submission of the outbox."""
+
+
+class OutboxLockedError(Exception):
+    """Exception raised when the log of an outbox is used by another outbox."""
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a request may succeed when sent again: a network error, or a 429 or 5xx response."""
+    if isinstance(error, ApiException):
+        return (
+            error.status is None
+            or error.status == HTTPStatus.TOO_MANY_REQUESTS
+            or error.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+    return True
+
+
+def _was_not_sent(error: Exception) -> bool:
+    """Whether a failed submission certainly did not create a trial: a connection error, or a 429 response."""
+    if isinstance(error, ApiException):
+        status: int | None = error.status
+        return status == HTTPStatus.TOO_MANY_REQUESTS
+    reason = error.reason if isinstance(error, MaxRetryError) else error
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class _Entry:
+    """A submission of the outbox."""
+
+    __slots__ = ("after", "body", "error", "match_uuid", "sent", "trial_no")
+
+    def __init__(self, match_uuid: UUID, body: bytes) -> None:
+        self.match_uuid = match_uuid
+        self.body = body
+        self.sent = False
+        self.after = 0  # the last trial number of the match known when the entry was sent
+        self.trial_no: int | None = None
+        self.error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.trial_no is not None or self.error is not None
+
+
+class SubmissionOutbox:
+    """A thread-safe write-ahead outbox of submissions.
+
+    Each line of the log is a JSON record: `put` stores a solution, `send` marks the start of its submission with
+    the last known trial number of its match, and `done` or `fail` records its outcome. Finished solutions are
+    compacted into their outcome when the log is opened, and acknowledged ones into the last trial number of their
+    match, recorded by `last`.
+    """
+
+    file_path: Path
+    max_in_flight: int
+    retry_interval_sec: float
+    reconcile_timeout_sec: float
+    compact_threshold: int
+    sync: bool
+
+    def __init__(
+        self,
+        file_path: Path | None = None,
+        *,
+        max_in_flight: int = 4,
+        retry_interval_sec: float = 5.0,
+        reconcile_timeout_sec: float = 30.0,
+        compact_threshold: int = 1000,
+        sync: bool = False,
+    ) -> None:
+        """Open the outbox, replaying its log.
+
+        Args:
+            file_path (Path | None): The log file. Defaults to `outbox.jsonl` in the opthub client directory.
+            max_in_flight (int): The number of sender threads, i.e. the maximum number of concurrent submissions.
+            retry_interval_sec (float): The waiting time in seconds before resending after a network or server error,
+                or before looking up the trial of a submission whose outcome is uncertain.
+            reconcile_timeout_sec (float): The time in seconds spent looking up the trials of the submissions whose
+                outcome is uncertain. The submissions which are not found by then are sent again.
+            compact_threshold (int): The number of acknowledged entries after which the log is compacted.
+            sync (bool): Whether to `fsync` each record, so that the log also survives an OS crash. By default, records
+                are written to the OS at once, which survives a crash of the process and takes microseconds.
+
+        Raises:
+            OutboxLockedError: If the log is used by another outbox, of this process or another one
+        """
+        self.file_path = file_path or get_opthub_client_dir() / FILE_NAME
+        self.max_in_flight = max_in_flight
+        self.retry_interval_sec = retry_interval_sec
+        self.reconcile_timeout_sec = reconcile_timeout_sec
+        self.compact_threshold = compact_threshold
+        self.sync = sync
+        self._entries: dict[int, _Entry] = {}
+        self._queue: deque[int] = deque()
+        self._interrupted: list[int] = []
+        self._last_trial_nos: dict[UUID, int] = {}
+        self._acknowledged = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._reconciled = False
+        self._threads: list[threading.Thread] = []
+        self._unfinished = 0
+        self._lock_file = self.file_path.with_name(self.file_path.name + ".lock").open("a")
+        if not _try_lock(self._lock_file):
+            self._lock_file.close()
+            msg = f"The outbox log {self.file_path} is used by another outbox."
+            raise OutboxLockedError(msg)
+        self._load()
+        self._file = self.file_path.open("a", encoding="utf-8")
+        self._next_id = max(self._entries, default=0) + 1
+
+    @property
+    def pending(self) -> int:
+        """The number of solutions which have not been submitted yet."""
+        with self._condition:
+            return self._unfinished
+
+    def put(self, match_uuid: UUID, body: bytes) -> int:
+        """Append a submission encoded by `_encode_variable` to the outbox.
+
+        Args:
+            match_uuid (UUID): The match UUID
+            body (bytes): The request body of the submission
+
+        Returns:
+            int: The ID of the outbox entry
+        """
+        with self._condition:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._write(f'{{"op":"put","id":{entry_id},"match":"{match_uuid}","body":{body.decode()}}}')
+            self._entries[entry_id] = _Entry(match_uuid, body)
+            self._queue.append(entry_id)
+            self._unfinished += 1
+            self._condition.notify()
+        return entry_id
+
+    def trial_no(self, entry_id: int) -> int | None:
+        """Get the trial number of a submitted entry, or `None` if it has not been submitted yet.
+
+        Raises:
+            KeyError: If there is no such entry
+            OutboxSubmissionError: If the server refused the submission
+        """
+        with self._condition:
+            entry = self._entries[entry_id]
+            if entry.error is not None:
+                raise OutboxSubmissionError(entry.error)
+            return entry.trial_no
+
+    def wait(self, entry_id: int, timeout: float | None = None) -> int:
+        """Wait until an entry is submitted, then return its trial number.
+
+        Raises:
+            KeyError: If there is no such entry
+            OutboxSubmissionError: If the server refused the submission
+            TimeoutError: If the entry is not submitted within `timeout`
+        """
+        with self._condition:
+            entry = self._entries[entry_id]
+            if not self._condition.wait_for(lambda: entry.finished, timeout):
+                raise TimeoutError
+            if entry.trial_no is None:
+                raise OutboxSubmissionError(entry.error)
+            return entry.trial_no
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until all the entries are submitted or refused.
+
+        Returns:
+            bool: Whether the outbox was drained within `timeout`
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def acknowledge(self, *entry_ids: int) -> None:
+        """Forget finished entries whose outcome was read, so that they are compacted away from the log.
+
+        Raises:
+            KeyError: If there is no such entry
+            ValueError: If an entry is not finished yet
+        """
+        with self._condition:
+            for entry_id in entry_ids:
+                entry = self._entries[entry_id]
+                if not entry.finished:
+                    msg = f"The outbox entry {entry_id} is not finished yet."
+                    raise ValueError(msg)
+                del self._entries[entry_id]
+                self._acknowledged += 1
+            if self._acknowledged >= self.compact_threshold:
+                self._compact()
+
+    def start(self, api: OptHub) -> None:
+        """Start the sender threads, which submit the entries through `api` until `close` is called.
+
+        The trials of the interrupted submissions are looked up by another thread, and the senders wait for it, so
+        that starting the outbox does not block.
+        """
+        with self._condition:
+            if self._threads or self._closed:
+                return
+            self._threads = [
+                threading.Thread(target=self._send_forever, args=(api,), name="opthub-outbox-sender", daemon=True)
+                for _ in range(self.max_in_flight)
+            ]
+            if self._interrupted:
+                reconciler = threading.Thread(
+                    target=self._reconcile_interrupted,
+                    args=(api, time.monotonic() + self.reconcile_timeout_sec),
+                    name="opthub-outbox-reconciler",
+                    daemon=True,
+                )
+                self._threads.append(reconciler)
+            else:
+                self._reconciled = True
+        for thread in self._threads:
+            thread.start()
+
+    def close(self) -> None:
+        """Stop the sender threads and close the log. Unsent entries are sent when the outbox is opened again."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        with self._condition:
+            if self._acknowledged:
+                self._compact()
+            self._file.close()
+            self._lock_file.close()
+
+    def __enter__(self) -> Self:
+        """Use the outbox in a `with` statement, closing it at the end."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the outbox."""
+        self.close()
+
+    def _write(self, record: str) -> None:
+        """Append a record to the log. The caller holds the lock."""
+        self._file.write(record + "\n")
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def _rewrite(self, records: list[dict[str, Any]]) -> None:
+        """Replace the log by the records atomically."""
+        temporary = self.file_path.with_suffix(".tmp")
+        with temporary.open("w", encoding="utf-8") as file:
+            file.writelines(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+            file.flush()
+            os.fsync(file.fileno())
+        temporary.replace(self.file_path)
+
+    def _last_records(self) -> list[dict[str, Any]]:
+        """The records of the last trial numbers of the acknowledged entries."""
+        return [{"op": "last", "match": str(uuid), "trial": no} for uuid, no in self._last_trial_nos.items()]
+
+    def _record_last_trial_no(self, match_uuid: UUID, trial_no: int) -> None:
+        self._last_trial_nos[match_uuid] = max(self._last_trial_nos.get(match_uuid, 0), trial_no)
+
+    def _load(self) -> None:
+        """Replay the log and compact it into the unfinished entries and the outcomes."""
+        if not self.file_path.exists():
+            return
+        with self.file_path.open(encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:  # a record torn by a crash
+                    continue
+                self._replay(record)
+
+        for entry_id, entry in self._entries.items():
+            if entry.finished:
+                continue
+            if entry.sent:
+                self._interrupted.append(entry_id)
+            else:
+                self._queue.append(entry_id)
+            self._unfinished += 1
+        self._rewrite(self._records())
+
+    def _records(self) -> list[dict[str, Any]]:
+        """The records of the last trial numbers and of the entries in memory, i.e. the compacted log."""
+        records = self._last_records()
+        for entry_id, entry in self._entries.items():
+            if entry.trial_no is not None:
+                records.append({"op": "done", "id": entry_id, "match": str(entry.match_uuid), "trial": entry.trial_no})
+            elif entry.error is not None:
+                records.append({"op": "fail", "id": entry_id, "match": str(entry.match_uuid), "error": entry.error})
+            else:
+                body = json.loads(entry.body)
+                records.append({"op": "put", "id": entry_id, "match": str(entry.match_uuid), "body": body})
+                if entry.sent:
+                    records.append({"op": "send", "id": entry_id, "after": entry.after})
+        return records
+
+    def _replay(self, record: dict[str, Any]) -> None:
+        """Apply a record of the log."""
+        if record["op"] == "last":
+            self._record_last_trial_no(UUID(record["match"]), record["trial"])
+            return
+        entry_id = record["id"]
+        if record["op"] == "put":
+            self._entries[entry_id] = _Entry(UUID(record["match"]), json.dumps(record["body"]).encode())
+            return
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            entry = self._entries[entry_id] = _Entry(UUID(record["match"]), b"")
+        if record["op"] == "send":
+            entry.sent = True
+            entry.after = record.get("after", 0)
+        elif record["op"] == "done":
+            entry.trial_no = record["trial"]
+            self._record_last_trial_no(entry.match_uuid, entry.trial_no)
+        elif record["op"] == "fail":
+            entry.error = record["error"]
+
+    def _compact(self) -> None:
+        """Drop the records of the acknowledged entries from the log. The caller holds the lock."""
+        self._file.close()
+        self._rewrite(self._records())
+        self._file = self.file_path.open("a", encoding="utf-8")
+        self._acknowledged = 0
+
+    def _reconcile_interrupted(self, api: OptHub, deadline: float) -> None:
+        """Find the trials of the entries whose sending was interrupted, then queue the others for the senders."""
+        try:
+            self._reconcile(api, self._interrupted, deadline)
+        finally:
+            with self._condition:
+                self._queue.extend(self._interrupted)
+                self._interrupted.clear()
+                self._reconciled = True
+                self._condition.notify_all()
+
+    def _reconcile(self, api: OptHub, entry_ids: list[int], deadline: float) -> None:
+        """Find the trials of entries whose submission may have been accepted, so that they are not submitted twice.
+
+        The public REST API cannot list the trials, so the trials following the last trial number known when each
+        entry was sent are looked up one by one, until a trial number is not found or the deadline passes. A trial
+        is matched to one entry with the same solution, so that identical solutions are found as many times as they
+        were submitted, and the trials of the finished entries are skipped. Transient errors are retried.
+        """
+        with self._condition:
+            candidates: dict[UUID, list[tuple[int, int, Any]]] = {}
+            for entry_id in entry_ids:
+                entry = self._entries[entry_id]
+                variable = json.loads(entry.body)["variable"]
+                candidates.setdefault(entry.match_uuid, []).append((entry_id, entry.after, variable))
+            known = {
+                (entry.match_uuid, entry.trial_no) for entry in self._entries.values() if entry.trial_no is not None
+            }
+
+        for match_uuid, entries in candidates.items():
+            trial_no = min(after for _, after, _ in entries) + 1
+            while entries and not self._closed and time.monotonic() < deadline:
+                if (match_uuid, trial_no) in known:
+                    trial_no += 1
+                    continue
+                try:
+                    solution = api.trials_api.get_solution(str(match_uuid), trial_no)
+                except Exception as e:
+                    if not _is_transient(e):  # not found, i.e. past the last trial, or refused
+                        break
+                    self._wait_closed(min(self.retry_interval_sec, deadline - time.monotonic()))
+                    continue
+                variable = None if solution.variable is None else solution.variable.to_dict()
+                found = next((c for c in entries if c[1] < trial_no and c[2] == variable), None)
+                if found is not None:
+                    entries.remove(found)
+                    self._finish(found[0], trial_no=trial_no)
+                trial_no += 1
+
+    def _send_forever(self, api: OptHub) -> None:
+        """Submit the queued entries until the outbox is closed."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: (self._queue and self._reconciled) or self._closed)
+                if self._closed:
+                    return
+                entry_id = self._queue.popleft()
+                entry = self._entries.get(entry_id)
+                if entry is None or entry.finished:
+                    continue
+                entry.sent = True
+                entry.after = self._last_trial_nos.get(entry.match_uuid, 0)
+                self._write(f'{{"op":"send","id":{entry_id},"after":{entry.after}}}')
+            try:
+                trial = api.match(entry.match_uuid)._submit_body(entry.body)  # noqa: SLF001
+            except (SubmissionRefusedError, ValueError) as e:
+                self._finish(entry_id, error=str(e) or type(e).__name__)
+            except Exception as e:
+                if isinstance(e, ApiException) and not _is_transient(e):
+                    self._finish(entry_id, error=f"{e.status}: {e.body}")
+                elif _was_not_sent(e):  # resent until the outbox is closed
+                    self._retry(entry_id)
+                else:  # the server may have accepted the solution
+                    self._recover(api, entry_id)
+            else:
+                self._finish(entry_id, trial_no=trial.trial_no)
+
+    def _finish(self, entry_id: int, trial_no: int | None = None, error: str | None = None) -> None:
+        """Record the outcome of an entry and wake the waiting threads."""
+        with self._condition:
+            entry = self._entries[entry_id]
+            if entry.finished:
+                return
+            self._unfinished -= 1
+            entry.trial_no = trial_no
+            entry.error = error
+            entry.body = b""
+            if trial_no is not None:
+                self._record_last_trial_no(entry.match_uuid, trial_no)
+                self._write(f'{{"op":"done","id":{entry_id},"match":"{entry.match_uuid}","trial":{trial_no}}}')
+            else:
+                record = {"op": "fail", "id": entry_id, "match": str(entry.match_uuid), "error": error}
+                self._write(json.dumps(record, separators=(",", ":")))
+            self._condition.notify_all()
+
+    def _retry(self, entry_id: int) -> None:
+        """Queue an entry again after `retry_interval_sec`, unless the outbox is closed in the meantime."""
+        if self._wait_closed(self.retry_interval_sec):
+            return
+        with self._condition:
+            self._queue.append(entry_id)
+            self._condition.notify()
+
+    def _recover(self, api: OptHub, entry_id: int) -> None:
+        """Look up the trial of an entry whose outcome is uncertain, and send the entry again if it is not found.
+
+        The lookup starts after `retry_interval_sec`. An entry left unfinished by closing the outbox is looked up again
+        when the outbox is opened again.
+        """
+        if self._wait_closed(self.retry_interval_sec):
+            return
+        self._reconcile(api, [entry_id], time.monotonic() + self.reconcile_timeout_sec)
+        with self._condition:
+            if not self._closed:
+                self._queue.append(entry_id)
+                self._condition.notify()
+
+    def _wait_closed(self, timeout: float) -> bool:
+        """Wait until the outbox is closed or the timeout passes, and return whether it is closed."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._closed, max(timeout, 0.0))
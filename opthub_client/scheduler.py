@@ -0,0 +1,226 @@
+"""Client-side scheduling of submissions within the budget and the window of a match.
+
+The server rejects submissions beyond the submissions budget, beyond the success trials budget, or outside the
+match window. A `SubmissionScheduler` attached to a `Match` keeps track of the budget used locally and paces the
+submissions with a token bucket, so that concurrent workers do not waste round trips on submissions which would be
+rejected anyway.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Self
+
+if TYPE_CHECKING:
+    from opthub_client.models.match import Match as MatchData
+
+
+class SubmissionRefusedError(Exception):
+    """Exception raised when a submission would exceed the budget or the window of the match."""
+
+
+class SubmissionScheduler:
+    """A thread-safe scheduler of the submissions to a match.
+
+    A submission first takes a token from a bucket refilled at `rate` tokens per second (up to `burst` tokens),
+    waiting for one if necessary. Submissions are refused once the submissions budget or the success trials budget
+    is used up, or after the match closes. Submissions before the match opens wait for the opening if `block` is
+    True, and are refused otherwise.
+
+    The submissions in flight count against the success trials budget, so that concurrent workers do not overshoot
+    it: a submission waits while the submissions being sent and the accepted trials which have not finished yet
+    could use up the budget, and is refused once the successful trials alone have used it up. A trial stops being in
+    flight once its success or failure is recorded, e.g. by waiting for its evaluation, so pass a timeout to `acquire`
+    when the trials in flight may never be waited for.
+    """
+
+    submissions_budget: int | None
+    success_trials_budget: int | None
+    open_at: datetime | None
+    close_at: datetime | None
+    rate: float | None
+    burst: int
+    block: bool
+    submissions: int
+    success_trials: set[int]
+
+    def __init__(
+        self,
+        submissions_budget: int | None = None,
+        success_trials_budget: int | None = None,
+        open_at: datetime | None = None,
+        close_at: datetime | None = None,
+        rate: float | None = None,
+        burst: int = 1,
+        *,
+        block: bool = True,
+        used_submissions: int = 0,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            submissions_budget (int | None): The maximum number of submissions, or `None` for no limit
+            success_trials_budget (int | None): The maximum number of successful trials, or `None` for no limit
+            open_at (datetime | None): The opening time of the match
+            close_at (datetime | None): The closing time of the match
+            rate (float | None): The maximum average number of submissions per second, or `None` for no limit
+            burst (int): The maximum number of submissions sent at once at the full rate
+            block (bool): Whether to wait for the opening of the match instead of refusing submissions
+            used_submissions (int): The number of submissions already made, e.g. in a previous run
+        """
+        self.submissions_budget = submissions_budget
+        self.success_trials_budget = success_trials_budget
+        self.open_at = open_at
+        self.close_at = close_at
+        self.rate = rate
+        self.burst = burst
+        self.block = block
+        self.submissions = used_submissions
+        self.success_trials = set()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._sending = 0
+        self._unfinished_trials: set[int] = set()
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_match(cls: type[Self], match: MatchData, **kwargs: Any) -> Self:  # noqa: ANN401
+        """Create a scheduler from the budget and the window of a match fetched by `fetch_matches_by_competition`.
+
+        Args:
+            match (MatchData): The match
+            **kwargs (Any): The other arguments of the scheduler
+
+        Returns:
+            SubmissionScheduler: The scheduler
+        """
+        return cls(
+            submissions_budget=match["submissions_budget"],
+            success_trials_budget=match["success_trials_budget"],
+            open_at=_parse_datetime(match["open_at"]),
+            close_at=_parse_datetime(match["close_at"]),
+            **kwargs,
+        )
+
+    @property
+    def remaining_submissions(self) -> int | None:
+        """The number of submissions left in the budget, or `None` for no limit."""
+        if self.submissions_budget is None:
+            return None
+        return max(0, self.submissions_budget - self.submissions)
+
+    def acquire(self, timeout: float | None = None) -> None:
+        """Reserve the budget of a submission, waiting for the rate limit and the opening of the match.
+
+        Args:
+            timeout (float | None): The maximum time in seconds to wait
+
+        Raises:
+            SubmissionRefusedError: If the submission would exceed the budget or the window of the match
+            TimeoutError: If the submission cannot be sent within `timeout`
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                wait_sec = self._try_acquire()
+                if wait_sec == 0:
+                    return
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and (remaining <= 0 or (wait_sec is not None and wait_sec > remaining)):
+                    raise TimeoutError
+                self._condition.wait(remaining if wait_sec is None else wait_sec)
+
+    def release(self) -> None:
+        """Give back the budget of a submission which the server has not accepted."""
+        with self._condition:
+            self.submissions = max(0, self.submissions - 1)
+            self._sending = max(0, self._sending - 1)
+            self._condition.notify_all()
+
+    def record_submission(self, trial_no: int | None) -> None:
+        """Record the end of the sending of a submission.
+
+        Args:
+            trial_no (int | None): The number of the trial created by the submission, or `None` if it is unknown
+                whether the server has accepted the submission
+        """
+        with self._condition:
+            self._sending = max(0, self._sending - 1)
+            if trial_no is not None and trial_no not in self.success_trials:
+                self._unfinished_trials.add(trial_no)
+            self._condition.notify_all()
+
+    def record_success(self, trial_no: int) -> None:
+        """Count a successful trial towards the success trials budget.
+
+        Args:
+            trial_no (int): The trial number
+        """
+        with self._condition:
+            self.success_trials.add(trial_no)
+            self._unfinished_trials.discard(trial_no)
+            self._condition.notify_all()
+
+    def record_failure(self, trial_no: int) -> None:
+        """Record a failed trial, which gives back its share of the success trials budget.
+
+        Args:
+            trial_no (int): The trial number
+        """
+        with self._condition:
+            self._unfinished_trials.discard(trial_no)
+            self._condition.notify_all()
+
+    def _try_acquire(self) -> float | None:
+        """Reserve the budget of a submission if possible.
+
+        Returns:
+            float | None: 0 if the budget is reserved, otherwise the time to wait in seconds, or `None` to wait until
+                a submission in flight ends
+        """
+        now = datetime.now(UTC)
+        if self.close_at is not None and now >= self.close_at:
+            msg = "The match is closed."
+            raise SubmissionRefusedError(msg)
+        if self.open_at is not None and now < self.open_at:
+            if not self.block:
+                msg = "The match is not open yet."
+                raise SubmissionRefusedError(msg)
+            return (self.open_at - now).total_seconds()
+        if self.submissions_budget is not None and self.submissions >= self.submissions_budget:
+            msg = "The submissions budget is used up."
+            raise SubmissionRefusedError(msg)
+        if not self._has_success_budget():
+            return None
+        if self.rate is not None:
+            monotonic = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (monotonic - self._refilled_at) * self.rate)
+            self._refilled_at = monotonic
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        self.submissions += 1
+        self._sending += 1
+        return 0
+
+    def _has_success_budget(self) -> bool:
+        """Whether the success trials budget is left even if all the submissions in flight succeed.
+
+        Raises:
+            SubmissionRefusedError: If the successful trials have used up the success trials budget
+        """
+        if self.success_trials_budget is None:
+            return True
+        if len(self.success_trials) >= self.success_trials_budget:
+            msg = "The success trials budget is used up."
+            raise SubmissionRefusedError(msg)
+        return len(self.success_trials) + len(self._unfinished_trials) + self._sending < self.success_trials_budget
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    """Parse an ISO 8601 date string of the GraphQL API."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
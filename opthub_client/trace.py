@@ -0,0 +1,213 @@
+"""Timing traces of the OptHub CLI, to find where the time of a command goes.
+
+Tracing is enabled by `opt --trace` or `OPTHUB_TRACE=1`. Spans are then recorded around the loading of the
+credentials, the creation and connection of the GraphQL clients, each GraphQL request and the rendering of the results.
+At the end of the command, the spans are printed to stderr as a waterfall, or written as a Chrome trace with
+`opt --trace-output trace.json`, to be opened in chrome://tracing or https://ui.perfetto.dev.
+
+Times are relative to the import of this module, which happens while the CLI imports its commands, so that the first
+span, `startup`, covers most of the import time. Without tracing, a span only checks a flag.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, NamedTuple, TextIO, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from contextlib import AbstractContextManager
+    from pathlib import Path
+
+F = TypeVar("F", bound="Callable[..., Any]")
+
+# The environment variables enabling tracing, printed as a waterfall or written to a Chrome trace file
+TRACE_ENV = "OPTHUB_TRACE"
+TRACE_OUTPUT_ENV = "OPTHUB_TRACE_OUTPUT"
+# The widths of the columns of the waterfall
+NAME_WIDTH = 40
+BAR_WIDTH = 40
+
+# The nesting depth of the current span, per thread and asyncio task
+_depth: contextvars.ContextVar[int] = contextvars.ContextVar("opthub_trace_depth", default=0)
+
+
+class Span(NamedTuple):
+    """A timed operation. Times are in seconds since the origin of the tracer."""
+
+    name: str
+    start: float
+    duration: float
+    depth: int
+    thread_id: int
+    thread_name: str
+    args: dict[str, Any]
+
+
+class Tracer:
+    """A thread-safe recorder of timed spans, disabled until `enable` is called."""
+
+    enabled: bool
+    origin: float
+
+    def __init__(self) -> None:
+        """Initialize the tracer, with its origin at the current time."""
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording spans, with a first `startup` span from the origin of the tracer."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._record("startup", self.origin, time.perf_counter(), 0, {})
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:  # noqa: ANN401
+        """Record the time spent in the block, if tracing is enabled.
+
+        Args:
+            name (str): The name of the span
+            **args (Any): The details of the span, shown in the Chrome trace
+        """
+        if not self.enabled:
+            yield
+            return
+        depth = _depth.get()
+        _depth.set(depth + 1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            # Set rather than reset, because async generators may be closed from another context
+            _depth.set(depth)
+            self._record(name, start, end, depth, args)
+
+    @property
+    def spans(self) -> list[Span]:
+        """The recorded spans, in the order of their start."""
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span.start)
+
+    def print_waterfall(self, file: TextIO | None = None) -> None:
+        """Print the spans as a waterfall, with their start and duration in milliseconds.
+
+        Args:
+            file (TextIO | None): The output. Defaults to stderr.
+        """
+        file = sys.stderr if file is None else file
+        spans = self.spans
+        if not spans:
+            return
+        total = max(span.start + span.duration for span in spans) or 1.0
+        file.write(f"{'span':<{NAME_WIDTH}} {'start':>10} {'duration':>10}\n")
+        for span in spans:
+            name = ("  " * span.depth + span.name)[:NAME_WIDTH]
+            offset = min(int(span.start / total * BAR_WIDTH), BAR_WIDTH - 1)
+            width = max(1, round(span.duration / total * BAR_WIDTH))
+            bar = (" " * offset + "#" * width)[:BAR_WIDTH]
+            times = f"{span.start * 1000:>8.1f}ms {span.duration * 1000:>8.1f}ms"
+            file.write(f"{name:<{NAME_WIDTH}} {times} |{bar:<{BAR_WIDTH}}|\n")
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write the spans in the Chrome trace event format.
+
+        Args:
+            path (Path): The JSON file to write
+        """
+        pid = os.getpid()
+        spans = self.spans
+        threads = {span.thread_id: span.thread_name for span in spans}
+        events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        events.extend(
+            {
+                "name": span.name,
+                "cat": "opthub",
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.args,
+            }
+            for span in spans
+        )
+        with path.open("w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def report(self, output: Path | None = None) -> None:
+        """Print the waterfall to stderr, or write the Chrome trace to `output`."""
+        if output is None:
+            self.print_waterfall()
+        else:
+            self.write_chrome_trace(output)
+            sys.stderr.write(f"Trace written to {output}\n")
+
+    def _record(self, name: str, start: float, end: float, depth: int, args: dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        span = Span(name, start - self.origin, end - start, depth, thread.ident or 0, thread.name, args)
+        with self._lock:
+            self._spans.append(span)
+
+
+tracer = Tracer()
+
+
+def span(name: str, **args: Any) -> AbstractContextManager[None]:  # noqa: ANN401
+    """Record the time spent in a block with the tracer of the process, if tracing is enabled.
+
+    Args:
+        name (str): The name of the span
+        **args (Any): The details of the span, shown in the Chrome trace
+    """
+    return tracer.span(name, **args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorate a function, coroutine function or generator function to record its calls as spans.
+
+    Args:
+        name (str): The name of the spans
+    """
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def generator_wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                with span(name):
+                    return (yield from func(*args, **kwargs))
+
+            return generator_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -7,6 +7,7 @@ from prompt_toolkit.styles import Style
 
 from opthub_client.api import TrialStatus
 from opthub_client.models.trial import Trial
+from opthub_client.trace import traced
 
 
 def user_interaction_message_style() -> Style:
@@ -35,6 +36,7 @@ def user_interaction_message_style() -> Style:
     )
 
 
+@traced("view.display_trial")
 def display_trial(trial: Trial | None, is_detail: bool) -> None:
     """Display the trial.
 
@@ -52,6 +54,7 @@ def display_trial(trial: Trial | None, is_detail: bool) -> None:
         print_formatted_text(HTML(lines), style=user_interaction_message_style())
 
 
+@traced("view.display_trials")
 def display_trials(trials: list[Trial], is_detail: bool) -> None:
     """Display the trials.
 
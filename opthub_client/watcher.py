@@ -0,0 +1,268 @@
+"""Shared polling of many outstanding trials of a match.
+
+`Trial.wait_evaluation` and `Trial.wait_scoring` poll the status of a single trial, so waiting for N trials costs N
+requests per tick. A `TrialWatcher` instead refreshes all the outstanding trials of a match with one range query
+(`getMatchTrialsByParticipant`) per tick, so the polling cost grows with the number of ticks, not of trials.
+
+The range query goes through the OptHub GraphQL API and uses the credentials of `opt login`. A transient failure of
+the range query is retried at the next tick, and fails the watched trials only after `max_consecutive_errors` ticks.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import TYPE_CHECKING, Literal, Self
+
+from opthub_api_client.models.match_trial_status import MatchTrialStatus
+
+from opthub_client.api import Match, Trial, trial_result_from_graphql
+from opthub_client.errors.circuit_open_error import CircuitOpenError
+from opthub_client.graphql.retry import is_transient
+from opthub_client.models.trial import fetch_trials
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from opthub_client.models.trial import Trial as TrialData
+
+    FetchRange = Callable[[str, int, int], list[TrialData]]
+
+# Maximum number of trials fetched in one range query
+MAX_RANGE_SIZE = 50
+
+
+def fetch_trial_range(match_id: str, start_trial_no: int, limit: int) -> list[TrialData]:
+    """Fetch the trials `start_trial_no`, ..., `start_trial_no + limit - 1` with one range query.
+
+    Args:
+        match_id (str): Match ID
+        start_trial_no (int): The first trial number
+        limit (int): The number of trials
+
+    Returns:
+        list[TrialData]: The fetched trials in ascending order
+    """
+    trials, _, _ = fetch_trials(
+        match_id,
+        page=0,
+        page_size=limit,
+        limit=limit,
+        offset=start_trial_no,
+        is_asc=True,
+        display_only_success=False,
+    )
+    return trials
+
+
+class TrialWatcher:
+    """A poller shared by all the outstanding trials of a match.
+
+    Each watched trial gets a `Future` which is resolved with the `Trial` once its evaluation (or scoring) has
+    finished, successfully or not. The evaluation and score of the resolved trial are filled from the range query,
+    so no further request is needed to read them. Check `trial.status` or the `error` field for failures.
+
+    Example:
+        >>> with TrialWatcher(match) as watcher:
+        ...     for trial in match.submit_many(population):
+        ...         watcher.watch(trial)
+        ...     for future in watcher.as_completed():
+        ...         print(future.result().score)
+    """
+
+    match: Match
+    until: Literal["evaluation", "scoring"]
+    max_consecutive_errors: int
+
+    def __init__(
+        self,
+        match: Match,
+        until: Literal["evaluation", "scoring"] = "scoring",
+        fetch_range: FetchRange | None = None,
+        max_consecutive_errors: int = 5,
+    ) -> None:
+        """Create a watcher of trials of a match.
+
+        Args:
+            match (Match): The match of the trials to watch
+            until (Literal["evaluation", "scoring"]): Whether a trial is done when its evaluation or its scoring ends
+            fetch_range (FetchRange | None): The range query; `fetch_trial_range` by default
+            max_consecutive_errors (int): The number of consecutive ticks failing with a transient error after which
+                the pending trials fail with the error. Other errors fail them at once.
+        """
+        self.match = match
+        self.until = until
+        self.max_consecutive_errors = max_consecutive_errors
+        self._fetch_range = fetch_range or fetch_trial_range
+        self._futures: dict[int, Future[Trial]] = {}
+        self._pending: dict[int, Future[Trial]] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def watch(self, trial: Trial | int) -> Future[Trial]:
+        """Start watching a trial.
+
+        Args:
+            trial (Trial | int): The trial or its trial number
+
+        Returns:
+            Future[Trial]: The future resolved with the finished trial
+        """
+        trial_no = trial if isinstance(trial, int) else trial.trial_no
+        with self._condition:
+            if self._closed:
+                msg = "The watcher is closed."
+                raise RuntimeError(msg)
+            if trial_no not in self._futures:
+                future: Future[Trial] = Future()
+                self._futures[trial_no] = future
+                self._pending[trial_no] = future
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="opthub-trial-watcher", daemon=True)
+                    self._thread.start()
+                self._condition.notify()
+            return self._futures[trial_no]
+
+    def as_completed(self, timeout: float | None = None) -> Iterator[Future[Trial]]:
+        """Iterate over the futures of the watched trials in the order they finish.
+
+        Args:
+            timeout (float | None): The maximum time in seconds to wait for all the trials
+
+        Raises:
+            TimeoutError: If some trials have not finished within `timeout`
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            remaining = set(self._futures.values())
+        while remaining:
+            wait_sec = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, remaining = wait(remaining, timeout=wait_sec, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError
+            yield from done
+
+    def wait_all(self, timeout: float | None = None) -> list[Trial]:
+        """Wait until all the watched trials finish.
+
+        Args:
+            timeout (float | None): The maximum time in seconds to wait
+
+        Returns:
+            list[Trial]: The finished trials in the order they were watched
+
+        Raises:
+            TimeoutError: If some trials have not finished within `timeout`
+        """
+        with self._condition:
+            futures = list(self._futures.values())
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """Stop polling. The futures of unfinished trials are cancelled."""
+        with self._condition:
+            self._closed = True
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> Self:
+        """A method to enable the use of the `with` statement."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """A method to enable the use of the `with` statement."""
+        self.close()
+
+    def _run(self) -> None:
+        """Poll the pending trials until the watcher is closed."""
+        intervals = self.match.api.poll_intervals()
+        errors = 0
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                    intervals = self.match.api.poll_intervals()
+                if self._closed:
+                    return
+                deadline = time.monotonic() + next(intervals)
+                while not self._closed and (remaining := deadline - time.monotonic()) > 0:
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return
+                trial_nos = sorted(self._pending)
+            try:
+                fetched = self._fetch(trial_nos)
+            except Exception as e:
+                errors += 1
+                if errors >= self.max_consecutive_errors or not _is_transient(e):
+                    self._fail(trial_nos, e)
+                continue
+            errors = 0
+            try:
+                self._resolve(fetched)
+            except Exception as e:  # a malformed trial fails the polled trials instead of stopping the polling
+                self._fail(trial_nos, e)
+
+    def _fetch(self, trial_nos: list[int]) -> list[TrialData]:
+        """Fetch the trials with as few range queries as possible."""
+        fetched: list[TrialData] = []
+        i = 0
+        while i < len(trial_nos):
+            start = trial_nos[i]
+            limit = min(MAX_RANGE_SIZE, trial_nos[-1] - start + 1)
+            fetched.extend(self._fetch_range(str(self.match.uuid), start, limit))
+            while i < len(trial_nos) and trial_nos[i] < start + limit:
+                i += 1
+        return fetched
+
+    def _resolve(self, fetched: list[TrialData]) -> None:
+        """Resolve the futures of the finished trials."""
+        unfinished = {MatchTrialStatus.EVALUATING}
+        if self.until == "scoring":
+            unfinished.add(MatchTrialStatus.SCORING)
+        for data in fetched:
+            status = MatchTrialStatus(data["status"])
+            if status in unfinished:
+                continue
+            with self._condition:
+                future = self._pending.pop(data["trialNo"], None)
+            if future is not None:
+                future.set_result(self._trial(data))
+
+    def _fail(self, trial_nos: list[int], error: Exception) -> None:
+        """Propagate a polling failure to the pending trials."""
+        with self._condition:
+            futures = [self._pending.pop(trial_no) for trial_no in trial_nos if trial_no in self._pending]
+        for future in futures:
+            future.set_exception(error)
+
+    def _trial(self, data: TrialData) -> Trial:
+        """Convert a trial of the range query into a `Trial` of the REST API wrapper."""
+        result = trial_result_from_graphql(data)
+        trial = Trial()
+        trial.trial_no = data["trialNo"]
+        trial.status = result.status
+        trial.evaluation = result.evaluation
+        trial.score = result.score
+        trial.match = self.match
+        trial.submitted_at = None
+        return trial
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Whether a failed range query may succeed at the next tick, looking through the errors wrapping the cause."""
+    cause: BaseException | None = error
+    while cause is not None:
+        if isinstance(cause, CircuitOpenError) or (isinstance(cause, Exception) and is_transient(cause)):
+            return True
+        cause = cause.__cause__
+    return False
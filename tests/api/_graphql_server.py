@@ -0,0 +1,164 @@
+"""A local stand-in for the OptHub GraphQL API used by the offline tests."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+
+from graphql import GraphQLError, build_schema, get_introspection_query, graphql_sync
+
+from opthub_client.graphql.client import GraphQLSessionManager
+
+SCHEMA = """
+scalar JSON
+
+type Query {
+    echo(value: Int): JSON
+    fail(message: String): Int
+}
+
+type Mutation {
+    echo(value: Int): JSON
+}
+"""
+
+
+class FakeGraphQLServer:
+    """A threaded HTTP server executing requests against `schema`.
+
+    `echo` returns its argument in an object, and `fail` returns an error with its argument as the message. Other
+    fields are resolved by `root`. Responses are compressed with gzip if the client accepts it.
+
+    The next requests fail with the HTTP statuses or the GraphQL errors queued in `faults`.
+
+    With `persisted_queries`, requests may send the SHA-256 hash of a query sent before instead of the query. Otherwise,
+    requests without a query are refused with 400 Bad Request.
+    """
+
+    def __init__(
+        self,
+        schema: str = SCHEMA,
+        *,
+        persisted_queries: bool = False,
+        root: dict[str, Any] | None = None,
+    ) -> None:
+        """Create a server; use the `with` statement to serve requests."""
+        self.root = {"echo": lambda _, value=None: {"value": value}, "fail": _fail, **(root or {})}
+        self.accept_encodings: list[str | None] = []
+        self.faults: list[int | dict[str, Any]] = []
+        self.persisted_queries = persisted_queries
+        self.persisted: dict[str, str] = {}
+        self.schema = build_schema(schema)
+        self.introspection = graphql_sync(self.schema, get_introspection_query()).data
+        self.introspections = 0
+        self.connections = 0
+        self.requests: list[dict[str, Any]] = []
+        self.authorizations: list[str | None] = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """The GraphQL endpoint."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}/graphql"
+
+    def __enter__(self) -> Self:
+        """Start serving requests."""
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop serving requests."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def execute(self, query: str, variables: dict[str, Any] | None) -> dict[str, Any]:
+        """Execute a query against the schema."""
+        result = graphql_sync(self.schema, query, self.root, variable_values=variables)
+        body: dict[str, Any] = {"data": result.data}
+        if result.errors:
+            body["errors"] = [error.formatted for error in result.errors]
+        return body
+
+    def resolve_query(self, request: dict[str, Any]) -> str | None:
+        """Get the query of a request, an empty string for an unknown persisted query, or `None` if it is missing."""
+        persisted = request.get("extensions", {}).get("persistedQuery") if self.persisted_queries else None
+        if persisted is None:
+            return request.get("query")
+        if "query" in request:
+            self.persisted[persisted["sha256Hash"]] = request["query"]
+        return self.persisted.get(persisted["sha256Hash"], "")
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length))
+                with server.lock:
+                    server.requests.append(request)
+                    server.authorizations.append(self.headers.get("Authorization"))
+                    query = server.resolve_query(request)
+                    fault = server.faults.pop(0) if server.faults and query and "__schema" not in query else None
+                if isinstance(fault, int):
+                    status, result = fault, {"message": "Fault"}
+                elif fault is not None:
+                    status, result = 200, {"data": None, "errors": [fault]}
+                elif query is None:
+                    status, result = 400, {"errors": [{"message": "Missing query"}]}
+                elif not query:
+                    status, result = 200, {"errors": [{"message": "PersistedQueryNotFound"}]}
+                elif "__schema" in query:
+                    with server.lock:
+                        server.requests.pop()
+                        server.authorizations.pop()
+                        server.introspections += 1
+                    status, result = 200, {"data": server.introspection}
+                else:
+                    status, result = 200, server.execute(query, request.get("variables"))
+                data = json.dumps(result).encode()
+                accept_encoding = self.headers.get("Accept-Encoding")
+                with server.lock:
+                    server.accept_encodings.append(accept_encoding)
+                self.send_response(status)
+                if "gzip" in (accept_encoding or ""):
+                    data = gzip.compress(data)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        return Handler
+
+
+def create_session_manager(server: FakeGraphQLServer, **kwargs: Any) -> GraphQLSessionManager:  # noqa: ANN401
+    """Create a manager of GraphQL sessions to the server, with the default client factory unless given.
+
+    Args:
+        server (FakeGraphQLServer): The server
+        **kwargs (Any): The other arguments of `GraphQLSessionManager`
+    """
+    return GraphQLSessionManager(access_token=lambda: "token", url=server.url, **kwargs)
+
+
+def _fail(_: object, message: str | None = None) -> None:
+    raise GraphQLError(message or "Failed")
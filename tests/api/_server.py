@@ -0,0 +1,203 @@
+"""A local stand-in for the OptHub public REST API used by the offline tests."""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+
+TRIAL_PATH = re.compile(r"^/matches/(?P<match>[^/]+)/trials(?:/(?P<no>\d+)(?:/(?P<resource>\w+))?)?$")
+
+
+def _now() -> str:
+    return _format(datetime.now(UTC))
+
+
+def _format(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeTrial:
+    """A trial stored by the fake server."""
+
+    def __init__(self, trial_no: int, variable: dict[str, Any], evaluation_sec: float, queued_sec: float = 0.0) -> None:
+        """Create a trial which finishes evaluation after `queued_sec + evaluation_sec` seconds."""
+        self.trial_no = trial_no
+        self.variable = variable
+        self.created_at = _now()
+        self.evaluated_at = _format(datetime.now(UTC) + timedelta(seconds=queued_sec + evaluation_sec))
+        self.finished_at = time.monotonic() + queued_sec + evaluation_sec
+
+    @property
+    def status(self) -> str:
+        """The current trial status."""
+        if time.monotonic() < self.finished_at:
+            return "evaluating"
+        return "evaluator_failed" if self.objective is None else "success"
+
+    @property
+    def objective(self) -> float | None:
+        """The objective value, i.e. the sum of the variable, or `None` for negative sums."""
+        value = self.variable.get("scalar")
+        total = float(value) if value is not None else float(sum(self.variable.get("vector", [])))
+        return None if total < 0 else total
+
+
+class FakeOptHubServer:
+    """A threaded HTTP server emulating the trial endpoints of the OptHub REST API.
+
+    A submitted solution is evaluated to the sum of its elements after `evaluation_sec` seconds. With a `capacity`, at
+    most `capacity` solutions are evaluated at the same time and the others are queued.
+    Solutions whose sum is negative fail in evaluation.
+    """
+
+    def __init__(self, evaluation_sec: float = 0.0, latency_sec: float = 0.0, capacity: int | None = None) -> None:
+        """Create a server; call `start` or use the `with` statement to serve requests."""
+        self.evaluation_sec = evaluation_sec
+        self.latency_sec = latency_sec
+        self.evaluators = [0.0] * capacity if capacity is not None else None
+        self.trials: dict[int, FakeTrial] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.fail_statuses: list[int] = []
+        self.lost_statuses: list[int] = []
+        self.connections = 0
+        self.concurrency = 0
+        self.max_concurrency = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def count(self, method: str, resource: str) -> int:
+        """Count the requests received for a method and resource (`trials`, `trial`, `evaluation`, ...)."""
+        with self.lock:
+            return sum(1 for r in self.requests if r == (method, resource))
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> Self:
+        """Start serving in a background thread."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop serving."""
+        self.stop()
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        """Dispatch a request and return the status code and JSON body."""
+        m = TRIAL_PATH.match(path)
+        if m is None:
+            return 404, {"code": "NotFound", "message": "No such path."}
+        resource = m["resource"] or ("trial" if m["no"] else "trials")
+        with self.lock:
+            self.requests.append((method, resource))
+            if self.fail_statuses:
+                return self.fail_statuses.pop(0), {"code": "UnexpectedServerError", "message": "Injected."}
+        if self.latency_sec:
+            self.wait_latency()
+
+        if method == "POST" and resource == "trials":
+            created = self.create_trial(json.loads(body)["variable"])
+            with self.lock:
+                if self.lost_statuses:  # the trial is created, but the response is lost like behind a failing proxy
+                    return self.lost_statuses.pop(0), {"code": "BadGateway", "message": "Injected."}
+            return created
+        trial = self.trials.get(int(m["no"] or 0))
+        if method != "GET" or trial is None:
+            return 404, {"code": "TrialNotFound", "message": "No such trial."}
+        return self.get_resource(trial, resource)
+
+    def wait_latency(self) -> None:
+        """Sleep for the latency, counting the requests served concurrently."""
+        with self.lock:
+            self.concurrency += 1
+            self.max_concurrency = max(self.max_concurrency, self.concurrency)
+        time.sleep(self.latency_sec)
+        with self.lock:
+            self.concurrency -= 1
+
+    def create_trial(self, variable: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        """Store a new trial."""
+        with self.lock:
+            queued_sec = 0.0
+            if self.evaluators is not None:
+                # Evaluate on the evaluator which becomes free first
+                now = time.monotonic()
+                evaluator = min(range(len(self.evaluators)), key=self.evaluators.__getitem__)
+                queued_sec = max(0.0, self.evaluators[evaluator] - now)
+                self.evaluators[evaluator] = now + queued_sec + self.evaluation_sec
+            trial = FakeTrial(len(self.trials) + 1, variable, self.evaluation_sec, queued_sec)
+            self.trials[trial.trial_no] = trial
+        return 200, {"trialNo": trial.trial_no, "status": trial.status, "createdAt": trial.created_at}
+
+    def get_resource(self, trial: FakeTrial, resource: str) -> tuple[int, dict[str, Any]]:  # noqa: PLR0911
+        """Return a resource of a trial."""
+        status = trial.status
+        if resource == "trial":
+            return 200, {"trialNo": trial.trial_no, "status": status, "createdAt": trial.created_at}
+        if resource == "solution":
+            return 200, {"variable": trial.variable, "createdAt": trial.created_at}
+        if status == "evaluating":
+            return 404, {"code": "EvaluationNotFound", "message": "Not evaluated yet."}
+        objective = trial.objective
+        if resource == "evaluation":
+            times = {"startedAt": trial.created_at, "finishedAt": trial.evaluated_at}
+            if objective is None:
+                return 200, {"status": "Failed", "error": "Negative sum.", **times}
+            return 200, {"status": "Success", "objective": {"scalar": objective}, **times}
+        if resource == "score" and objective is not None:
+            times = {"startedAt": trial.evaluated_at, "finishedAt": trial.evaluated_at}
+            return 200, {"status": "Success", "value": objective, **times}
+        return 404, {"code": "ScoreNotFound", "message": "Not scored."}
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_GET(self) -> None:  # noqa: N802
+                self._respond("GET")
+
+            def do_POST(self) -> None:  # noqa: N802
+                self._respond("POST")
+
+            def _respond(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                status, payload = server.handle(method, self.path, body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        return Handler
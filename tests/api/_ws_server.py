@@ -0,0 +1,86 @@
+"""A local stand-in for a GraphQL subscription endpoint speaking the Apollo `graphql-ws` protocol."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Self
+
+import websockets
+
+if TYPE_CHECKING:
+    from websockets.server import WebSocketServerProtocol
+
+
+class FakeSubscriptionServer:
+    """A websocket server which pushes the published payloads to all the active subscriptions."""
+
+    def __init__(self) -> None:
+        """Create a server; use the `with` statement to serve."""
+        self.loop = asyncio.new_event_loop()
+        self.subscriptions: set[tuple[WebSocketServerProtocol, str]] = set()
+        self.started = threading.Event()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.server: Any = None
+
+    @property
+    def url(self) -> str:
+        """The websocket URL of the server."""
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"ws://{host}:{port}/graphql"
+
+    def publish(self, data: dict[str, Any]) -> None:
+        """Push a result to every subscription."""
+        asyncio.run_coroutine_threadsafe(self._publish(data), self.loop).result()
+
+    def drop_connections(self) -> None:
+        """Close all the client sockets."""
+
+        async def drop() -> None:
+            for websocket in {websocket for websocket, _ in self.subscriptions}:
+                await websocket.close()
+
+        asyncio.run_coroutine_threadsafe(drop(), self.loop).result()
+
+    def __enter__(self) -> Self:
+        """Start serving in a background thread."""
+        self.thread.start()
+
+        async def serve() -> Any:  # noqa: ANN401
+            return await websockets.serve(self._handle, "127.0.0.1", 0, subprotocols=["graphql-ws"])
+
+        self.server = asyncio.run_coroutine_threadsafe(serve(), self.loop).result()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop serving."""
+
+        async def close() -> None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def _publish(self, data: dict[str, Any]) -> None:
+        for websocket, operation_id in list(self.subscriptions):
+            message = {"type": "data", "id": operation_id, "payload": {"data": data}}
+            await websocket.send(json.dumps(message))
+
+    async def _handle(self, websocket: WebSocketServerProtocol) -> None:
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message["type"] == "connection_init":
+                    await websocket.send(json.dumps({"type": "connection_ack"}))
+                elif message["type"] == "start":
+                    self.subscriptions.add((websocket, message["id"]))
+                elif message["type"] == "stop":
+                    self.subscriptions.discard((websocket, message["id"]))
+                    await websocket.send(json.dumps({"type": "complete", "id": message["id"]}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.subscriptions = {s for s in self.subscriptions if s[0] is not websocket}
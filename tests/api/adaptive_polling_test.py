@@ -0,0 +1,84 @@
+"""Adaptive polling test for Public REST API wrapper."""
+
+import time
+from typing import Any
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import OptHub
+from tests.api._server import FakeOptHubServer
+
+EVALUATION_SEC = 0.5
+TRIALS = 3
+MAX_ADAPTIVE_CHECKS_PER_TRIAL = 2
+# A latency estimate long enough to notice a wait for it
+ESTIMATE_SEC = 2.0
+
+
+def count_status_checks(poll_mode: str) -> int:
+    """Count the status requests to wait for the evaluation of trials submitted one after another."""
+    with (
+        FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server,
+        OptHub(
+            common.TEST_API_KEY,
+            server.url,
+            poll_mode=poll_mode,
+        ) as api,
+    ):
+        api.poll_interval_initial_sec = 0.1
+        api.poll_max_random_delay_sec = 0.0
+        match = api.match(common.TEST_MATCH)
+        match.submit([1.0]).wait_evaluation()
+        before = server.count("GET", "trial")
+        for _ in range(TRIALS):
+            match.submit([1.0]).wait_evaluation()
+        estimate = api.latency.estimate(common.TEST_MATCH, "evaluation")
+        assert estimate is not None  # noqa: S101
+        assert estimate.mean == pytest.approx(EVALUATION_SEC, abs=0.1)  # noqa: S101
+        return server.count("GET", "trial") - before
+
+
+def test_adaptive_polling_saves_requests() -> None:
+    """Once the latency is known, the first status check is scheduled near the end of the evaluation."""
+    adaptive = count_status_checks("adaptive")
+    fixed = count_status_checks("fixed")
+    assert adaptive <= TRIALS * MAX_ADAPTIVE_CHECKS_PER_TRIAL  # noqa: S101
+    assert adaptive < fixed  # noqa: S101
+
+
+def test_trial_of_another_process_does_not_wait_for_the_estimate() -> None:
+    """A trial whose submission time is unknown is checked at once, and does not change the latency estimate."""
+    times = {"started_at": "2024-01-01T00:00:00Z", "finished_at": "2024-01-01T00:00:01Z"}
+
+    def fetch_trial(_: str, trial_no: int) -> dict[str, Any]:
+        return {
+            "trialNo": trial_no,
+            "status": "success",
+            "solution": {"variable": "[1.0]", "created_at": "2024-01-01T00:00:00Z"},
+            "evaluation": {
+                "status": "Success",
+                "objective": "1.0",
+                "constraint": None,
+                "feasible": None,
+                "info": "{}",
+                "error": None,
+                **times,
+            },
+            "score": None,
+        }
+
+    with (
+        FakeOptHubServer() as server,
+        OptHub(common.TEST_API_KEY, server.url, fetch_trial=fetch_trial) as api,
+    ):
+        match = api.match(common.TEST_MATCH)
+        trial_no = match.submit([1.0]).trial_no
+        api.latency.add_sample(common.TEST_MATCH, "evaluation", ESTIMATE_SEC)
+        estimate = api.latency.estimate(common.TEST_MATCH, "evaluation")
+
+        start = time.monotonic()
+        match.get_trial(trial_no).wait_evaluation()
+
+        assert time.monotonic() - start < ESTIMATE_SEC / 2  # noqa: S101
+        assert api.latency.estimate(common.TEST_MATCH, "evaluation") == estimate  # noqa: S101
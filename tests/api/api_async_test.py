@@ -0,0 +1,83 @@
+"""Test for the asynchronous Public REST API wrapper."""
+
+import asyncio
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import EvaluationError
+from opthub_client.api_async import AsyncOptHub
+from tests.api._server import FakeOptHubServer
+
+POPULATION = 50
+POOL_MAXSIZE = 4
+LATENCY_SEC = 0.1
+
+
+async def submit_and_wait(url: str) -> list[float]:
+    """Submit a population and wait for all the scores on one event loop."""
+    async with AsyncOptHub(common.TEST_API_KEY, url) as api:
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.01
+        match = api.match(common.TEST_MATCH)
+        trials = await asyncio.gather(*(match.submit([float(i), 1.0]) for i in range(POPULATION)))
+        scores = await asyncio.gather(*(trial.wait_scoring(timeout=10) for trial in trials))
+        return [score.value for score in scores]
+
+
+def test_submit_and_wait_scoring() -> None:
+    """All the trials in flight are awaited on a single event loop."""
+    with FakeOptHubServer(evaluation_sec=0.2) as server:
+        scores = asyncio.run(submit_and_wait(server.url))
+    assert scores == [i + 1.0 for i in range(POPULATION)]  # noqa: S101
+
+
+async def submit_invalid(url: str) -> None:
+    """Submit a solution which fails in evaluation."""
+    async with AsyncOptHub(common.TEST_API_KEY, url) as api:
+        match = api.match(common.TEST_MATCH)
+        trial = await match.submit(-1.0)
+        assert await match.try_get_trial(trial.trial_no + 1) is None  # noqa: S101
+        await trial.wait_evaluation(timeout=10)
+
+
+def test_evaluation_error() -> None:
+    """Evaluation failures and missing trials are reported like in the synchronous API."""
+    with FakeOptHubServer() as server, pytest.raises(EvaluationError):
+        asyncio.run(submit_invalid(server.url))
+
+
+async def submit_nan(url: str) -> None:
+    """Submit a solution containing NaN."""
+    async with AsyncOptHub(common.TEST_API_KEY, url) as api:
+        await api.match(common.TEST_MATCH).submit([1.0, float("nan")])
+
+
+def test_nan_is_rejected_before_sending() -> None:
+    """Solutions which are not valid JSON are rejected without a round trip, as by the synchronous API."""
+    with FakeOptHubServer() as server:
+        with pytest.raises(ValueError, match="JSON"):
+            asyncio.run(submit_nan(server.url))
+        assert server.count("POST", "trials") == 0  # noqa: S101
+
+
+async def submit_concurrently(url: str, pool_maxsize: int | None = None, timeout: float | None = None) -> None:
+    """Submit a population at once."""
+    async with AsyncOptHub(common.TEST_API_KEY, url, pool_maxsize, timeout) as api:
+        match = api.match(common.TEST_MATCH)
+        await asyncio.gather(*(match.submit([float(i)]) for i in range(POPULATION)))
+
+
+def test_connections_are_limited() -> None:
+    """The session opens at most `pool_maxsize` connections, like the connection pool of the synchronous API."""
+    with FakeOptHubServer(latency_sec=LATENCY_SEC) as server:
+        asyncio.run(submit_concurrently(server.url, pool_maxsize=POOL_MAXSIZE))
+        assert server.count("POST", "trials") == POPULATION  # noqa: S101
+        assert server.max_concurrency <= POOL_MAXSIZE  # noqa: S101
+        assert server.connections <= POOL_MAXSIZE  # noqa: S101
+
+
+def test_request_timeout() -> None:
+    """A request which is not answered within the timeout fails."""
+    with FakeOptHubServer(latency_sec=10 * LATENCY_SEC) as server, pytest.raises(TimeoutError):
+        asyncio.run(submit_concurrently(server.url, timeout=LATENCY_SEC))
@@ -0,0 +1,80 @@
+"""Combined result retrieval test for Public REST API wrapper."""
+
+from typing import Any
+
+from opthub_api_client import MatchTrialStatus
+
+import tests.api._common as common
+from opthub_client.api import OptHub
+from tests.api._server import FakeOptHubServer
+
+OBJECTIVE = 3.0
+
+
+def test_wait_evaluation_retrieves_score() -> None:
+    """Once the trial is scored, waiting for the evaluation also retrieves the score, so scoring needs no request."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        trial = api.match(common.TEST_MATCH).submit([1.0, 2.0])
+        trial.update_status()
+        before = len(server.requests)
+        evaluation = trial.wait_evaluation()
+        after_evaluation = len(server.requests)
+        score = trial.wait_scoring()
+
+    assert evaluation.objective.scalar == OBJECTIVE  # noqa: S101
+    assert score.value == OBJECTIVE  # noqa: S101
+    assert after_evaluation - before == 2  # noqa: S101, PLR2004
+    assert len(server.requests) == after_evaluation  # noqa: S101
+
+
+def test_fetch_result() -> None:
+    """Without a combined query, the status and the results are fetched concurrently."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        trial = api.match(common.TEST_MATCH).submit([1.0, 2.0])
+        result = trial.fetch_result()
+
+    assert result.status.type == MatchTrialStatus.SUCCESS  # noqa: S101
+    assert result.evaluation is not None  # noqa: S101
+    assert result.score is not None  # noqa: S101
+    assert result.score.value == OBJECTIVE  # noqa: S101
+    assert result.solution is not None  # noqa: S101
+    assert result.solution.variable.vector == [1.0, 2.0]  # noqa: S101
+
+
+def test_wait_scoring_with_fetch_trial() -> None:
+    """With a combined query, each poll retrieves all the results and no REST request is needed after submission."""
+    queries: list[tuple[str, int]] = []
+
+    def fetch_trial(match_id: str, trial_no: int) -> Any:  # noqa: ANN401
+        queries.append((match_id, trial_no))
+        finished = len(queries) > 1
+        times = {"started_at": "2024-01-01T00:00:00Z", "finished_at": "2024-01-01T00:00:01Z"}
+        return {
+            "trialNo": trial_no,
+            "status": "success" if finished else "evaluating",
+            "solution": {"variable": "[1.0, 2.0]", "created_at": "2024-01-01T00:00:00Z"},
+            "evaluation": {
+                "status": "Success",
+                "objective": str(OBJECTIVE),
+                "constraint": None,
+                "feasible": None,
+                "info": "{}",
+                "error": None,
+                **times,
+            }
+            if finished
+            else None,
+            "score": {"status": "Success", "value": OBJECTIVE, "error": None, **times} if finished else None,
+        }
+
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url, fetch_trial=fetch_trial) as api:
+        api.poll_interval_initial_sec = 0.01
+        api.poll_max_random_delay_sec = 0.0
+        trial = api.match(common.TEST_MATCH).submit([1.0, 2.0])
+        score = trial.wait_scoring()
+        evaluation = trial.wait_evaluation()
+
+    assert score.value == OBJECTIVE  # noqa: S101
+    assert evaluation.objective.scalar == OBJECTIVE  # noqa: S101
+    assert len(queries) == 2  # noqa: S101, PLR2004
+    assert server.requests == [("POST", "trials")]  # noqa: S101
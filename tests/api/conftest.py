@@ -0,0 +1,31 @@
+"""Fixtures of the API tests."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from opthub_client.graphql import client
+from tests.api._graphql_server import FakeGraphQLServer, create_session_manager
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the markers of the API tests."""
+    config.addinivalue_line(
+        "markers",
+        "graphql_schema(schema, root=None): the schema and the resolvers served by the `server` fixture",
+    )
+
+
+@pytest.fixture()
+def server(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeGraphQLServer]:
+    """Serve a fake GraphQL API, to which the GraphQL sessions of the process are connected.
+
+    The schema and the resolvers are given by the `graphql_schema` marker of the test, if any.
+    """
+    marker = request.node.get_closest_marker("graphql_schema")
+    args, kwargs = (marker.args, marker.kwargs) if marker is not None else ((), {})
+    with FakeGraphQLServer(*args, **kwargs) as fake:
+        manager = create_session_manager(fake)
+        monkeypatch.setattr(client, "sessions", manager)
+        yield fake
+        manager.close()
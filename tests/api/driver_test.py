@@ -0,0 +1,124 @@
+"""Ask-tell driver test for Public REST API wrapper."""
+
+import random
+import time
+
+from numpy.typing import ArrayLike
+
+import tests.api._common as common
+from opthub_client.api import OptHub, Trial
+from opthub_client.driver import AskTellDriver
+from tests.api._server import FakeOptHubServer
+
+CAPACITY = 4
+BUDGET = 60
+TARGET_SCORE = 5.0
+TIMEOUT_SEC = 0.5
+FAILURES = 2
+
+
+class RandomSearch:
+    """An ask-tell optimizer proposing random solutions, or decreasing ones, or negative ones failing in evaluation."""
+
+    def __init__(self, *, decreasing: bool = False, failing: bool = False) -> None:
+        """Create the optimizer."""
+        self.decreasing = decreasing
+        self.failing = failing
+        self.asked = 0
+        self.told: list[tuple[ArrayLike, Trial]] = []
+
+    def ask(self) -> ArrayLike:
+        """Propose a solution."""
+        self.asked += 1
+        if self.failing:
+            return [-1.0]
+        return [10.0 - self.asked] if self.decreasing else [random.uniform(0, 10)]  # noqa: S311
+
+    def tell(self, solution: ArrayLike, trial: Trial) -> None:
+        """Record a finished trial."""
+        self.told.append((solution, trial))
+
+
+def create_api(server: FakeOptHubServer) -> OptHub:
+    """Create an API polling the fake server quickly."""
+    api = OptHub(common.TEST_API_KEY, server.url)
+    api.poll_interval_initial_sec = 0.05
+    api.poll_max_random_delay_sec = 0.0
+    return api
+
+
+def test_driver_adapts_concurrency_to_evaluator() -> None:
+    """The number of trials in flight grows up to about the capacity of the evaluator, and the budget is used up."""
+    optimizer = RandomSearch()
+    with FakeOptHubServer(evaluation_sec=0.2, capacity=CAPACITY) as server, create_api(server) as api:
+        driver = AskTellDriver(api.match(common.TEST_MATCH), optimizer, budget=BUDGET, initial_in_flight=1)
+        result = driver.run()
+
+        assert result.reason == "budget"  # noqa: S101
+        assert len(server.trials) == BUDGET  # noqa: S101
+    assert len(result.trials) == len(optimizer.told) == BUDGET  # noqa: S101
+    assert 1 < driver.in_flight <= 3 * CAPACITY  # noqa: S101
+    assert result.best is not None  # noqa: S101
+    assert result.best.score is not None  # noqa: S101
+    assert result.best.score.value == min(trial.score.value for trial in result.trials if trial.score)  # noqa: S101
+
+
+def test_driver_stops_at_target_score() -> None:
+    """Submissions stop once the target score is reached, and the trials in flight are told to the optimizer."""
+    optimizer = RandomSearch(decreasing=True)
+    with FakeOptHubServer(evaluation_sec=0.05) as server, create_api(server) as api:
+        result = AskTellDriver(api.match(common.TEST_MATCH), optimizer, budget=BUDGET, target_score=TARGET_SCORE).run()
+
+        assert result.reason == "target"  # noqa: S101
+        assert len(server.trials) < BUDGET  # noqa: S101
+    assert len(optimizer.told) == optimizer.asked  # noqa: S101
+    assert result.best is not None  # noqa: S101
+    assert result.best.score is not None  # noqa: S101
+    assert result.best.score.value is not None  # noqa: S101
+    assert result.best.score.value <= TARGET_SCORE  # noqa: S101
+
+
+def test_driver_timeout() -> None:
+    """The driver returns at the timeout without waiting for the trials in flight."""
+    with FakeOptHubServer(evaluation_sec=5.0) as server, create_api(server) as api:
+        start = time.monotonic()
+        result = AskTellDriver(api.match(common.TEST_MATCH), RandomSearch(), timeout=TIMEOUT_SEC).run()
+        elapsed = time.monotonic() - start
+
+    assert result.reason == "timeout"  # noqa: S101
+    assert result.trials == []  # noqa: S101
+    assert elapsed < 2 * TIMEOUT_SEC  # noqa: S101
+
+
+def test_driver_records_failures() -> None:
+    """Failed requests are recorded without stopping the run, until they fail too many times in a row."""
+    optimizer = RandomSearch()
+    with FakeOptHubServer() as server, create_api(server) as api:
+        server.fail_statuses = [400] * FAILURES
+        driver = AskTellDriver(api.match(common.TEST_MATCH), optimizer, budget=BUDGET, initial_in_flight=1)
+        result = driver.run()
+
+    assert result.reason == "budget"  # noqa: S101
+    assert len(result.failures) == FAILURES  # noqa: S101
+    assert len(result.trials) == len(optimizer.told) == BUDGET - FAILURES  # noqa: S101
+
+    with FakeOptHubServer() as server, create_api(server) as api:
+        server.fail_statuses = [400] * BUDGET
+        result = AskTellDriver(api.match(common.TEST_MATCH), RandomSearch(), budget=BUDGET).run()
+
+    assert result.reason == "error"  # noqa: S101
+    assert result.trials == []  # noqa: S101
+    assert len(result.failures) < BUDGET  # noqa: S101
+
+
+def test_driver_tells_failed_evaluations() -> None:
+    """Trials whose evaluation failed are finished trials told to the optimizer, not failures stopping the run."""
+    optimizer = RandomSearch(failing=True)
+    with FakeOptHubServer(evaluation_sec=0.05) as server, create_api(server) as api:
+        result = AskTellDriver(api.match(common.TEST_MATCH), optimizer, budget=BUDGET // 6).run()
+
+    assert result.reason == "budget"  # noqa: S101
+    assert result.failures == []  # noqa: S101
+    assert len(result.trials) == len(optimizer.told) == BUDGET // 6  # noqa: S101
+    assert all(trial.evaluation is not None and trial.evaluation.error for _, trial in optimizer.told)  # noqa: S101
+    assert result.best is None  # noqa: S101
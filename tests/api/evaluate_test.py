@@ -0,0 +1,78 @@
+"""Batch evaluation test for Public REST API wrapper."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import OptHub
+from tests.api._server import FakeOptHubServer
+
+EVALUATION_SEC = 0.2
+TIMEOUT_SEC = 1.0
+
+
+def test_evaluate_returns_arrays() -> None:
+    """The objectives are stacked in row order, and failed rows are masked."""
+    solutions = np.array([[1.0, 2.0], [-3.0, 1.0], [0.5, 0.5]])
+    with FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.0
+        result = api.match(common.TEST_MATCH).evaluate(solutions, max_in_flight=3, timeout=10)
+    np.testing.assert_array_equal(result.objectives, [[3.0], [np.nan], [1.0]])
+    assert result.constraints.shape == (len(solutions), 0)  # noqa: S101
+    np.testing.assert_array_equal(result.errors, [False, True, False])
+    np.testing.assert_array_equal(result.feasible, [True, False, True])
+
+
+def test_evaluate_marks_failed_submissions() -> None:
+    """A failed submission is reported in the error mask."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        server.fail_statuses.append(400)
+        result = api.match(common.TEST_MATCH).evaluate([[1.0]], timeout=10)
+    assert result.trials == [None]  # noqa: S101
+    np.testing.assert_array_equal(result.errors, [True])
+
+
+def test_evaluate_timeout() -> None:
+    """The timeout applies to the whole batch, and the rows which are not evaluated in time are masked."""
+    solutions = np.array([[1.0], [2.0], [3.0]])
+    with (
+        FakeOptHubServer(evaluation_sec=TIMEOUT_SEC * 0.6, capacity=1) as server,
+        OptHub(common.TEST_API_KEY, server.url) as api,
+    ):
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.0
+        result = api.match(common.TEST_MATCH).evaluate(solutions, timeout=TIMEOUT_SEC)
+    # One evaluator evaluates the solutions one after another, so only the first submitted one finishes in time
+    assert result.errors.sum() == len(solutions) - 1  # noqa: S101
+    np.testing.assert_array_equal(result.objectives[~result.errors], solutions[~result.errors])
+    assert all(trial is not None for trial in result.trials)  # noqa: S101
+
+
+def test_evaluate_marks_unexpected_errors() -> None:
+    """Any error while waiting for a row is reported in the error mask, and the other rows are kept."""
+    with FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.0
+        # A malformed trial response after the submissions, which fails in deserialization
+        threading.Timer(EVALUATION_SEC / 2, server.fail_statuses.append, (200,)).start()
+        result = api.match(common.TEST_MATCH).evaluate([[1.0], [2.0]], timeout=10)
+    assert result.errors.sum() == 1  # noqa: S101
+    assert all(trial is not None for trial in result.trials)  # noqa: S101
+
+
+def test_update_status_timeout() -> None:
+    """Waiting for a trial which never appears on the server times out."""
+    with FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.0
+        trial = api.match(common.TEST_MATCH).submit([1.0])
+        trial.trial_no += 1
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            trial.wait_evaluation(TIMEOUT_SEC)
+        assert time.monotonic() - start < 2 * TIMEOUT_SEC  # noqa: S101
@@ -0,0 +1,51 @@
+"""GraphQL batching test."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from gql import gql
+
+from opthub_client.errors.graphql_error import GraphQLError
+from opthub_client.graphql.client import (
+    GraphQLRequest,
+    execute_graphql_batch,
+    execute_graphql_batch_async,
+    merge_documents,
+)
+from tests.api._graphql_server import FakeGraphQLServer
+
+ECHO = gql("query echo($value: Int) { echo(value: $value) }")
+FAIL = gql("query fail($message: String) { failed: fail(message: $message) }")
+REQUESTS = [GraphQLRequest(ECHO, {"value": 1}), GraphQLRequest(FAIL, {"message": "boom"}), GraphQLRequest(ECHO)]
+
+
+def check_results(results: list[dict[str, Any] | GraphQLError]) -> None:
+    """Check the results of `REQUESTS`."""
+    assert results[0] == {"echo": {"value": 1}}  # noqa: S101
+    assert isinstance(results[1], GraphQLError)  # noqa: S101
+    assert results[1].message == "boom"  # noqa: S101
+    assert results[2] == {"echo": {"value": None}}  # noqa: S101
+
+
+def test_batch_is_one_request(server: FakeGraphQLServer) -> None:
+    """Independent queries are sent in one request, and each gets its own result or error."""
+    check_results(execute_graphql_batch(REQUESTS))
+    check_results(asyncio.run(execute_graphql_batch_async(REQUESTS)))
+
+    assert len(server.requests) == 2  # noqa: S101, PLR2004
+    assert server.requests[0]["variables"] == {"b0_value": 1, "b1_message": "boom"}  # noqa: S101
+
+
+def test_single_request_is_not_merged(server: FakeGraphQLServer) -> None:
+    """A batch of one query is sent as is."""
+    assert execute_graphql_batch([GraphQLRequest(ECHO, {"value": 1})]) == [{"echo": {"value": 1}}]  # noqa: S101
+    assert server.requests[0]["variables"] == {"value": 1}  # noqa: S101
+
+
+def test_merge_documents() -> None:
+    """Merged documents are cached, and documents which cannot be merged are refused."""
+    documents = (ECHO, FAIL)
+    assert merge_documents(documents) is merge_documents(documents)  # noqa: S101
+    with pytest.raises(ValueError, match="same type"):
+        merge_documents((ECHO, gql("mutation { echo }")))
@@ -0,0 +1,86 @@
+"""GraphQL retry policy and circuit breaker test."""
+
+import time
+
+import pytest
+from gql import gql
+from gql.transport.exceptions import TransportQueryError, TransportServerError
+
+from opthub_client.errors.circuit_open_error import CircuitOpenError
+from opthub_client.graphql.client import GraphQLSessionManager
+from opthub_client.graphql.retry import CircuitBreaker, GraphQLRetryPolicy
+from tests.api._graphql_server import FakeGraphQLServer, create_session_manager
+
+QUERY = gql("query echo($value: Int) { echo(value: $value) }")
+MUTATION = gql("mutation echo($value: Int) { echo(value: $value) }")
+THROTTLED = {"errorType": "Throttled", "message": "Rate exceeded"}
+UNAUTHORIZED = {"errorType": "UnauthorizedException", "message": "Unauthorized"}
+RESET_TIMEOUT_SEC = 0.2
+
+
+def create_manager(
+    server: FakeGraphQLServer,
+    circuit_breaker: CircuitBreaker | None = None,
+    max_retries: int = 3,
+) -> GraphQLSessionManager:
+    """Create a manager of sessions to the fake server, retrying without waiting long."""
+    retry_policy = GraphQLRetryPolicy(max_retries, backoff_initial_sec=0.01)
+    return create_session_manager(server, retry_policy=retry_policy, circuit_breaker=circuit_breaker)
+
+
+def test_query_is_retried() -> None:
+    """Queries are retried on 5xx responses and throttling, but not on other errors."""
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server)
+        server.faults = [503, THROTTLED, 500]
+        assert manager.execute_sync(QUERY, {"value": 1}) == {"echo": {"value": 1}}  # noqa: S101
+        assert len(server.requests) == 4  # noqa: S101, PLR2004
+
+        server.faults = [UNAUTHORIZED]
+        with pytest.raises(TransportQueryError):
+            manager.execute_sync(QUERY, {"value": 1})
+        assert len(server.requests) == 5  # noqa: S101, PLR2004
+
+        server.faults = [503] * 4
+        with pytest.raises(TransportServerError):
+            manager.execute_sync(QUERY, {"value": 1})
+        manager.close()
+
+
+def test_mutation_is_retried_only_if_not_processed() -> None:
+    """Mutations are retried on throttling, but not on 5xx responses unless they are idempotent."""
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server)
+        server.faults = [THROTTLED]
+        assert manager.execute_sync(MUTATION, {"value": 1}) == {"echo": {"value": 1}}  # noqa: S101
+
+        server.faults = [503]
+        with pytest.raises(TransportServerError):
+            manager.execute_sync(MUTATION, {"value": 1})
+
+        server.faults = [503]
+        assert manager.execute_sync(MUTATION, {"value": 1}, idempotent=True) == {"echo": {"value": 1}}  # noqa: S101
+        manager.close()
+
+
+def test_circuit_breaker() -> None:
+    """Requests fail fast while the circuit is open, and one request probes the API after the cool-down."""
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout_sec=RESET_TIMEOUT_SEC)
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server, circuit_breaker, max_retries=0)
+        server.faults = [503, 503]
+        for _ in range(2):
+            with pytest.raises(TransportServerError):
+                manager.execute_sync(QUERY, {"value": 1})
+        requests = len(server.requests)
+
+        with pytest.raises(CircuitOpenError):
+            manager.execute_sync(QUERY, {"value": 1})
+        assert len(server.requests) == requests  # noqa: S101
+        assert circuit_breaker.state == "open"  # noqa: S101
+
+        time.sleep(RESET_TIMEOUT_SEC)
+        assert circuit_breaker.state == "half_open"  # noqa: S101
+        assert manager.execute_sync(QUERY, {"value": 1}) == {"echo": {"value": 1}}  # noqa: S101
+        assert circuit_breaker.state == "closed"  # noqa: S101
+        manager.close()
@@ -0,0 +1,100 @@
+"""Persistent GraphQL session test."""
+
+import asyncio
+from pathlib import Path
+
+from gql import Client, gql
+from graphql import IntrospectionQuery
+
+from opthub_client.graphql.client import URL, GraphQLSessionManager, get_gql_client, sessions
+from opthub_client.graphql.schema_cache import SchemaCache
+from tests.api._graphql_server import FakeGraphQLServer
+
+QUERY = gql("query echo($value: Int) { echo(value: $value) }")
+QUERY_COUNT = 3
+
+
+def create_manager(
+    server: FakeGraphQLServer,
+    tokens: list[str],
+    clients: list[Client],
+    schema_cache: SchemaCache | None = None,
+) -> GraphQLSessionManager:
+    """Create a manager of sessions to the fake server, with the last of `tokens` as the current access token."""
+
+    def client_factory(access_token: str | None, url: str, introspection: IntrospectionQuery | None) -> Client:
+        client = get_gql_client(access_token, url, introspection)
+        clients.append(client)
+        return client
+
+    return GraphQLSessionManager(client_factory, lambda: tokens[-1], schema_cache, url=server.url)
+
+
+def test_session_is_reused() -> None:
+    """Synchronous and asynchronous queries from several event loops share one connection."""
+    clients: list[Client] = []
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server, ["token"], clients)
+        results = [manager.execute_sync(QUERY, {"value": value}) for value in range(QUERY_COUNT)]
+        results += [asyncio.run(manager.execute(QUERY, {"value": value})) for value in range(QUERY_COUNT)]
+        manager.close()
+
+    assert results == [{"echo": {"value": value}} for value in range(QUERY_COUNT)] * 2  # noqa: S101
+    assert len(clients) == 1  # noqa: S101
+    assert server.connections == 1  # noqa: S101
+
+
+def test_session_is_rebuilt_for_new_token() -> None:
+    """A new session is connected when the access token changes, and after closing."""
+    tokens = ["old"]
+    clients: list[Client] = []
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server, tokens, clients)
+        manager.execute_sync(QUERY, {"value": 0})
+        tokens.append("new")
+        manager.execute_sync(QUERY, {"value": 1})
+        manager.execute_sync(QUERY, {"value": 2})
+        manager.close()
+        manager.execute_sync(QUERY, {"value": 3})
+        manager.close()
+
+    assert server.authorizations == ["Bearer old", "Bearer new", "Bearer new", "Bearer new"]  # noqa: S101
+    assert len(clients) == 3  # noqa: S101, PLR2004
+
+
+def test_schema_is_cached(tmp_path: Path) -> None:
+    """The schema is fetched by the first session only, and then read from the cache."""
+    with FakeGraphQLServer() as server:
+        for _ in range(2):
+            manager = create_manager(server, ["token"], [], SchemaCache(server.url, tmp_path / "schema.json"))
+            assert manager.execute_sync(QUERY, {"value": 1}) == {"echo": {"value": 1}}  # noqa: S101
+            manager.close()
+
+        assert server.introspections == 1  # noqa: S101
+        manager = create_manager(server, ["token"], [], SchemaCache(server.url, tmp_path / "schema.json", ttl_sec=0))
+        manager.execute_sync(QUERY, {"value": 1})
+        manager.close()
+
+        assert server.introspections == 2  # noqa: S101, PLR2004
+
+
+def test_stale_schema_is_refetched(tmp_path: Path) -> None:
+    """A query rejected by an outdated cached schema is validated again against the fetched schema."""
+    with FakeGraphQLServer("type Query { other: Int }") as old, FakeGraphQLServer() as server:
+        file_path = tmp_path / "schema.json"
+        SchemaCache(server.url, file_path).save(old.introspection)
+        manager = create_manager(server, ["token"], [], SchemaCache(server.url, file_path))
+        assert manager.execute_sync(QUERY, {"value": 1}) == {"echo": {"value": 1}}  # noqa: S101
+        manager.close()
+
+        assert server.introspections == 1  # noqa: S101
+        assert SchemaCache(server.url, file_path).load() == server.introspection  # noqa: S101
+
+
+def test_default_client_factory() -> None:
+    """The sessions of the process connect to the OptHub API, with or without a cached schema."""
+    with FakeGraphQLServer() as server:
+        for introspection in (None, server.introspection):
+            client = sessions._create_client("token", introspection)  # noqa: SLF001
+            assert client.transport.url == URL  # type: ignore[attr-defined]  # noqa: S101
+            assert client.introspection == introspection  # noqa: S101
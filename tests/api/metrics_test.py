@@ -0,0 +1,56 @@
+"""Metrics test for Public REST API wrapper."""
+
+import tests.api._common as common
+from opthub_client.api import MetricsRegistry, OptHub
+from tests.api._server import FakeOptHubServer
+
+EVALUATION_SEC = 0.2
+
+
+def test_metrics_count_requests_polls_and_retries() -> None:
+    """Requests, submissions, polls and retries are recorded and exported."""
+    metrics = MetricsRegistry()
+    with (
+        FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server,
+        OptHub(
+            common.TEST_API_KEY,
+            server.url,
+            metrics=metrics,
+            poll_mode="fixed",
+        ) as api,
+    ):
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.0
+        trial = api.match(common.TEST_MATCH).submit([1.0])
+        server.fail_statuses.append(503)
+        trial.wait_evaluation()
+
+    snapshot = metrics.snapshot()
+    requests = {
+        (sample["labels"]["endpoint"], sample["labels"]["status"]): sample["value"]
+        for sample in snapshot["opthub_requests_total"]
+    }
+    status_checks = server.count("GET", "trial") - 1  # one of them was retried
+    expected = {("submit", "ok"): 1, ("trial", "ok"): status_checks, ("evaluation", "ok"): 1, ("score", "ok"): 1}
+    assert requests == expected  # noqa: S101
+    assert snapshot["opthub_submissions_total"] == [{"labels": {}, "value": 1}]  # noqa: S101
+    assert snapshot["opthub_retries_total"] == [{"labels": {"cause": "503"}, "value": 1}]  # noqa: S101
+    [polls] = snapshot["opthub_polls_per_wait"]
+    assert polls["labels"] == {"phase": "evaluation"}  # noqa: S101
+    assert polls["sum"] == status_checks  # noqa: S101
+    [latency] = snapshot["opthub_submit_to_result_seconds"]
+    assert latency["sum"] >= EVALUATION_SEC  # noqa: S101
+    assert snapshot["opthub_poll_sleep_seconds_total"][0]["value"] > 0  # noqa: S101
+
+    text = metrics.to_prometheus()
+    assert "# TYPE opthub_requests_total counter" in text  # noqa: S101
+    assert 'opthub_requests_total{endpoint="submit",status="ok"} 1' in text  # noqa: S101
+    assert 'opthub_submit_to_result_seconds_bucket{phase="evaluation",le="+Inf"} 1' in text  # noqa: S101
+
+
+def test_metrics_are_off_by_default() -> None:
+    """Without a registry, nothing is recorded."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        api.match(common.TEST_MATCH).submit([1.0]).wait_evaluation()
+        assert api.metrics is None  # noqa: S101
@@ -0,0 +1,83 @@
+"""Async model layer test."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from opthub_client.graphql.client import run_sync
+from opthub_client.models.api_key import create_api_key, create_api_key_async
+from opthub_client.models.remote_message import get_version_status_messages, get_version_status_messages_async
+from tests.api._graphql_server import FakeGraphQLServer
+
+SCHEMA = """
+type VersionStatus {
+    label: String
+    labelColor: String
+    message: String
+    messageColor: String
+}
+
+type APIKey {
+    expiresAt: String
+    value: String
+}
+
+type Query {
+    getCLIVersionStatus(version: String): [VersionStatus]
+}
+
+type Mutation {
+    createAPIKey(force: Boolean): APIKey
+}
+"""
+
+
+def get_version_status(_: object, version: str) -> list[dict[str, Any]]:
+    """Resolve the messages of a version."""
+    return [{"label": "Info", "labelColor": "green", "message": f"Version {version}", "messageColor": "white"}]
+
+
+def create_key(_: object, force: bool) -> dict[str, Any]:
+    """Resolve a new API key."""
+    return {"expiresAt": "2025-01-01T00:00:00Z", "value": "forced" if force else "key"}
+
+
+pytestmark = pytest.mark.graphql_schema(
+    SCHEMA,
+    root={"getCLIVersionStatus": get_version_status, "createAPIKey": create_key},
+)
+
+
+def test_sync_wrappers_share_one_event_loop(server: FakeGraphQLServer) -> None:  # noqa: ARG001
+    """The synchronous models run their coroutines on the event loop of the sessions."""
+
+    async def running_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    [message] = get_version_status_messages("1.0.0")
+    assert message.message == "Version 1.0.0"  # noqa: S101
+    assert create_api_key(force=True)["value"] == "forced"  # noqa: S101
+    assert run_sync(running_loop()) is run_sync(running_loop())  # noqa: S101
+
+
+def test_async_models_can_be_gathered(server: FakeGraphQLServer) -> None:
+    """The asynchronous models run on the event loop of the caller, concurrently."""
+
+    async def gather() -> tuple[Any, ...]:
+        return await asyncio.gather(get_version_status_messages_async("1.0.0"), create_api_key_async(force=False))
+
+    messages, api_key = asyncio.run(gather())
+    assert messages[0].label == "Info"  # noqa: S101
+    assert api_key["value"] == "key"  # noqa: S101
+    assert len(server.requests) == 2  # noqa: S101, PLR2004
+
+
+def test_run_sync_from_the_event_loop_of_the_sessions(server: FakeGraphQLServer) -> None:  # noqa: ARG001
+    """Waiting for a coroutine from the event loop running it would block forever, so it is refused."""
+
+    async def nested() -> None:
+        with pytest.raises(RuntimeError):
+            run_sync(asyncio.sleep(0))
+
+    run_sync(nested())
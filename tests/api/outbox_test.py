@@ -0,0 +1,181 @@
+"""Submission outbox test for Public REST API wrapper."""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import Match, OptHub, OutboxLockedError, OutboxSubmissionError, SubmissionOutbox
+from tests.api._server import FakeOptHubServer
+
+SOLUTION_COUNT = 20
+MAX_PUT_SEC = 0.001
+LATENCY_SEC = 0.5
+RETRY_INTERVAL_SEC = 0.05
+
+
+def put(match: Match, solutions: list[list[float]]) -> list[int]:
+    """Append solutions to the outbox, checking that it does not wait for the network."""
+    start = time.perf_counter()
+    entry_ids = [match.submit_nowait(solution) for solution in solutions]
+    assert (time.perf_counter() - start) / len(solutions) < MAX_PUT_SEC  # noqa: S101
+    return entry_ids
+
+
+def test_submit_nowait(tmp_path: Path) -> None:
+    """Solutions are submitted in the background and their trial numbers are recorded."""
+    solutions = [[float(i)] for i in range(SOLUTION_COUNT)]
+    with (
+        FakeOptHubServer(latency_sec=0.01) as server,
+        OptHub(common.TEST_API_KEY, server.url, outbox=SubmissionOutbox(tmp_path / "outbox.jsonl")) as api,
+    ):
+        assert api.outbox is not None  # noqa: S101
+        entry_ids = put(api.match(common.TEST_MATCH), solutions)
+        assert api.outbox.flush(timeout=10)  # noqa: S101
+        trial_nos = [api.outbox.wait(entry_id) for entry_id in entry_ids]
+
+    assert sorted(trial_nos) == list(range(1, SOLUTION_COUNT + 1))  # noqa: S101
+    assert [server.trials[trial_no].variable["vector"] for trial_no in trial_nos] == solutions  # noqa: S101
+
+
+def test_replay_after_restart(tmp_path: Path) -> None:
+    """Unsent solutions are sent when the outbox is opened again, and interrupted sends are not duplicated."""
+    file_path = tmp_path / "outbox.jsonl"
+    with FakeOptHubServer() as server:
+        with OptHub(common.TEST_API_KEY, server.url) as api:
+            trial = api.match(common.TEST_MATCH).submit([1.0])
+        # A crashed process: the first solution was sent and accepted, but its trial number was not recorded.
+        with SubmissionOutbox(file_path) as outbox:
+            outbox.put(common.TEST_MATCH, b'{"variable":{"vector":[1.0]}}')
+            outbox.put(common.TEST_MATCH, b'{"variable":{"vector":[2.0]}}')
+        file_path.write_text(file_path.read_text() + '{"op":"send","id":1}\n{"op":"put","id":3')
+
+        with OptHub(common.TEST_API_KEY, server.url, outbox=SubmissionOutbox(file_path)) as api:
+            assert api.outbox is not None  # noqa: S101
+            assert api.outbox.flush(timeout=10)  # noqa: S101
+            assert api.outbox.wait(1) == trial.trial_no  # noqa: S101
+            second = api.outbox.wait(2)
+
+        assert sorted(server.trials) == [trial.trial_no, second]  # noqa: S101
+
+    with SubmissionOutbox(file_path) as outbox:
+        assert outbox.pending == 0  # noqa: S101
+        assert outbox.trial_no(2) == second  # noqa: S101
+
+
+def test_refused_submission(tmp_path: Path) -> None:
+    """A submission refused by the server is recorded as failed instead of being resent."""
+    with (
+        FakeOptHubServer() as server,
+        OptHub(common.TEST_API_KEY, server.url, outbox=SubmissionOutbox(tmp_path / "outbox.jsonl")) as api,
+    ):
+        assert api.outbox is not None  # noqa: S101
+        server.fail_statuses.append(400)
+        entry_id = api.match(common.TEST_MATCH).submit_nowait([1.0])
+        with pytest.raises(OutboxSubmissionError):
+            api.outbox.wait(entry_id, timeout=10)
+        assert api.outbox.pending == 0  # noqa: S101
+
+
+def test_reconcile_in_background(tmp_path: Path) -> None:
+    """Looking up the interrupted sends does not block the creation of the API, and unfound ones are sent again."""
+    file_path = tmp_path / "outbox.jsonl"
+    with SubmissionOutbox(file_path) as outbox:
+        outbox.put(common.TEST_MATCH, b'{"variable":{"vector":[1.0]}}')
+    file_path.write_text(file_path.read_text() + '{"op":"send","id":1}\n')
+
+    with FakeOptHubServer(latency_sec=LATENCY_SEC) as server:
+        start = time.perf_counter()
+        with OptHub(common.TEST_API_KEY, server.url, outbox=SubmissionOutbox(file_path)) as api:
+            assert time.perf_counter() - start < LATENCY_SEC  # noqa: S101
+            assert api.outbox is not None  # noqa: S101
+            assert api.outbox.wait(1, timeout=10) == 1  # noqa: S101
+        assert server.count("GET", "solution") == 1  # noqa: S101
+        assert sorted(server.trials) == [1]  # noqa: S101
+
+
+def test_acknowledged_entries_are_compacted(tmp_path: Path) -> None:
+    """Acknowledged entries are dropped from the log, except the last trial number of their match."""
+    file_path = tmp_path / "outbox.jsonl"
+    solutions = [[float(i)] for i in range(SOLUTION_COUNT)]
+    with (
+        FakeOptHubServer() as server,
+        OptHub(
+            common.TEST_API_KEY,
+            server.url,
+            outbox=SubmissionOutbox(file_path, compact_threshold=SOLUTION_COUNT // 2),
+        ) as api,
+    ):
+        assert api.outbox is not None  # noqa: S101
+        entry_ids = put(api.match(common.TEST_MATCH), solutions)
+        assert api.outbox.flush(timeout=10)  # noqa: S101
+        api.outbox.acknowledge(*entry_ids[: SOLUTION_COUNT // 2])
+        assert len(file_path.read_text().splitlines()) < 2 * SOLUTION_COUNT  # noqa: S101
+        api.outbox.acknowledge(*entry_ids[SOLUTION_COUNT // 2 :])
+        with pytest.raises(KeyError):
+            api.outbox.trial_no(entry_ids[0])
+
+    records = [json.loads(line) for line in file_path.read_text().splitlines()]
+    assert records == [{"op": "last", "match": str(common.TEST_MATCH), "trial": SOLUTION_COUNT}]  # noqa: S101
+
+
+def test_uncertain_submission_is_looked_up(tmp_path: Path) -> None:
+    """A submission answered by a server error is looked up before being resent, so that it is not duplicated."""
+    outbox = SubmissionOutbox(tmp_path / "outbox.jsonl", retry_interval_sec=RETRY_INTERVAL_SEC)
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url, outbox=outbox) as api:
+        server.lost_statuses.append(502)
+        entry_id = api.match(common.TEST_MATCH).submit_nowait([1.0])
+        assert outbox.wait(entry_id, timeout=10) == 1  # noqa: S101
+        assert server.count("POST", "trials") == 1  # noqa: S101
+        assert sorted(server.trials) == [1]  # noqa: S101
+
+
+def test_identical_solutions_are_reconciled_once_each(tmp_path: Path) -> None:
+    """A trial matches one interrupted entry with its solution, sent after the last trial number known at the time."""
+    file_path = tmp_path / "outbox.jsonl"
+    with SubmissionOutbox(file_path) as outbox:
+        outbox.put(common.TEST_MATCH, b'{"variable":{"vector":[1.0]}}')
+        outbox.put(common.TEST_MATCH, b'{"variable":{"vector":[1.0]}}')
+    # Concurrent sends: the second entry created the first trial, but only the trial of the first entry was recorded.
+    match = str(common.TEST_MATCH)
+    records = [
+        '{"op":"send","id":2,"after":0}',
+        '{"op":"send","id":1,"after":0}',
+        f'{{"op":"done","id":1,"match":"{match}","trial":2}}',
+    ]
+    file_path.write_text(file_path.read_text() + "\n".join(records) + "\n")
+
+    with FakeOptHubServer() as server:
+        with OptHub(common.TEST_API_KEY, server.url) as api:
+            api.match(common.TEST_MATCH).submit_many([[1.0], [1.0]])
+        with OptHub(common.TEST_API_KEY, server.url, outbox=SubmissionOutbox(file_path)) as api:
+            assert api.outbox is not None  # noqa: S101
+            assert api.outbox.wait(2, timeout=10) == 1  # noqa: S101
+        assert sorted(server.trials) == [1, 2]  # noqa: S101
+
+
+def test_reconcile_retries_transient_errors(tmp_path: Path) -> None:
+    """A server error while looking up an interrupted entry is retried instead of resending the entry."""
+    file_path = tmp_path / "outbox.jsonl"
+    with SubmissionOutbox(file_path) as outbox:
+        outbox.put(common.TEST_MATCH, b'{"variable":{"vector":[1.0]}}')
+    file_path.write_text(file_path.read_text() + '{"op":"send","id":1}\n')
+
+    with FakeOptHubServer() as server:
+        with OptHub(common.TEST_API_KEY, server.url) as api:
+            api.match(common.TEST_MATCH).submit([1.0])
+        server.fail_statuses.append(500)
+        outbox = SubmissionOutbox(file_path, retry_interval_sec=RETRY_INTERVAL_SEC)
+        with OptHub(common.TEST_API_KEY, server.url, retries=0, outbox=outbox) as api:
+            assert outbox.wait(1, timeout=10) == 1  # noqa: S101
+        assert sorted(server.trials) == [1]  # noqa: S101
+
+
+def test_log_is_used_by_one_outbox(tmp_path: Path) -> None:
+    """An outbox cannot open a log which another outbox is using, until it is closed."""
+    file_path = tmp_path / "outbox.jsonl"
+    with SubmissionOutbox(file_path), pytest.raises(OutboxLockedError):
+        SubmissionOutbox(file_path)
+    SubmissionOutbox(file_path).close()
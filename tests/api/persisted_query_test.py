@@ -0,0 +1,54 @@
+"""Registered GraphQL document and persisted query test."""
+
+import functools
+
+from opthub_client.graphql.client import GraphQLSessionManager, get_gql_client
+from opthub_client.graphql.documents import register, registered
+from tests.api._graphql_server import FakeGraphQLServer, create_session_manager
+
+QUERY = register("query echo($value: Int) { echo(value: $value) }")
+QUERY_COUNT = 3
+
+
+def create_manager(server: FakeGraphQLServer, *, persisted_queries: bool) -> GraphQLSessionManager:
+    """Create a manager of sessions to the fake server."""
+    client_factory = functools.partial(get_gql_client, persisted_queries=persisted_queries)
+    return create_session_manager(server, client_factory=client_factory)
+
+
+def test_registered_document_is_sent_as_printed() -> None:
+    """A registered document is sent with the query text printed at registration."""
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server, persisted_queries=False)
+        assert manager.execute_sync(QUERY, {"value": 1}) == {"echo": {"value": 1}}  # noqa: S101
+        manager.close()
+
+    body = registered(QUERY)
+    assert body is not None  # noqa: S101
+    assert server.requests == [{"query": body.query, "variables": {"value": 1}}]  # noqa: S101
+
+
+def test_persisted_query() -> None:
+    """The query text is sent once after a miss, and then only its hash."""
+    with FakeGraphQLServer(persisted_queries=True) as server:
+        manager = create_manager(server, persisted_queries=True)
+        results = [manager.execute_sync(QUERY, {"value": value}) for value in range(QUERY_COUNT)]
+        manager.close()
+
+    body = registered(QUERY)
+    assert body is not None  # noqa: S101
+    assert results == [{"echo": {"value": value}} for value in range(QUERY_COUNT)]  # noqa: S101
+    assert ["query" in request for request in server.requests] == [False, True, False, False]  # noqa: S101
+    hashes = {request["extensions"]["persistedQuery"]["sha256Hash"] for request in server.requests}
+    assert hashes == {body.sha256}  # noqa: S101
+
+
+def test_persisted_query_not_supported() -> None:
+    """The query text is sent again, and with all later requests, if the server does not support persisted queries."""
+    with FakeGraphQLServer() as server:
+        manager = create_manager(server, persisted_queries=True)
+        results = [manager.execute_sync(QUERY, {"value": value}) for value in range(QUERY_COUNT)]
+        manager.close()
+
+    assert results == [{"echo": {"value": value}} for value in range(QUERY_COUNT)]  # noqa: S101
+    assert ["query" in request for request in server.requests] == [False, True, True, True]  # noqa: S101
@@ -0,0 +1,60 @@
+"""Process pool test for Public REST API wrapper."""
+
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import Match, OptHub, Trial
+from tests.api._server import FakeOptHubServer
+
+SOLUTION_COUNT = 4
+WORKER_COUNT = 2
+
+
+def wait_objective(trial: Trial) -> float | None:
+    """Wait for the evaluation of a trial in a worker process."""
+    return trial.wait_evaluation().objective.scalar
+
+
+def submit(match: Match, value: float) -> int:
+    """Submit a solution from a worker process."""
+    return match.submit([value]).trial_no
+
+
+def test_pickle_in_process() -> None:
+    """Unpickling in the same process returns the same API and match, with the trial results retrieved so far."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.01
+        trial = api.match(common.TEST_MATCH).submit([1.0])
+        trial.wait_evaluation()
+        restored = pickle.loads(pickle.dumps(trial))  # noqa: S301
+
+        assert restored.match is trial.match  # noqa: S101
+        assert restored.trial_no == trial.trial_no  # noqa: S101
+        assert restored.status is trial.status  # noqa: S101
+        assert restored.evaluation == trial.evaluation  # noqa: S101
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+def test_process_pool(start_method: str) -> None:
+    """Matches and trials are sent to worker processes, which use their own connections."""
+    context = multiprocessing.get_context(start_method)
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.01
+        match = api.match(common.TEST_MATCH)
+        # Open a pooled connection in the parent before forking
+        match.submit([0.0]).wait_evaluation()
+        connections = server.connections
+
+        with ProcessPoolExecutor(WORKER_COUNT, mp_context=context) as executor:
+            trial_nos = list(executor.map(submit, [match] * SOLUTION_COUNT, range(1, SOLUTION_COUNT + 1)))
+            trials = [match.try_get_trial(trial_no) for trial_no in trial_nos]
+            objectives = list(executor.map(wait_objective, trials))
+
+        assert objectives == [float(value) for value in range(1, SOLUTION_COUNT + 1)]  # noqa: S101
+        assert server.connections > connections  # noqa: S101
+        # The connection of the parent still works
+        assert match.submit([0.0]).wait_evaluation().objective.scalar == 0.0  # noqa: S101
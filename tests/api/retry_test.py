@@ -0,0 +1,36 @@
+"""Test for connection pooling and retries of transient errors."""
+
+import pytest
+from opthub_api_client.exceptions import ServiceException
+
+import tests.api._common as common
+from opthub_client.api import OptHub, RetryPolicy
+from tests.api._server import FakeOptHubServer
+
+
+def retry_policy(total: int) -> RetryPolicy:
+    """A retry policy without backoff."""
+    return RetryPolicy(total=total, status_forcelist=RetryPolicy.RETRY_STATUSES, raise_on_status=False)
+
+
+def test_transient_errors_are_retried() -> None:
+    """Reads are retried on 5xx and submissions on 429."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url, retries=retry_policy(3)) as api:
+        match = api.match(common.TEST_MATCH)
+        server.fail_statuses.extend([429, 429])
+        trial = match.submit([1.0])
+        server.fail_statuses.extend([502, 503])
+        assert match.get_trial(trial.trial_no).trial_no == trial.trial_no  # noqa: S101
+        assert len(server.trials) == 1  # noqa: S101
+
+
+def test_submission_is_not_retried_on_server_error() -> None:
+    """A submission failing with 5xx is not sent twice, since the server may have accepted it."""
+    with (
+        FakeOptHubServer() as server,
+        OptHub(common.TEST_API_KEY, server.url, retries=retry_policy(3), timeout=5, pool_maxsize=2) as api,
+    ):
+        server.fail_statuses.append(502)
+        with pytest.raises(ServiceException):
+            api.match(common.TEST_MATCH).submit([1.0])
+        assert server.count("POST", "trials") == 1  # noqa: S101
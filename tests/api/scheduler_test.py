@@ -0,0 +1,107 @@
+"""Test for the budget-aware submission scheduler."""
+
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import OptHub, SubmissionRefusedError, SubmissionScheduler
+from tests.api._server import FakeOptHubServer
+
+BUDGET = 3
+RATE = 20.0
+
+
+def test_budget_is_enforced_locally() -> None:
+    """Submissions beyond the budget are refused without a round trip."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        scheduler = SubmissionScheduler(submissions_budget=BUDGET, rate=RATE)
+        match = api.match(common.TEST_MATCH, scheduler=scheduler)
+        start = time.monotonic()
+        for i in range(BUDGET):
+            match.submit([float(i)])
+        assert time.monotonic() - start >= (BUDGET - 1) / RATE  # noqa: S101
+        with pytest.raises(SubmissionRefusedError):
+            match.submit([0.0])
+        assert server.count("POST", "trials") == BUDGET  # noqa: S101
+        assert scheduler.remaining_submissions == 0  # noqa: S101
+
+
+def test_rejected_submission_does_not_use_budget() -> None:
+    """A submission rejected by the server is given back to the budget."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        scheduler = SubmissionScheduler(submissions_budget=1)
+        server.fail_statuses.append(400)
+        match = api.match(common.TEST_MATCH, scheduler=scheduler)
+        with pytest.raises(Exception, match="400"):
+            match.submit([1.0])
+        match.submit([1.0])
+        assert scheduler.remaining_submissions == 0  # noqa: S101
+
+
+def test_match_window() -> None:
+    """Submissions outside the match window are refused."""
+    now = datetime.now(UTC)
+    closed = SubmissionScheduler.from_match(
+        {
+            "id": str(common.TEST_MATCH),
+            "alias": "match",
+            "success_trials_budget": None,
+            "submissions_budget": None,
+            "open_at": (now - timedelta(days=2)).isoformat(),
+            "close_at": (now - timedelta(days=1)).isoformat(),
+        },
+    )
+    with pytest.raises(SubmissionRefusedError):
+        closed.acquire()
+    with pytest.raises(SubmissionRefusedError):
+        SubmissionScheduler(open_at=now + timedelta(days=1), block=False).acquire()
+    with pytest.raises(TimeoutError):
+        SubmissionScheduler(open_at=now + timedelta(days=1)).acquire(timeout=0.1)
+
+
+def test_trials_in_flight_count_against_success_budget() -> None:
+    """Concurrent submissions do not overshoot the success trials budget."""
+    with FakeOptHubServer(evaluation_sec=0.2) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        scheduler = SubmissionScheduler(success_trials_budget=BUDGET)
+        match = api.match(common.TEST_MATCH, scheduler=scheduler)
+        solutions = [[1.0]] * (2 * BUDGET)
+        result = match.evaluate(solutions, max_in_flight=len(solutions), timeout=10)
+        assert server.count("POST", "trials") == BUDGET  # noqa: S101
+        assert result.errors.sum() == len(solutions) - BUDGET  # noqa: S101
+        with pytest.raises(SubmissionRefusedError, match="used up"):
+            match.submit([1.0])
+        assert len(scheduler.success_trials) == BUDGET  # noqa: S101
+
+
+def test_submissions_in_flight_are_waited_for() -> None:
+    """A submission waits while the submissions in flight could use up the budget, and failed trials give it back."""
+    scheduler = SubmissionScheduler(success_trials_budget=1)
+    scheduler.acquire()
+    with pytest.raises(TimeoutError):
+        scheduler.acquire(timeout=0.1)
+    threading.Timer(0.1, scheduler.release).start()
+    scheduler.acquire(timeout=10)
+    scheduler.record_submission(1)
+    with pytest.raises(TimeoutError):
+        scheduler.acquire(timeout=0.1)
+    threading.Timer(0.1, scheduler.record_failure, (1,)).start()
+    scheduler.acquire(timeout=10)
+    scheduler.record_submission(2)
+    threading.Timer(0.1, scheduler.record_success, (2,)).start()
+    with pytest.raises(SubmissionRefusedError, match="used up"):
+        scheduler.acquire(timeout=10)
+
+
+def test_evaluate_waits_for_failed_trials_to_free_budget() -> None:
+    """Rows beyond the success trials budget wait for the trials in flight, and are submitted when they fail."""
+    with FakeOptHubServer(evaluation_sec=0.1) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.05
+        match = api.match(common.TEST_MATCH, scheduler=SubmissionScheduler(success_trials_budget=BUDGET))
+        solutions = [[-1.0]] * BUDGET + [[1.0]] * BUDGET
+        result = match.evaluate(solutions, max_in_flight=len(solutions), timeout=10)
+        assert server.count("POST", "trials") == len(solutions)  # noqa: S101
+        assert result.errors.tolist() == [True] * BUDGET + [False] * BUDGET  # noqa: S101
@@ -0,0 +1,42 @@
+"""2-D array submission test for Public REST API wrapper."""
+
+import numpy as np
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import OptHub
+from tests.api._server import FakeOptHubServer
+
+POPULATION = 8
+DIMENSION = 10_000
+
+
+def test_submit_array_keeps_row_order() -> None:
+    """Each row is submitted as a vector solution, and the trials are returned in row order."""
+    solutions = np.random.default_rng(0).random((POPULATION, DIMENSION))
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        trials = api.match(common.TEST_MATCH).submit_array(solutions, max_in_flight=4)
+        assert len(trials) == POPULATION  # noqa: S101
+        for trial, row in zip(trials, solutions, strict=True):
+            assert server.trials[trial.trial_no].variable["vector"] == row.tolist()  # noqa: S101
+
+
+def test_submit_scalar_and_vector() -> None:
+    """`submit` encodes scalars and vectors like the generated client."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        match = api.match(common.TEST_MATCH)
+        scalar = match.submit(np.float32(1.5))
+        vector = match.submit([1, 2])
+        assert server.trials[scalar.trial_no].variable == {"scalar": 1.5}  # noqa: S101
+        assert server.trials[vector.trial_no].variable == {"vector": [1.0, 2.0]}  # noqa: S101
+
+
+def test_submit_array_rejects_invalid_input() -> None:
+    """Arrays which are not 2-D, or which are not valid JSON numbers, are rejected before sending."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        match = api.match(common.TEST_MATCH)
+        with pytest.raises(ValueError, match="2-D"):
+            match.submit_array([1.0, 2.0])
+        with pytest.raises(ValueError, match="JSON"):
+            match.submit_array([[1.0, np.nan]])
+        assert not server.requests  # noqa: S101
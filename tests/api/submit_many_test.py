@@ -0,0 +1,36 @@
+"""Batch submission test for Public REST API wrapper."""
+
+import time
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import BatchSubmissionError, OptHub
+from tests.api._server import FakeOptHubServer
+
+LATENCY_SEC = 0.1
+POPULATION = 40
+SUCCEEDED = 2
+
+
+def test_submit_many_keeps_order() -> None:
+    """The trials are returned in input order and sent concurrently."""
+    with FakeOptHubServer(latency_sec=LATENCY_SEC) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        match = api.match(common.TEST_MATCH)
+        start = time.monotonic()
+        trials = match.submit_many([[float(i)] for i in range(POPULATION)], max_in_flight=POPULATION)
+        elapsed = time.monotonic() - start
+        variables = [server.trials[trial.trial_no].variable["vector"] for trial in trials]
+        assert variables == [[float(i)] for i in range(POPULATION)]  # noqa: S101
+        assert elapsed < POPULATION * LATENCY_SEC / 2  # noqa: S101
+
+
+def test_submit_many_reports_failures() -> None:
+    """A failed submission does not cancel the rest."""
+    with FakeOptHubServer() as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        server.fail_statuses.append(400)
+        with pytest.raises(BatchSubmissionError) as e:
+            api.match(common.TEST_MATCH).submit_many([[1.0], [2.0], [3.0]], max_in_flight=2)
+        assert len(e.value.errors) == 1  # noqa: S101
+        assert sum(trial is not None for trial in e.value.trials) == SUCCEEDED  # noqa: S101
+        assert len(server.trials) == SUCCEEDED  # noqa: S101
@@ -0,0 +1,39 @@
+"""Stress test of an OptHub instance shared by many threads."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tests.api._common as common
+from opthub_client.api import OptHub
+from tests.api._server import FakeOptHubServer
+
+LATENCY_SEC = 0.02
+TRIALS_PER_WORKER_COUNT = 48
+WORKER_COUNTS = (1, 4, 16)
+# The evaluation and the score of a finished trial are retrieved with concurrent requests
+CONNECTIONS_PER_WORKER = 2
+
+
+@pytest.mark.parametrize("workers", WORKER_COUNTS)
+def test_shared_client(workers: int) -> None:
+    """No trial is lost or duplicated, connections are reused, and the workers send their requests concurrently."""
+    with FakeOptHubServer(latency_sec=LATENCY_SEC) as server, OptHub(common.TEST_API_KEY, server.url) as api:
+        api.poll_interval_initial_sec = 0.01
+        api.poll_max_random_delay_sec = 0.0
+
+        def work(i: int) -> tuple[int, float]:
+            trial = api.match(common.TEST_MATCH).submit([float(i)])
+            return trial.trial_no, trial.wait_evaluation().objective.scalar
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(work, range(TRIALS_PER_WORKER_COUNT)))
+
+        trial_nos = [trial_no for trial_no, _ in results]
+        assert sorted(trial_nos) == sorted(server.trials)  # noqa: S101
+        assert len(set(trial_nos)) == TRIALS_PER_WORKER_COUNT  # noqa: S101
+        assert [objective for _, objective in results] == [float(i) for i in range(TRIALS_PER_WORKER_COUNT)]  # noqa: S101
+        assert server.count("POST", "trials") == TRIALS_PER_WORKER_COUNT  # noqa: S101
+        assert server.connections <= CONNECTIONS_PER_WORKER * workers  # noqa: S101
+        # The requests of the workers are not serialized by the shared client
+        assert workers // 2 < server.max_concurrency <= CONNECTIONS_PER_WORKER * workers  # noqa: S101
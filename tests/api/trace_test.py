@@ -0,0 +1,99 @@
+"""Timing trace test."""
+
+import asyncio
+import io
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from gql import gql
+
+from opthub_client import trace
+from opthub_client.graphql.client import (
+    GraphQLRequest,
+    execute_graphql,
+    execute_graphql_async,
+    execute_graphql_batch,
+)
+from opthub_client.opt import opt
+from opthub_client.trace import Tracer, traced
+from tests.api._graphql_server import FakeGraphQLServer
+
+ECHO = gql("query echo($value: Int) { echo(value: $value) }")
+FAIL = gql("query fail($message: String) { failed: fail(message: $message) }")
+
+
+@pytest.fixture()
+def tracer(monkeypatch: pytest.MonkeyPatch) -> Tracer:
+    """Replace the tracer of the process by an enabled one."""
+    tracer = Tracer()
+    tracer.enable()
+    monkeypatch.setattr(trace, "tracer", tracer)
+    return tracer
+
+
+def test_graphql_requests_are_traced(tracer: Tracer, server: FakeGraphQLServer) -> None:  # noqa: ARG001
+    """Each GraphQL request is a span named after its operation, and the connection of the session is traced."""
+    with trace.span("command"):
+        execute_graphql(ECHO, {"value": 1})
+        asyncio.run(execute_graphql_async(ECHO, {"value": 2}))
+        execute_graphql_batch([GraphQLRequest(ECHO), GraphQLRequest(FAIL, {"message": "boom"})])
+
+    spans = {span.name: span for span in tracer.spans}
+    assert [span.name for span in tracer.spans if span.name.startswith("graphql ")] == [  # noqa: S101
+        "graphql echo",
+        "graphql echo",
+        "graphql batch",
+    ]
+    assert spans["graphql batch"].args == {"operations": ["echo", "fail"]}  # noqa: S101
+    assert spans["graphql echo"].depth == spans["command"].depth + 1  # noqa: S101
+    assert spans["graphql.connect"].thread_name == "opthub-graphql"  # noqa: S101
+    assert "graphql.client" in spans  # noqa: S101
+
+
+def test_traced(tracer: Tracer) -> None:
+    """Functions, coroutine functions and generator functions are traced until they return."""
+
+    @traced("function")
+    def function() -> int:
+        return 1
+
+    @traced("coroutine")
+    async def coroutine() -> int:
+        await asyncio.sleep(0)
+        return 2
+
+    @traced("generator")
+    def generator() -> Iterator[int]:
+        yield 3
+
+    assert (function(), asyncio.run(coroutine()), list(generator())) == (1, 2, [3])  # noqa: S101
+    assert [span.name for span in tracer.spans] == ["startup", "function", "coroutine", "generator"]  # noqa: S101
+
+    output = io.StringIO()
+    tracer.print_waterfall(output)
+    lines = output.getvalue().splitlines()
+    assert lines[0].startswith("span")  # noqa: S101
+    assert lines[2].startswith("function")  # noqa: S101
+
+
+def test_disabled_tracer_records_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without tracing, no span is recorded."""
+    tracer = Tracer()
+    monkeypatch.setattr(trace, "tracer", tracer)
+    with trace.span("command"):
+        pass
+    assert tracer.spans == []  # noqa: S101
+
+
+def test_trace_output_option(tracer: Tracer, tmp_path: Path) -> None:  # noqa: ARG001
+    """`opt --trace-output` writes a Chrome trace with the span of the command, even if the command fails."""
+    output = tmp_path / "trace.json"
+    CliRunner().invoke(opt, ["--trace-output", str(output), "help"])
+
+    events = json.loads(output.read_text())["traceEvents"]
+    command = next(event for event in events if event["name"] == "opt help")
+    assert command["ph"] == "X"  # noqa: S101
+    assert command["dur"] >= 0  # noqa: S101
@@ -0,0 +1,56 @@
+"""Memory footprint test of the trials of the Public REST API wrapper."""
+
+import tracemalloc
+
+import tests.api._common as common
+from opthub_client.api import MatchTrialEvaluation, MatchTrialScore, MatchTrialStatus, OptHub, Trial, trial_status
+
+TRIALS = 100_000
+# Pydantic evaluation and score models alone take about 3 KB per trial.
+MAX_BYTES_PER_TRIAL = 800
+
+EVALUATION = MatchTrialEvaluation.from_dict(
+    {
+        "status": "Success",
+        "objective": {"vector": [1.0, 2.0]},
+        "feasible": True,
+        "info": {},
+        "startedAt": "2024-12-01T00:00:00.000Z",
+        "finishedAt": "2024-12-01T00:00:01.000Z",
+    },
+)
+SCORE = MatchTrialScore.from_dict(
+    {
+        "status": "Success",
+        "value": 1.0,
+        "startedAt": "2024-12-01T00:00:01.000Z",
+        "finishedAt": "2024-12-01T00:00:02.000Z",
+    },
+)
+
+
+def test_trials_are_compact() -> None:
+    """Keeping 10^5 finished trials with their evaluation and score stays within a small footprint."""
+    api = OptHub(common.TEST_API_KEY, "http://127.0.0.1:9")
+    match = api.match(common.TEST_MATCH)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        trials = []
+        for trial_no in range(TRIALS):
+            trial = Trial()
+            trial.trial_no = trial_no
+            trial.status = trial_status(MatchTrialStatus.SUCCESS)
+            trial.evaluation = EVALUATION
+            trial.score = SCORE
+            trial.match = api.match(common.TEST_MATCH)
+            trial.submitted_at = None
+            trials.append(trial)
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert used / TRIALS < MAX_BYTES_PER_TRIAL  # noqa: S101
+    assert all(trial.match is match for trial in trials)  # noqa: S101
+    assert trials[-1].evaluation == EVALUATION  # noqa: S101
+    assert trials[-1].score == SCORE  # noqa: S101
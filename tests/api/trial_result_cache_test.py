@@ -0,0 +1,74 @@
+"""Test for the cache of finished trial results."""
+
+from pathlib import Path
+
+import tests.api._common as common
+from opthub_client.api import MatchTrialStatus, OptHub, TrialResultCache
+from tests.api._server import FakeOptHubServer
+
+EXPECTED_SCORE = 4.0
+
+
+def test_repeated_lookups_use_cache(tmp_path: Path) -> None:
+    """Finished results are fetched once, then served from memory and from disk."""
+    file_path = tmp_path / "trial_results"
+    with FakeOptHubServer() as server:
+        with OptHub(common.TEST_API_KEY, server.url, cache=TrialResultCache(file_path=file_path)) as api:
+            trial = api.match(common.TEST_MATCH).submit([1.0, 3.0])
+            for _ in range(3):
+                assert trial.wait_scoring(timeout=10).value == EXPECTED_SCORE  # noqa: S101
+                assert trial.get_solution().variable.vector == [1.0, 3.0]  # noqa: S101
+        requests = len(server.requests)
+
+        with OptHub(common.TEST_API_KEY, server.url, cache=TrialResultCache(file_path=file_path)) as api:
+            trial = api.match(common.TEST_MATCH).get_trial(1)
+            assert trial.wait_scoring().value == EXPECTED_SCORE  # noqa: S101
+            assert trial.get_solution().variable.vector == [1.0, 3.0]  # noqa: S101
+        assert server.count("GET", "score") == 1  # noqa: S101
+        assert len(server.requests) == requests + 1  # only `get_trial`  # noqa: S101
+
+
+def test_lru_eviction_and_invalidation(tmp_path: Path) -> None:
+    """The least recently used trials are evicted, in memory and on disk."""
+    file_path = tmp_path / "trial_results"
+    cache = TrialResultCache(max_entries=2, file_path=file_path)
+    for trial_no in (1, 2):
+        cache.put(common.TEST_MATCH, trial_no, MatchTrialStatus.SUCCESS)
+    cache.put(common.TEST_MATCH, 3, MatchTrialStatus.EVALUATING)  # not finished, not cached
+    cache.get(common.TEST_MATCH, 1)
+    cache.put(common.TEST_MATCH, 4, MatchTrialStatus.SCORER_FAILED)
+    assert cache.get(common.TEST_MATCH, 2) is None  # noqa: S101
+    cache.close()
+    assert reopen(file_path, max_entries=2).get(common.TEST_MATCH, 4) is not None  # noqa: S101
+
+    cache.invalidate(common.TEST_MATCH, 4)
+    cache.close()
+    assert reopen(file_path).get(common.TEST_MATCH, 4) is None  # noqa: S101
+    cache.clear()
+    cache.close()
+    assert len(reopen(file_path)) == 0  # noqa: S101
+
+
+def test_order_of_use_is_persisted(tmp_path: Path) -> None:
+    """The trials read from the cache are the last evicted after a restart, and writes are batched."""
+    file_path = tmp_path / "trial_results"
+    cache = TrialResultCache(max_entries=2, file_path=file_path, sync_every=2, sync_interval_sec=60)
+    cache.put(common.TEST_MATCH, 1, MatchTrialStatus.SUCCESS)
+    assert len(reopen(file_path)) == 0  # not written yet  # noqa: S101
+    cache.put(common.TEST_MATCH, 2, MatchTrialStatus.SUCCESS)
+    assert len(reopen(file_path)) == 2  # a batch of 2 changes  # noqa: S101, PLR2004
+    cache.get(common.TEST_MATCH, 1)
+    cache.close()
+
+    cache = TrialResultCache(max_entries=2, file_path=file_path)
+    cache.put(common.TEST_MATCH, 3, MatchTrialStatus.SUCCESS)
+    assert cache.get(common.TEST_MATCH, 1) is not None  # noqa: S101
+    assert cache.get(common.TEST_MATCH, 2) is None  # noqa: S101
+    cache.close()
+
+
+def reopen(file_path: Path, max_entries: int = 100_000) -> TrialResultCache:
+    """Load the cache stored on disk into a new cache, closing its file at once."""
+    cache = TrialResultCache(max_entries=max_entries, file_path=file_path)
+    cache.close()
+    return cache
@@ -0,0 +1,162 @@
+"""Streaming trial page test."""
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from opthub_client.errors.query_error import QueryError
+from opthub_client.graphql.stream import JSONArrayStream
+from opthub_client.models.trial import fetch_trials, fetch_trials_async, stream_trials
+from tests.api._graphql_server import FakeGraphQLServer
+
+SCHEMA = """
+scalar JSON
+
+input MatchIdentifierInput {
+    id: String
+}
+
+input ParticipantInput {
+    id: String
+}
+
+input MatchTrialsRangeInput {
+    startTrialNo: Int
+    endTrialNo: Int
+    limit: Int
+}
+
+enum Order {
+    ascending
+    descending
+}
+
+type Solution {
+    variable: JSON
+    createdAt: String
+}
+
+type Evaluation {
+    constraint: JSON
+    feasible: Boolean
+    objective: JSON
+    status: String
+    startedAt: String
+    finishedAt: String
+    info: JSON
+    error: String
+}
+
+type Score {
+    status: String
+    startedAt: String
+    finishedAt: String
+    value: Float
+    error: String
+}
+
+type Trial {
+    trialNo: Int
+    status: String
+    solution: Solution
+    evaluation: Evaluation
+    score: Score
+}
+
+type MatchTrials {
+    isFirst: Boolean
+    isLast: Boolean
+    startTrialNo: Int
+    endTrialNo: Int
+    trials: [Trial]
+}
+
+type Query {
+    getMatchTrialsByParticipant(
+        match: MatchIdentifierInput!
+        participant: ParticipantInput
+        range: MatchTrialsRangeInput
+        order: Order
+    ): MatchTrials
+}
+"""
+PAGE_SIZE = 50
+DIMENSION = 1000
+
+
+def raw_trial(trial_no: int) -> dict[str, Any]:
+    """A trial of a high-dimensional problem as returned by the API."""
+    return {
+        "trialNo": trial_no,
+        "status": "success" if trial_no % 2 else "evaluator_failed",
+        "solution": {"variable": [0.5] * DIMENSION, "createdAt": "2024-01-01T00:00:00Z"},
+        "evaluation": {
+            "constraint": None,
+            "feasible": None,
+            "objective": float(trial_no),
+            "status": "Success",
+            "startedAt": "2024-01-01T00:00:00Z",
+            "finishedAt": "2024-01-01T00:00:01Z",
+            "info": {"history": list(range(DIMENSION))},
+            "error": None,
+        },
+        "score": None,
+    }
+
+
+def get_match_trials(_: object, match: dict[str, Any], **kwargs: Any) -> dict[str, Any]:  # noqa: ANN401
+    """Resolve a page of trials, or fail for an unknown match."""
+    if match["id"] != "match":
+        msg = "Match not found"
+        raise ValueError(msg)
+    start = kwargs["range"]["startTrialNo"]
+    return {
+        "isFirst": start == 1,
+        "isLast": False,
+        "trials": [raw_trial(trial_no) for trial_no in range(start, start + kwargs["range"]["limit"])],
+    }
+
+
+pytestmark = pytest.mark.graphql_schema(SCHEMA, root={"getMatchTrialsByParticipant": get_match_trials})
+
+
+def test_fetch_trials(server: FakeGraphQLServer) -> None:
+    """Trials are parsed from a compressed, streamed response."""
+    trials, is_first, is_last = fetch_trials("match", 0, PAGE_SIZE, PAGE_SIZE, 1, True, False)  # noqa: FBT003
+
+    assert [trial["trialNo"] for trial in trials] == list(range(1, PAGE_SIZE + 1))  # noqa: S101
+    assert trials[0]["evaluation"] is not None  # noqa: S101
+    assert trials[0]["evaluation"]["info"] == {"history": list(range(DIMENSION))}  # noqa: S101
+    assert (is_first, is_last) == (True, False)  # noqa: S101
+    assert "gzip" in (server.accept_encodings[-1] or "")  # noqa: S101
+
+    trials, *_ = asyncio.run(fetch_trials_async("match", 0, PAGE_SIZE, PAGE_SIZE, 1, True, True))  # noqa: FBT003
+    assert [trial["trialNo"] for trial in trials] == list(range(1, PAGE_SIZE + 1, 2))  # noqa: S101
+
+
+def test_stream_trials_errors(server: FakeGraphQLServer) -> None:  # noqa: ARG001
+    """The errors of the response are raised once the trials have been parsed."""
+    trial_page = stream_trials("unknown", 0, PAGE_SIZE, PAGE_SIZE, 1, True, False)  # noqa: FBT003
+    with pytest.raises(QueryError, match="Match not found"):
+        list(trial_page)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_json_array_stream(chunk_size: int) -> None:
+    """The items of the array are returned as soon as they are complete, and the rest of the document is kept."""
+    document = {"data": {"page": {"isFirst": True, "items": [raw_trial(1), 12, "]", [3]], "isLast": False}}}
+    text = json.dumps(document).encode()
+    stream = JSONArrayStream(["data", "page", "items"])
+    items = []
+    for start in range(0, len(text), chunk_size):
+        items.extend(stream.feed(text[start : start + chunk_size]))
+    items.extend(stream.close())
+
+    assert items == document["data"]["page"]["items"]  # noqa: S101
+    assert stream.result == {"data": {"page": {"isFirst": True, "isLast": False}}}  # noqa: S101
+    truncated = JSONArrayStream(["data", "page", "items"])
+    truncated.feed(text[:-1])
+    with pytest.raises(ValueError, match="Expected"):
+        truncated.close()
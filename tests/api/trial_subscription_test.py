@@ -0,0 +1,91 @@
+"""Test for the push notifications of trial status changes."""
+
+import threading
+import time
+
+from gql.transport.websockets import WebsocketsTransport
+
+import tests.api._common as common
+from opthub_client.api import OptHub, TrialSubscription
+from tests.api._server import FakeOptHubServer
+from tests.api._ws_server import FakeSubscriptionServer
+
+EVALUATION_SEC = 0.3
+MAX_WAIT_SEC = 2.0
+MAX_STATUS_REQUESTS = 3
+
+
+def test_subscription_wakes_waiting_trial() -> None:
+    """A pushed status change ends the wait without polling with backoff."""
+    with (
+        FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server,
+        FakeSubscriptionServer() as ws_server,
+        OptHub(common.TEST_API_KEY, server.url) as api,
+    ):
+        api.poll_interval_initial_sec = 30
+        match = api.match(common.TEST_MATCH)
+        subscription = match.subscribe(lambda: WebsocketsTransport(url=ws_server.url))
+        assert subscription.wait_connected(timeout=5)  # noqa: S101
+        while not ws_server.subscriptions:
+            time.sleep(0.01)
+
+        trial = match.submit([1.0])
+
+        def push() -> None:
+            time.sleep(EVALUATION_SEC)
+            ws_server.publish({"onUpdateMatchTrial": {"trialNo": trial.trial_no, "status": "success"}})
+
+        threading.Thread(target=push).start()
+        start = time.monotonic()
+        evaluation = trial.wait_evaluation()
+        elapsed = time.monotonic() - start
+        match.unsubscribe()
+
+    assert evaluation.objective.scalar == 1.0  # noqa: S101
+    assert elapsed < MAX_WAIT_SEC  # noqa: S101
+    assert server.count("GET", "trial") <= MAX_STATUS_REQUESTS  # noqa: S101
+
+
+def test_dropped_subscription_falls_back_to_polling() -> None:
+    """Waiting trials are woken by a dropped socket and poll until the subscription reconnects."""
+    with (
+        FakeOptHubServer(evaluation_sec=EVALUATION_SEC) as server,
+        FakeSubscriptionServer() as ws_server,
+        OptHub(common.TEST_API_KEY, server.url) as api,
+    ):
+        api.poll_interval_initial_sec = 0.05
+        api.poll_max_random_delay_sec = 0.0
+        api.poll_subscribed_interval_sec = 60
+        match = api.match(common.TEST_MATCH)
+        subscription = match.subscribe(lambda: WebsocketsTransport(url=ws_server.url))
+        subscription.reconnect_interval_sec = 60
+        assert subscription.wait_connected(timeout=5)  # noqa: S101
+
+        trial = match.submit([1.0])
+        threading.Timer(0.1, ws_server.drop_connections).start()
+        start = time.monotonic()
+        trial.wait_evaluation()
+        elapsed = time.monotonic() - start
+        assert not subscription.connected  # noqa: S101
+        match.unsubscribe()
+
+    assert elapsed < MAX_WAIT_SEC  # noqa: S101
+
+
+def test_only_watched_trials_are_recorded() -> None:
+    """The changes of the trials which are not waited for are not kept, so the memory does not grow with the match."""
+    with (
+        FakeSubscriptionServer() as ws_server,
+        TrialSubscription(common.TEST_MATCH, lambda: WebsocketsTransport(url=ws_server.url)) as subscription,
+    ):
+        assert subscription.wait_connected(timeout=5)  # noqa: S101
+        while not ws_server.subscriptions:
+            time.sleep(0.01)
+
+        with subscription.watching(1):
+            mark = subscription.mark(1)
+            ws_server.publish({"onUpdateMatchTrial": {"trialNo": 2, "status": "success"}})
+            ws_server.publish({"onUpdateMatchTrial": {"trialNo": 1, "status": "success"}})
+            assert subscription.wait(1, mark, timeout=5)  # noqa: S101
+
+        assert subscription.mark(1)[0] == subscription.mark(2)[0] == 0  # noqa: S101
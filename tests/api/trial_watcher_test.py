@@ -0,0 +1,138 @@
+"""Test for the shared poller of outstanding trials."""
+
+import threading
+import time
+from typing import Any
+
+import pytest
+from aiohttp import ClientConnectionError
+
+import tests.api._common as common
+from opthub_client.api import MatchTrialStatus, OptHub
+from opthub_client.errors.query_error import QueryError
+from opthub_client.watcher import TrialWatcher
+
+TRIALS = 120
+EVALUATION_SEC = 0.3
+MAX_REQUESTS = 20
+STAGGERED_TRIALS = 10
+STEP_SEC = 0.1
+MAX_ERRORS = 3
+
+
+class FakeRangeQuery:
+    """A stand-in of the range query where trial `n` finishes `EVALUATION_SEC + n * step_sec` seconds after creation."""
+
+    def __init__(self, step_sec: float = 0.0) -> None:
+        """Start the clock."""
+        self.step_sec = step_sec
+        self.created = time.monotonic()
+        self.calls = 0
+        self.errors: list[Exception] = []
+        self.status: str | None = None
+        self.lock = threading.Lock()
+
+    def __call__(self, match_id: str, start_trial_no: int, limit: int) -> list[Any]:
+        """Return the trials in the range."""
+        assert match_id == str(common.TEST_MATCH)  # noqa: S101
+        with self.lock:
+            self.calls += 1
+            if self.errors:
+                raise self.errors.pop(0)
+        elapsed = time.monotonic() - self.created
+        return [
+            self.trial(trial_no, elapsed > EVALUATION_SEC + trial_no * self.step_sec)
+            for trial_no in range(start_trial_no, start_trial_no + limit)
+        ]
+
+    def trial(self, trial_no: int, done: bool) -> dict[str, Any]:
+        """Return a trial, finished or not."""
+        return {
+            "trialNo": trial_no,
+            "status": self.status or ("success" if done else "evaluating"),
+            "solution": {"variable": "[1.0]", "created_at": "2024-12-01T00:00:00.000Z"},
+            "evaluation": None,
+            "score": {
+                "status": "Success",
+                "value": float(trial_no),
+                "started_at": "2024-12-01T00:00:00.000Z",
+                "finished_at": "2024-12-01T00:00:01.000Z",
+                "error": None,
+            }
+            if done
+            else None,
+        }
+
+
+def test_watcher_polls_once_per_tick() -> None:
+    """Many outstanding trials are refreshed by a few range queries."""
+    query = FakeRangeQuery()
+    api = OptHub(common.TEST_API_KEY)
+    api.poll_interval_initial_sec = 0.05
+    api.poll_max_random_delay_sec = 0.01
+    with TrialWatcher(api.match(common.TEST_MATCH), fetch_range=query) as watcher:
+        for trial_no in range(1, TRIALS + 1):
+            watcher.watch(trial_no)
+        finished = [future.result().trial_no for future in watcher.as_completed(timeout=10)]
+        trials = watcher.wait_all(timeout=10)
+    assert sorted(finished) == list(range(1, TRIALS + 1))  # noqa: S101
+    assert all(trial.status.type == MatchTrialStatus.SUCCESS for trial in trials)  # noqa: S101
+    assert [trial.score.value for trial in trials if trial.score] == [float(n) for n in range(1, TRIALS + 1)]  # noqa: S101
+    assert query.calls < MAX_REQUESTS  # noqa: S101
+
+
+def test_as_completed_timeout_applies_to_all_trials() -> None:
+    """The timeout of `as_completed` bounds the whole iteration, not the wait for each trial."""
+    api = OptHub(common.TEST_API_KEY)
+    api.poll_interval_initial_sec = 0.05
+    api.poll_max_random_delay_sec = 0.0
+    with TrialWatcher(api.match(common.TEST_MATCH), fetch_range=FakeRangeQuery(step_sec=STEP_SEC)) as watcher:
+        for trial_no in range(1, STAGGERED_TRIALS + 1):
+            watcher.watch(trial_no)
+        finished = []
+        with pytest.raises(TimeoutError):
+            finished.extend(watcher.as_completed(timeout=EVALUATION_SEC + STAGGERED_TRIALS * STEP_SEC / 2))
+    assert 0 < len(finished) < STAGGERED_TRIALS  # noqa: S101
+
+
+def create_watcher(query: FakeRangeQuery) -> TrialWatcher:
+    """Create a watcher polling quickly with the range query."""
+    api = OptHub(common.TEST_API_KEY)
+    api.poll_interval_initial_sec = 0.05
+    api.poll_max_random_delay_sec = 0.0
+    return TrialWatcher(api.match(common.TEST_MATCH), fetch_range=query, max_consecutive_errors=MAX_ERRORS)
+
+
+def test_transient_errors_are_retried() -> None:
+    """A few transient failures of the range query are retried at the next ticks."""
+    query = FakeRangeQuery()
+    query.errors = [ClientConnectionError()] * (MAX_ERRORS - 1)
+    with create_watcher(query) as watcher:
+        trial = watcher.watch(1).result(timeout=10)
+    assert trial.status.type == MatchTrialStatus.SUCCESS  # noqa: S101
+
+
+def test_repeated_or_permanent_errors_fail_the_trials() -> None:
+    """The trials fail after `max_consecutive_errors` transient failures, or at once after another failure."""
+    query = FakeRangeQuery()
+    query.errors = [ClientConnectionError()] * MAX_ERRORS
+    with create_watcher(query) as watcher, pytest.raises(ClientConnectionError):
+        watcher.watch(1).result(timeout=10)
+    assert query.calls == MAX_ERRORS  # noqa: S101
+
+    query = FakeRangeQuery()
+    query.errors = [QueryError(resource="trial", detail="Invalid data returned.")]
+    with create_watcher(query) as watcher, pytest.raises(QueryError):
+        watcher.watch(1).result(timeout=10)
+    assert query.calls == 1  # noqa: S101
+
+
+def test_malformed_trials_do_not_stop_the_watcher() -> None:
+    """A trial which cannot be read fails its future, and the watcher keeps polling the other trials."""
+    query = FakeRangeQuery()
+    query.status = "unknown"
+    with create_watcher(query) as watcher:
+        with pytest.raises(ValueError, match="unknown"):
+            watcher.watch(1).result(timeout=10)
+        query.status = None
+        assert watcher.watch(2).result(timeout=10).trial_no == 2  # noqa: S101, PLR2004